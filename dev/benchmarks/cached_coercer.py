@@ -0,0 +1,101 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+""" Benchmarks coercing values (as is done for each value of User Text 
+    written to a shape file) with a new coercer set up for each value 
+    (coercer_factory), against the memoised one from get_coercer.  
+
+    Requires src (the folder containing sDNA_GH) to be on sys.path (e.g. in 
+    PYTHONPATH).  Usage:
+
+    python cached_coercer.py [num_values] [--repeats N]
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import sys
+import timeit
+import argparse
+from datetime import date
+from collections import OrderedDict
+
+import fake_rhino
+
+from sDNA_GH import pyshp_wrapper
+
+
+NUM_VALUES = 2000
+REPEATS = 3
+VALUES = [True, 'false', 0, -5, '42', 1.5, '2.25', 'abc', '2021-03-04'
+         ,date(2021, 3, 4), '04/03/21'
+         ]
+
+
+def cases(num_values):
+    #type(int) -> Iterator[str, function]
+    values = (VALUES * (num_values // len(VALUES) + 1))[:num_values]
+
+    def uncached():
+        for value in values:
+            pyshp_wrapper.coercer_factory()(value)
+    yield 'coercer per value', uncached
+
+    def cached():
+        coerce = pyshp_wrapper.get_coercer()
+        for value in values:
+            coerce(value)
+    yield 'cached coercer', cached
+
+
+def run(num_values = NUM_VALUES, repeats = REPEATS):
+    #type(int, int) -> OrderedDict
+    results = OrderedDict()
+    for case, f in cases(num_values):
+        results[case] = min(timeit.repeat(f, number = 1, repeat = repeats))
+        sys.stderr.write('%20s %8s %12.5f\n' % (case, num_values, results[case]))
+    return results
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('num_values', nargs = '?', type = int, default = NUM_VALUES)
+    parser.add_argument('--repeats', type = int, default = REPEATS)
+    args = parser.parse_args(argv)
+
+    results = run(args.num_values, args.repeats)
+    baseline = results['coercer per value']
+    print('%20s %12s %8s' % ('case', 'min (s)', 'ratio'))
+    for case, min_time in results.items():
+        print('%20s %12.5f %8.2f' % (case, min_time, min_time / baseline if baseline else float('inf')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
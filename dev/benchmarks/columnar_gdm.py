@@ -0,0 +1,135 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+""" Benchmarks GeomDataMapping against ColumnarGeomDataMapping, on 
+    synthetic Data (num_objects objects, each with num_fields float fields), 
+    timing building each, copying it, and reading one field of every 
+    object, and measuring its memory (with sys.getsizeof, recursively).  
+
+    Requires src (the folder containing sDNA_GH) to be on sys.path (e.g. in 
+    PYTHONPATH).  Usage:
+
+    python columnar_gdm.py [num_objects] [--num_fields N] [--repeats N]
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import sys
+import timeit
+import argparse
+from collections import OrderedDict
+
+import fake_rhino
+
+from sDNA_GH import gdm_from_GH_Datatree
+
+
+NUM_OBJECTS = 5000
+NUM_FIELDS = 50
+REPEATS = 3
+FIELD = 'field7'
+
+GDM = gdm_from_GH_Datatree.GeomDataMapping
+CGDM = gdm_from_GH_Datatree.ColumnarGeomDataMapping
+
+
+def deep_getsizeof(obj, seen = None):
+    #type(type[any], set) -> int
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(key, seen) + deep_getsizeof(val, seen)
+                    for key, val in obj.items()
+                   )
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    if isinstance(obj, CGDM):
+        size += deep_getsizeof(obj.columns, seen)
+    return size
+
+
+def synthetic_keys_and_vals(num_objects, num_fields):
+    #type(int, int) -> list
+    return [('obj%s' % i, OrderedDict(('field%s' % j, i + j / 8.0)
+                                      for j in range(num_fields)
+                                     )
+            )
+            for i in range(num_objects)
+           ]
+
+
+def cases(GDM_class, keys_and_vals):
+    #type(type, list) -> Iterator[str, function]
+    yield 'build', lambda : GDM_class(keys_and_vals)
+
+    gdm = GDM_class(keys_and_vals)
+    if GDM_class is CGDM:
+        yield 'copy', gdm.copy
+        yield 'read a field', lambda : OrderedDict(gdm.column_items(FIELD))
+    else:
+        yield 'copy', lambda : GDM_class((key, val.copy()) for key, val in gdm.items())
+        yield 'read a field', lambda : OrderedDict((key, val[FIELD]) for key, val in gdm.items())
+
+
+def run(num_objects = NUM_OBJECTS, num_fields = NUM_FIELDS, repeats = REPEATS):
+    #type(int, int, int) -> OrderedDict
+    keys_and_vals = synthetic_keys_and_vals(num_objects, num_fields)
+    results = OrderedDict()
+    for GDM_class in (GDM, CGDM):
+        name = GDM_class.__name__
+        for case, f in cases(GDM_class, keys_and_vals):
+            results[name, case] = min(timeit.repeat(f, number = 1, repeat = repeats))
+            sys.stderr.write('%25s %15s %12.5f\n' % (name, case, results[name, case]))
+        results[name, 'MB'] = deep_getsizeof(GDM_class(keys_and_vals)) / 1e6
+    return results
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('num_objects', nargs = '?', type = int, default = NUM_OBJECTS)
+    parser.add_argument('--num_fields', type = int, default = NUM_FIELDS)
+    parser.add_argument('--repeats', type = int, default = REPEATS)
+    args = parser.parse_args(argv)
+
+    results = run(args.num_objects, args.num_fields, args.repeats)
+    print('%s objects x %s fields' % (args.num_objects, args.num_fields))
+    print('%25s %15s %12s %8s' % ('class', 'case', 'min (s) / MB', 'ratio'))
+    for (name, case), result in results.items():
+        baseline = results[GDM.__name__, case]
+        print('%25s %15s %12.5f %8.2f' % (name, case, result, result / baseline if baseline else float('inf')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
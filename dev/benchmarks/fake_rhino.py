@@ -0,0 +1,245 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Fake Rhino, Grasshopper, .Net and IronPython modules, so that sDNA_GH 
+    can be imported (and its tools run on data) by CPython, outside of 
+    Rhino.  Import this module before sDNA_GH.  
+
+    Every attribute of a fake module is a fake class, as is every 
+    attribute of a fake class, so module level code in sDNA_GH
+    (e.g. subclassing Grasshopper components, or making Params) runs.  
+    The exception is rhinoscriptsyntax, whose functions that sDNA_GH calls 
+    on geometry work on FakeRhinoDoc: a dict of poly lines keyed by guid.
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import os
+import abc
+import sys
+import uuid
+import types
+import tempfile
+from collections import OrderedDict
+
+try:
+    import importlib.util
+except ImportError:
+    pass # Python 2 uses find_module and load_module instead.
+
+
+FAKE_PACKAGES = ('clr'
+                ,'System'
+                ,'Microsoft'
+                ,'Rhino'
+                ,'Grasshopper'
+                ,'GhPython'
+                ,'scriptcontext'
+                ,'rhinoscriptsyntax'
+                ,'ghpythonlib'
+                ,'Cheetah_GH' # Only imported by sDNA_GH.dev_tools
+                )
+
+WINDOWS_ENV_VARS = ('LOCALAPPDATA'
+                   ,'APPDATA'
+                   ,'PROGRAMFILES(X86)'
+                   ,'PROGRAMFILES'
+                   ,'SYSTEMDRIVE'
+                   )
+
+
+class FakeMeta(abc.ABCMeta):
+    """ ABCMeta, so that fake classes can be mixed in with ABCs (as 
+        components are in sDNA_GH.skel.basic.smart_comp).
+    """
+    def __getattr__(cls, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        fake = fake_class('%s.%s' % (cls.__name__, attr))
+        setattr(cls, attr, fake)
+        return fake
+
+    def __getitem__(cls, item):
+        # Generic .NET types, e.g. Grasshopper.DataTree[object]
+        return cls
+
+
+def fake_init(self, *args, **kwargs):
+    pass
+
+
+def fake_getattr(self, attr):
+    if attr.startswith('__'):
+        raise AttributeError(attr)
+    return fake_class(attr)
+
+
+FakeObject = FakeMeta('FakeObject'
+                     ,(object,)
+                     ,dict(__init__ = fake_init
+                          ,__getattr__ = fake_getattr
+                          ,__iter__ = lambda self : iter(())
+                          )
+                     )
+
+
+def fake_class(name):
+    #type(str) -> FakeMeta
+    return FakeMeta(str(name), (FakeObject,), {})
+
+
+class FakeModule(types.ModuleType):
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        fake = fake_class('%s.%s' % (self.__name__, attr))
+        setattr(self, attr, fake)
+        return fake
+
+
+class FakeModuleImporter(object):
+    """ Meta path finder and loader of FakeModules, for FAKE_PACKAGES
+        and all their sub modules.
+    """
+    def is_fake(self, name):
+        return name.split('.')[0] in FAKE_PACKAGES
+
+    def find_spec(self, name, path, target = None):
+        if not self.is_fake(name):
+            return None
+        return importlib.util.spec_from_loader(name, self, is_package = True)
+
+    def create_module(self, spec):
+        return sys.modules.get(spec.name) or FakeModule(spec.name)
+
+    def exec_module(self, module):
+        module.__path__ = []
+
+    def find_module(self, name, path = None):
+        return self if self.is_fake(name) else None
+
+    def load_module(self, name):
+        if name not in sys.modules:
+            sys.modules[name] = FakeModule(name)
+        module = sys.modules[name]
+        module.__path__ = []
+        module.__loader__ = self
+        parent, __, child = name.rpartition('.')
+        if parent:
+            setattr(sys.modules[parent], child, module)
+        return module
+
+
+FakeRhinoDoc = OrderedDict() # guid -> dict(points = list, user_text = OrderedDict)
+
+
+def make_rhinoscriptsyntax():
+    #type() -> FakeModule
+    rs = FakeModule('rhinoscriptsyntax')
+
+    def AddPolyline(points, replace_id = None):
+        guid = str(uuid.uuid4())
+        FakeRhinoDoc[guid] = dict(points = [list(point) for point in points]
+                                 ,user_text = OrderedDict()
+                                 )
+        return guid
+
+    def IsCurve(object_id):
+        return object_id in FakeRhinoDoc
+
+    def IsLine(object_id, segment_index = -1):
+        return IsCurve(object_id) and len(FakeRhinoDoc[object_id]['points']) == 2
+
+    def IsPolyline(object_id, segment_index = -1):
+        return IsCurve(object_id) and len(FakeRhinoDoc[object_id]['points']) > 2
+
+    def CurveDegree(curve_id, segment_index = -1):
+        return 1
+
+    def PolylineVertices(curve_id, segment_index = -1):
+        return [list(point) for point in FakeRhinoDoc[curve_id]['points']]
+
+    def ObjectsByType(geometry_type, select = False, state = 0):
+        return list(FakeRhinoDoc)
+
+    def GetUserText(object_id, key = None, attached_to_geometry = False):
+        user_text = FakeRhinoDoc[object_id]['user_text']
+        if key is None:
+            return list(user_text)
+        return user_text.get(key)
+
+    def SetUserText(object_id, key, value = None, attach_to_geometry = False):
+        user_text = FakeRhinoDoc[object_id]['user_text']
+        if value is None:
+            user_text.pop(key, None)
+        else:
+            user_text[key] = str(value)
+        return True
+
+    def DeleteObjects(object_ids):
+        return sum(FakeRhinoDoc.pop(object_id, None) is not None 
+                   for object_id in object_ids
+                  )
+
+    for func in (AddPolyline
+                ,IsCurve
+                ,IsLine
+                ,IsPolyline
+                ,CurveDegree
+                ,PolylineVertices
+                ,ObjectsByType
+                ,GetUserText
+                ,SetUserText
+                ,DeleteObjects
+                ):
+        setattr(rs, func.__name__, func)
+    return rs
+
+
+def install():
+    #type() -> None
+    if any(isinstance(finder, FakeModuleImporter) for finder in sys.meta_path):
+        return
+    sys.meta_path.insert(0, FakeModuleImporter())
+    sys.modules['rhinoscriptsyntax'] = make_rhinoscriptsyntax()
+
+    # sDNA_GH.skel.basic.ghdoc requires sc.doc to be the ghdoc.
+    import scriptcontext as sc
+    import GhPython
+    sc.doc = GhPython.DocReplacement.GrasshopperDocument()
+    sc.doc.Path = None # An unsaved Grasshopper definition.
+
+    # sDNA_GH.skel.tools.helpers.funcs.windows_installation_paths
+    for env_var in WINDOWS_ENV_VARS:
+        os.environ.setdefault(env_var, tempfile.gettempdir())
+
+
+install()
@@ -0,0 +1,154 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Benchmarks the cost of debug logging in DataParser and in 
+    GeomDataMapping.from_DataTree_and_list, on 100,000 objects, with the 
+    package logger (and its handler) set up as it is in production.  Rhino
+    and Grasshopper are faked by fake_rhino.  
+
+    Times each case with:
+     - debug: a handler at DEBUG (every debug message is formatted).  
+     - info_logger_at_debug: a handler at INFO, but the package logger left 
+       at DEBUG (so debug LogRecords are still created, then discarded by
+       the handler).  
+     - info: a handler at INFO, and the package logger at INFO, as 
+       logging_wrapper.set_logger_level_to_handlers sets it (debug calls 
+       return from logger.isEnabledFor).  
+
+    To measure the saving from the deferred formatting of debug messages,
+    also run it with an older checkout of src on sys.path.  
+
+    Requires src (the folder containing sDNA_GH) to be on sys.path (e.g. in 
+    PYTHONPATH).  Usage:
+
+    python lazy_logging.py [num_objects] [--repeats N]
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import os
+import sys
+import random
+import timeit
+import logging
+import warnings
+import argparse
+from collections import OrderedDict
+
+import fake_rhino
+
+warnings.simplefilter('ignore')
+
+from sDNA_GH.main import module_opts
+from sDNA_GH import gdm_from_GH_Datatree
+from sDNA_GH.tools.support.Parse_Data import DataParser
+
+
+NUM_OBJECTS = 100000
+REPEATS = 3
+SEED = 0
+FIELD = 'BtE10'
+
+LEVELS = OrderedDict([('debug', ('DEBUG', 'DEBUG'))
+                     ,('info_logger_at_debug', ('DEBUG', 'INFO'))
+                     ,('info', ('INFO', 'INFO'))
+                     ])
+
+
+def synthetic_gdm(num_objects, seed = SEED):
+    #type(int, int) -> GeomDataMapping
+    rng = random.Random(seed)
+    return gdm_from_GH_Datatree.GeomDataMapping(
+                    ('obj_%s' % i, OrderedDict([(FIELD, 0 if rng.random() < 0.3 
+                                                          else rng.expovariate(0.1)
+                                                 )
+                                               ]))
+                    for i in range(num_objects)
+                    )
+
+
+def set_up_logger(logger_level, handler_level, stream):
+    #type(str, str, Stream) -> logging.Logger
+    logger = logging.getLogger(module_opts['options'].logger_name)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(handler_level)
+    logger.addHandler(handler)
+    logger.setLevel(logger_level)
+    return logger
+
+
+def cases(num_objects, seed = SEED):
+    #type(int, int) -> Iterator[str, function]
+    gdm = synthetic_gdm(num_objects, seed)
+    opts = dict(options = module_opts['options']._replace(field = FIELD)
+               ,metas = module_opts['metas']
+               )
+    parser = DataParser(opts)
+    yield 'DataParser', lambda : parser(gdm, opts)
+
+    Geom, Data = list(gdm.keys()), list(gdm.values())
+    yield ('from_DataTree_and_list'
+          ,lambda : gdm_from_GH_Datatree.GeomDataMapping.from_DataTree_and_list(Geom, Data)
+          )
+
+
+def run(num_objects = NUM_OBJECTS, repeats = REPEATS, seed = SEED):
+    #type(int, int, int) -> OrderedDict
+    results = OrderedDict()
+    with open(os.devnull, 'w') as stream:
+        for case, f in cases(num_objects, seed):
+            for name, (logger_level, handler_level) in LEVELS.items():
+                set_up_logger(logger_level, handler_level, stream)
+                times = timeit.repeat(f, number = 1, repeat = repeats)
+                results[case, name] = min(times)
+                sys.stderr.write('%25s %25s %8s %12.5f\n' % (case, name, num_objects, results[case, name]))
+    return results
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('num_objects', nargs = '?', type = int, default = NUM_OBJECTS)
+    parser.add_argument('--repeats', type = int, default = REPEATS)
+    parser.add_argument('--seed', type = int, default = SEED)
+    args = parser.parse_args(argv)
+
+    results = run(args.num_objects, args.repeats, args.seed)
+    print('%25s %25s %12s %8s' % ('case', 'logging', 'min (s)', 'ratio'))
+    for (case, name), min_time in results.items():
+        baseline = results[case, 'info_logger_at_debug']
+        print('%25s %25s %12.5f %8.2f' % (case, name, min_time, min_time / baseline if baseline else float('inf')))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
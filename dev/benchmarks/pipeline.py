@@ -0,0 +1,299 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Headless benchmarks of the core of the Write_Shp -> sDNA -> Read_Shp 
+    -> Parse_Data pipeline, on synthetic random grid networks (from 
+    dev/tests/create_random_grid_network.py) of several sizes.  Rhino and
+    Grasshopper are faked by fake_rhino, so this runs on Linux.  
+
+    Times, in isolation: pyshp_wrapper.write_iterable_to_shp, reading 
+    shapes and records with TmpFileDeletingShapeRecordsIterator (with and 
+    without read_fields), data_cruncher's classifiers, DataParser, and 
+    options_manager.override_namedtuple.  
+
+    Requires pyshp and toml_tools, and src (the folder containing 
+    sDNA_GH) to be on sys.path (e.g. in PYTHONPATH).  Usage:
+
+    python pipeline.py [size_1 size_2 ...] [--repeats N] [--output run.json]
+
+    writes the results as JSON (to stdout if no --output), and:
+
+    python pipeline.py --compare old_run.json new_run.json [--threshold 0.2]
+
+    lists any cases more than threshold slower in new_run.json than in 
+    old_run.json (as regressions, with a return code of 1).
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import timeit
+import logging
+import platform
+import warnings
+import tempfile
+import argparse
+from collections import OrderedDict
+
+import fake_rhino
+import rhinoscriptsyntax as rs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                               ,'tests'
+                               )
+               )
+from create_random_grid_network import random_grid_network
+
+logging.disable(logging.CRITICAL) # before the import of sDNA_GH.main sets up logging.
+warnings.simplefilter('ignore')
+
+from sDNA_GH.main import module_opts
+from sDNA_GH import data_cruncher
+from sDNA_GH import pyshp_wrapper
+from sDNA_GH import options_manager
+from sDNA_GH import gdm_from_GH_Datatree
+from sDNA_GH.skel.tools.helpers import funcs
+from sDNA_GH.tools.support.Parse_Data import DataParser
+
+
+SIZES = (20, 50, 100) # Grids of size x size nodes.
+REPEATS = 3
+SEED = 0
+THRESHOLD = 0.2 # Slow downs of more than 20% are regressions.
+FIELD = 'BtE10' # The field that the classifiers and DataParser are run on.
+
+CLASSIFIERS = OrderedDict([('quantile_l_to_r', data_cruncher.quantile_l_to_r)
+                          ,('spike_isolating_quantile', data_cruncher.spike_isolating_quantile)
+                          ,('fisher_jenks', data_cruncher.fisher_jenks)
+                          ,('geometric', data_cruncher.geometric)
+                          ])
+
+
+def synthetic_network(size, seed = SEED):
+    #type(int, int) -> GeomDataMapping
+    """ Adds a random size x size grid network to the fake Rhino doc, and 
+        returns a gdm of its objects and synthetic results data, resembling
+        sDNA's (a spike of zeros and a long tailed distribution).  
+    """
+    rng = random.Random(seed)
+    fake_rhino.FakeRhinoDoc.clear()
+    gdm = gdm_from_GH_Datatree.GeomDataMapping()
+    for i, poly_line in enumerate(random_grid_network(size, size, random_num = rng.random)):
+        gdm[rs.AddPolyline(poly_line)] = OrderedDict([('ID', i)
+                                                     ,(FIELD, 0 if rng.random() < 0.3 else rng.expovariate(0.1))
+                                                     ,('MADn', rng.uniform(0, 50))
+                                                     ,('Name', 'Link %s' % i)
+                                                     ])
+    return gdm
+
+
+def is_shape(obj, shp_type):
+    #type(str, str) -> bool
+    return rs.IsLine(obj) or rs.IsPolyline(obj)
+
+
+def get_list_of_list_of_pts_from_obj(obj):
+    #type(str) -> list
+    return [rs.PolylineVertices(obj)]
+
+
+def write_shp(gdm, f_name, options):
+    #type(GeomDataMapping, str, namedtuple) -> str
+    """ As in the Write_Shp tool. """
+    pattern = funcs.make_regex(options.input_key_str)
+    retcode, f_name, fields, attribute_tables = pyshp_wrapper.write_iterable_to_shp(
+                                     my_iterable = gdm
+                                    ,shp_file_path = f_name
+                                    ,is_shape = is_shape
+                                    ,shape_mangler = get_list_of_list_of_pts_from_obj
+                                    ,shape_IDer = lambda obj : obj
+                                    ,key_finder = lambda obj : gdm[obj].keys()
+                                    ,key_matcher = lambda key : re.match(pattern, key)
+                                    ,value_demangler = lambda obj, key : gdm[obj][key]
+                                    ,shape_code = options.shp_type
+                                    ,options = options
+                                    ,field_names = None
+                                    ,AttributeTablesClass = gdm_from_GH_Datatree.GeomDataMapping
+                                    )
+    return f_name
+
+
+def read_shp(f_name, options):
+    #type(str, namedtuple) -> int
+    """ Iterates through all the shapes and records, as in the Read_Shp tool.
+        Returns the number of shapes read.
+    """
+    num_shapes = 0
+    for group in pyshp_wrapper.TmpFileDeletingShapeRecordsIterator(
+                                                     reader = f_name
+                                                    ,opts = dict(options = options)
+                                                    ):
+        for points, record in group:
+            record.get(FIELD)
+            num_shapes += 1
+    return num_shapes
+
+
+def cases(size, folder, seed = SEED):
+    #type(int, str, int) -> Iterator[str, int, function]
+    """ Yields the name of each case, its number of objects, and a function
+        to time.  
+    """
+    opts = module_opts
+    options = opts['options']._replace(field = FIELD
+                                       ,overwrite_shp = True
+                                       ,del_after_read = False
+                                       )
+    metas = opts['metas']
+    gdm = synthetic_network(size, seed)
+    n = len(gdm)
+    f_name = os.path.join(folder, 'grid_%s.shp' % size)
+
+    yield 'write_iterable_to_shp', n, lambda : write_shp(gdm, f_name, options)
+
+    yield 'TmpFileDeletingShapeRecordsIterator', n, lambda : read_shp(f_name, options)
+
+    yield ('TmpFileDeletingShapeRecordsIterator(read_fields)'
+          ,n
+          ,lambda : read_shp(f_name, options._replace(read_fields = FIELD))
+          )
+
+    data = sorted(record[FIELD] for record in gdm.values())
+    for name, classifier in CLASSIFIERS.items():
+        yield name, n, lambda classifier = classifier : classifier(data
+                                                                  ,options.num_classes
+                                                                  ,options = options
+                                                                  )
+
+    parser_opts = dict(options = options, metas = metas)
+    yield 'DataParser', n, lambda : DataParser(parser_opts)(gdm, parser_opts)
+
+    overrides = [dict(field = FIELD, num_classes = 5, class_spacing = 'jenks')
+                ,options._replace(num_classes = 7)
+                ]
+    yield ('override_namedtuple'
+          ,len(options._fields)
+          ,lambda : options_manager.override_namedtuple(opts['options']
+                                                       ,overrides
+                                                       ,**metas._asdict()
+                                                       )
+          )
+
+
+def run(sizes = SIZES, repeats = REPEATS, seed = SEED):
+    #type(Iterable[int], int, int) -> dict
+    results = []
+    folder = tempfile.mkdtemp(prefix = 'sDNA_GH_benchmarks_')
+    try:
+        for size in sizes:
+            for name, n, f in cases(size, folder, seed):
+                times = timeit.repeat(f, number = 1, repeat = repeats)
+                times.sort()
+                results.append(OrderedDict([('case', name)
+                                           ,('size', size)
+                                           ,('n', n)
+                                           ,('min', times[0])
+                                           ,('median', times[len(times) // 2])
+                                           ]))
+                sys.stderr.write('%50s %6s %8s %12.5f\n' % (name, size, n, times[0]))
+    finally:
+        shutil.rmtree(folder, ignore_errors = True)
+
+    return OrderedDict([('time', time.asctime())
+                       ,('python', sys.version)
+                       ,('platform', platform.platform())
+                       ,('numpy', data_cruncher.numpy is not None)
+                       ,('repeats', repeats)
+                       ,('seed', seed)
+                       ,('results', results)
+                       ])
+
+
+def compare(old, new, threshold = THRESHOLD):
+    #type(dict, dict, float) -> list
+    """ Prints the ratios of the min times of each case in new to those in
+        old.  Returns the cases in new that are more than threshold slower.
+    """
+    old_times = dict(((result['case'], result['size']), result['min'])
+                     for result in old['results']
+                    )
+    regressions = []
+    print('%50s %6s %12s %12s %8s' % ('case', 'size', 'old (s)', 'new (s)', 'new/old'))
+    for result in new['results']:
+        key = result['case'], result['size']
+        if key not in old_times:
+            print('%50s %6s %12s %12.5f %8s' % (key + ('-', result['min'], 'new')))
+            continue
+        ratio = result['min'] / old_times[key] if old_times[key] else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            regressions.append(result)
+            flag = 'REGRESSION'
+        print('%50s %6s %12.5f %12.5f %8.2f %s' % (key + (old_times[key], result['min'], ratio, flag)))
+    return regressions
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('sizes', nargs = '*', type = int, default = list(SIZES))
+    parser.add_argument('--repeats', type = int, default = REPEATS)
+    parser.add_argument('--seed', type = int, default = SEED)
+    parser.add_argument('--output', help = 'JSON file to write the results to. ')
+    parser.add_argument('--compare', nargs = 2, metavar = ('OLD', 'NEW'))
+    parser.add_argument('--threshold', type = float, default = THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        runs = []
+        for file_name in args.compare:
+            with open(file_name) as f:
+                runs.append(json.load(f))
+        regressions = compare(runs[0], runs[1], args.threshold)
+        print('%s regression(s) found. ' % len(regressions))
+        return 1 if regressions else 0
+
+    results = run(args.sizes, args.repeats, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent = 4)
+    else:
+        print(json.dumps(results, indent = 4))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
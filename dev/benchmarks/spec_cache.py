@@ -0,0 +1,118 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+""" Benchmarks loading the input specs of all the sDNA tools cold (by 
+    importing sDNAUISpec and calling each tool's getInputSpec), against 
+    warm (from the spec cache, with a new SpecCache per tool, as each 
+    component has its own instance of its tool).  A stand in sDNAUISpec 
+    (from spec_cache_unit_tests) is used, so sDNA is not required.  
+
+    Requires src (the folder containing sDNA_GH) to be on sys.path (e.g. in 
+    PYTHONPATH).  Usage:
+
+    python spec_cache.py [--repeats N]
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import os
+import sys
+import shutil
+import timeit
+import tempfile
+import argparse
+from collections import OrderedDict
+
+from sDNA_GH import spec_cache
+from sDNA_GH.tests.unit_tests.spec_cache_unit_tests import FAKE_SDNAUISPEC, TOOL_NAMES
+
+
+REPEATS = 5
+MODULE_NAME = 'fake_sDNAUISpec'
+
+
+def import_fake_sDNAUISpec(folder):
+    #type(str) -> module
+    sys.modules.pop(MODULE_NAME, None)
+    sys.path.insert(0, folder)
+    try:
+        return __import__(MODULE_NAME)
+    finally:
+        sys.path.remove(folder)
+
+
+def run(repeats = REPEATS):
+    #type(int) -> OrderedDict
+    folder = tempfile.mkdtemp()
+    try:
+        sDNAUISpec = os.path.join(folder, MODULE_NAME + '.py')
+        with open(sDNAUISpec, 'w') as f:
+            f.write(FAKE_SDNAUISPEC)
+
+        class Options(spec_cache.SpecCacheOptions):
+            spec_cache = os.path.join(folder, 'input_specs_cache.json')
+
+        def cold():
+            module = import_fake_sDNAUISpec(folder)
+            cache = spec_cache.SpecCache(Options)
+            for tool_name in TOOL_NAMES:
+                cache.put(spec_cache.spec_key(sDNAUISpec, tool_name)
+                         ,getattr(module, tool_name)().getInputSpec()
+                         )
+
+        def warm():
+            for tool_name in TOOL_NAMES:
+                spec_cache.SpecCache(Options).get(spec_cache.spec_key(sDNAUISpec, tool_name))
+
+        results = OrderedDict()
+        for case, f in (('cold', cold), ('warm', warm)):
+            results[case] = min(timeit.repeat(f, number = 1, repeat = repeats))
+            sys.stderr.write('%8s %12.5f\n' % (case, results[case]))
+        return results
+    finally:
+        sys.modules.pop(MODULE_NAME, None)
+        shutil.rmtree(folder)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = __doc__.split('\n')[0])
+    parser.add_argument('--repeats', type = int, default = REPEATS)
+    args = parser.parse_args(argv)
+
+    results = run(args.repeats)
+    print('Input specs of %s tools.' % len(TOOL_NAMES))
+    print('%8s %12s %8s' % ('start', 'min (ms)', 'ratio'))
+    for case, min_time in results.items():
+        print('%8s %12.3f %8.2f' % (case, 1000 * min_time, min_time / results['cold']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Benchmark of data_cruncher.spike_isolating_quantile against the 
+    previous implementation (which recursed on sliced copies of data, 
+    rebuilt an OrderedCounter in each call, and found the spikes with 
+    list.index), on sorted synthetic data of several sizes.  
+    
+    Requires sDNA_GH (and its dependencies) to be importable.  Usage:
+
+    python spike_isolating_quantile.py [size_1 size_2 ...]
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+
+import sys
+import random
+import timeit
+import logging
+import warnings
+
+from sDNA_GH import data_cruncher
+from sDNA_GH.data_cruncher import (OrderedCounter
+                                  ,SpikeIsolatingQuantileOptions
+                                  ,max_interval_lt_width_w_with_most_data_points
+                                  ,data_point_midpoint_and_next
+                                  ,quantile_l_to_r
+                                  ,pro_rata
+                                  )
+
+
+SIZES = (1000, 10000, 100000)
+NUM_CLASSES = 20
+REPEATS = 3
+
+
+def spike_isolating_quantile_with_slices(data
+                                        ,num_classes
+                                        ,ordered_counter = None
+                                        ,options = SpikeIsolatingQuantileOptions
+                                        ):
+    """ The previous implementation (without its debug logging). """
+    if ordered_counter is None:
+        ordered_counter = OrderedCounter(data)
+    num_inter_class_bounds = num_classes - 1
+    if num_inter_class_bounds <= 0:
+        return []
+    if num_inter_class_bounds == 1:
+        return quantile_l_to_r(data, num_inter_class_bounds + 1, options)
+    inter_class_bounds = []
+    if options.min_num is None:
+        min_num = len(data) // num_classes
+    else:
+        min_num = options.min_num
+    spike_interval = max_interval_lt_width_w_with_most_data_points(ordered_counter
+                                                                  ,min_num
+                                                                  ,w = options.max_width
+                                                                  )
+    if spike_interval:
+        keys = list(ordered_counter.keys()) # Python 3 
+        spike_data_index_a = data.index(keys[spike_interval.index_a])
+        spike_data_index_b = tuple(reversed(data)).index(keys[spike_interval.index_b])
+        spike_data_index_b = len(data) - 1 - spike_data_index_b
+        if (num_classes - 3 <= 0 or 
+           (spike_data_index_a == 0 and spike_data_index_b == len(data)- 1)):
+            extra_classes_a, extra_classes_b = 0, 0
+        else:
+            extra_classes_a, extra_classes_b = pro_rata(num_classes - 3
+                                                       ,spike_data_index_a
+                                                       ,len(data) - spike_data_index_b - 1
+                                                       ,tol = options.tol
+                                                       )
+        if spike_data_index_a >= 1:
+            __, midpoint_i_a, __ = data_point_midpoint_and_next(data
+                                                              ,spike_data_index_a - 1
+                                                              )
+            inter_class_bounds += spike_isolating_quantile_with_slices(
+                                                     data[:spike_data_index_a]
+                                                    ,extra_classes_a + 1
+                                                    ,options = options
+                                                    ) 
+            inter_class_bounds += [midpoint_i_a]
+        if spike_data_index_b <= len(data) - 2:
+            __, midpoint_i_b, __ = data_point_midpoint_and_next(data
+                                                              ,spike_data_index_b
+                                                              )
+            inter_class_bounds += [midpoint_i_b]
+            inter_class_bounds += spike_isolating_quantile_with_slices(
+                                                     data[spike_data_index_b + 1:]
+                                                    ,extra_classes_b + 1
+                                                    ,options = options
+                                                    )
+    else:
+        inter_class_bounds = quantile_l_to_r(data, num_classes, options)
+    return inter_class_bounds
+
+
+def synthetic_data(size, seed = 0):
+    #type(int, int) -> list
+    """ Sorted data resembling sDNA results: a large spike of zeros, 
+        a few smaller spikes, and a long tailed continuous distribution.  
+    """
+    rng = random.Random(seed)
+    spikes = (0, 0, 0, 1.0, 5.5, 12.25)
+    data = [rng.choice(spikes) if rng.random() < 0.3 else rng.expovariate(0.1)
+            for __ in range(size)
+           ]
+    data.sort()
+    return data
+
+
+def time_it(f, data):
+    #type(function, list) -> float
+    return min(timeit.repeat(lambda : f(data, NUM_CLASSES)
+                            ,number = 1
+                            ,repeat = REPEATS
+                            )
+              )
+
+
+def main(sizes = SIZES):
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter('ignore')
+
+    print('%10s %15s %15s %10s' % ('size', 'slices (s)', 'run ranges (s)', 'speed up'))
+    for size in sizes:
+        data = synthetic_data(size)
+
+        expected = spike_isolating_quantile_with_slices(data, NUM_CLASSES)
+        actual = data_cruncher.spike_isolating_quantile(data, NUM_CLASSES)
+        if expected != actual:
+            raise Exception('Different bounds for size: %s. Expected: %s, got: %s'
+                           % (size, expected, actual)
+                           )
+
+        old = time_it(spike_isolating_quantile_with_slices, data)
+        new = time_it(data_cruncher.spike_isolating_quantile, data)
+        print('%10s %15.4f %15.4f %10.2f' % (size, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -45,24 +45,25 @@ def grid_point_coords(n,m):
         for j in range(m):
             yield j,i
 
-def make_poly_line(x1,y1,x2,y2,store,func,offset=[x,y]):
-    if random_num() > p:
-        x1 += offset[0]; x2 += offset[0];
-        y1 += offset[1]; y2 += offset[1];
-        new_poly_line = [[x1,y1,0], [x2,y2,0]]
-        store += [new_poly_line]
-        func(new_poly_line)
+def poly_line(x1,y1,x2,y2,offset=(x,y)):
+    return [[x1+offset[0],y1+offset[1],0], [x2+offset[0],y2+offset[1],0]]
 
-if go is True:  
+def random_grid_network(N, M, p = p, offset = (x, y), random_num = random_num):
+    """ Yields the poly lines (lists of two [x, y, 0] points) of the edges of
+        an N by M grid, omitting each one with probability p.
+    """
+    for col,row in grid_point_coords(N,M):
+        if col < M-1 and random_num() > p:
+            yield poly_line(col,row,col+1,row,offset)
+        if row < N-1 and random_num() > p:
+            yield poly_line(col,row,col,row+1,offset)
+
+if go is True and __name__ == '__main__':  
     M,N=map( floor,  [M, N] )
     geometries = []
     with shapefile.Writer('test_random_grid.shp', shapeType = shapefile.POLYLINEZ) as w:
         w.field('Name.  ','C')
-        def write_poly_line_to_w(poly_line):
-            w.linez([poly_line])
-            w.record('From ' + ', to '.join(map(str,poly_line)))
-        for col,row in grid_point_coords(N,M):
-                if col < M-1:
-                    make_poly_line(col,row,col+1,row,geometries,write_poly_line_to_w)
-                if row < N-1:
-                    make_poly_line(col,row,col,row+1,geometries,write_poly_line_to_w)
+        for new_poly_line in random_grid_network(N, M):
+            geometries += [new_poly_line]
+            w.linez([new_poly_line])
+            w.record('From ' + ', to '.join(map(str,new_poly_line)))
@@ -33,7 +33,8 @@
     functions and classes used by DataParser and ObjectsRecolourer, 
     plus a type coercer and a format string 'inverter'.
     They rely only on core Python modules, and are independent of Grasshopper
-    and of other sDNA_GH modules.
+    and of other sDNA_GH modules.  If NumPy is importable (it is not in 
+    IronPython) an array backed fast path is also provided for DataParser.
 """
 
 __authors__ = {'James Parrott', 'Crispin Cooper'}
@@ -43,10 +44,14 @@ import logging
 import warnings
 import itertools
 import math
+import bisect
 from numbers import Number
 import collections
 
-from mapclassif_Iron.classifiers import _fisher_jenks_means_without_numpy
+try:
+    import numpy
+except ImportError:
+    numpy = None  # e.g. in IronPython.  The pure Python functions are used.
 
 from .skel.tools.helpers.funcs import itertools # for pairwise if Python < 3.10
 
@@ -485,7 +490,7 @@ def quantile_l_to_r(data
         # When we're considering dividing the remainder into new classes, we
         # only count classes to the left of inter-class bounds in class_bounds
         #logger.debug(num_classes_left)
-        logger.debug('class_bounds == %s' % class_bounds)
+        logger.debug('class_bounds == %s', class_bounds)
 
         if num_classes_left == num_classes_wanted:
             # Initialised correctly, so nothing with to do with 'old val'
@@ -507,10 +512,12 @@ def quantile_l_to_r(data
                                                          ,data_point_below_index
                                                          )
         
-        logger.debug('num_classes_wanted == %s' % num_classes_wanted)
-        logger.debug('data_point_below == %s' % data_point_below
-                    +', candidate_bound == %s, ' % candidate_bound
-                    +', data_point_above == %s' % data_point_above
+        logger.debug('num_classes_wanted == %s', num_classes_wanted)
+        logger.debug('data_point_below == %s, candidate_bound == %s, '
+                    +', data_point_above == %s'
+                    ,data_point_below
+                    ,candidate_bound
+                    ,data_point_above
                     )
 
         if data_point_above - candidate_bound < options.tol:
@@ -613,7 +620,7 @@ def quantile_l_to_r(data
                 ,data_point_above) = data_point_midpoint_and_next(data
                                                                  ,hlb_index
                                                                  )
-                logger.debug('new candidate_bound past highest lower bound == %s' % candidate_bound)
+                logger.debug('new candidate_bound past highest lower bound == %s', candidate_bound)
                 data_point_below_index = hlb_index
                 # Need this to update num_data_points_left in next iteration.
                 #
@@ -658,7 +665,7 @@ def pro_rata(n, N_1, N_2, tol = TOL):
     # N_1 + N_2 = N = n * m + r   0 <= r < n
     #N_1 = m*n_1 + r_1            0 <= r_1 < m
     #N_2 = m*n_2 + r_2            0 <= r_2 < m
-    logger.debug('n = %s, N_1 = %s, N_2 = %s' % (n, N_1, N_2))
+    logger.debug('n = %s, N_1 = %s, N_2 = %s', n, N_1, N_2)
     not_numbers = [x for x in (n, N_1, N_2) if not isinstance(x, Number) ]
     if not_numbers:
         msg = 'All args need to be numbers. Invalid args: %s' % not_numbers
@@ -685,17 +692,17 @@ def pro_rata(n, N_1, N_2, tol = TOL):
 
     n_1, n_2 = N_1 / m, N_2 / m
     r_1, r_2 = N_1 - int(n_1) *m, N_2 - int(n_2) * m
-    logger.debug('m == %s, n_1 == %s, r_1 == %s, n_2 == %s, r_2 == %s' % (m, n_1, r_1, n_2, r_2))
+    logger.debug('m == %s, n_1 == %s, r_1 == %s, n_2 == %s, r_2 == %s', m, n_1, r_1, n_2, r_2)
     if N_1 <= m:
         return 1, n-1
     if N_2 <= m:
         return n-1, 1
-    logger.debug('r_1 / n_1 == %s, r_2 / n_2 == %s' % (r_1 / n_1, r_2 / n_2))
+    logger.debug('r_1 / n_1 == %s, r_2 / n_2 == %s', r_1 / n_1, r_2 / n_2)
     if (r_1 / n_1) >= (r_2 / n_2):
         retvals = n - int(n_2), int(n_2)
     else:
         retvals = int(n_1), n - int(n_1)
-    logger.debug('pro_rata retvals (n_1, n_2) == %s, %s' % retvals)
+    logger.debug('pro_rata retvals (n_1, n_2) == %s, %s', *retvals)
     return retvals
 
 
@@ -708,6 +715,100 @@ class SpikeIsolatingQuantileOptions(object):
     tol = TOL
 
 
+class SequenceView(object):
+    """ Read only view of data[start:stop], for a Sequence data, that 
+        supports len and indexing with ints, without copying data.  
+    """
+
+    def __init__(self, data, start = 0, stop = None):
+        #type(Sequence, int, int) -> None
+        if stop is None:
+            stop = len(data)
+        self.data = data
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        #type(int) -> type[any]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('SequenceView index out of range: %s' % index)
+        return self.data[self.start + index]
+
+    def __repr__(self):
+        return '%s(data, start = %s, stop = %s)' % (self.__class__.__name__
+                                                   ,self.start
+                                                   ,self.stop
+                                                   )
+
+
+def run_length_encode(data):
+    #type(Iterable[Number]) -> list, list, list
+    """ Returns the distinct values of sorted data (in order), how many 
+        times each is repeated, and the index in data of the first of 
+        each (with len(data) appended to the offsets).  
+    """
+    values, counts = [], []
+    for x in data:
+        if values and x == values[-1]:
+            counts[-1] += 1
+        else:
+            values.append(x)
+            counts.append(1)
+    return values, counts, cumulative_offsets(counts)
+
+
+def cumulative_offsets(counts):
+    #type(Iterable[int]) -> list
+    offsets = [0]
+    for count in counts:
+        offsets.append(offsets[-1] + count)
+    return offsets
+
+
+def max_run_interval_lt_width_w_with_most_data_points(values
+                                                     ,counts
+                                                     ,start
+                                                     ,stop
+                                                     ,min_num_of_data_pts
+                                                     ,w = TOL
+                                                     ):
+    #type(list, list, int, int, Number, Number) -> InclusiveInterval
+    """ max_interval_lt_width_w_with_most_data_points, on the 
+        runs values[start:stop] (with frequencies counts[start:stop]) 
+        of a run length encoding of sorted data, without copying them 
+        into a new OrderedCounter.  The indices of the returned 
+        InclusiveInterval are indices of values, not relative to start. 
+    """
+    if start >= stop:
+        return None
+    i_a = i_b = start
+    a = b = values[start]
+    num_data_points = counts[start]
+
+    interval = InclusiveInterval(a, i_a, b, i_b, num_data_points)
+
+    for i_b in range(start + 1, stop):
+        b = values[i_b]
+        num_data_points += counts[i_b]
+        while b - a > w:
+            num_data_points -= counts[i_a]
+            i_a += 1
+            a = values[i_a]
+
+        if num_data_points > interval.num_data_points: 
+            # stick with first if equal
+            interval = InclusiveInterval(a, i_a, b, i_b, num_data_points) 
+
+    if interval.num_data_points > min_num_of_data_pts:
+        return interval
+    return None
+
+
 def spike_isolating_quantile(data
                             ,num_classes
                             ,ordered_counter = None
@@ -729,84 +830,93 @@ def spike_isolating_quantile(data
         within each sub-Sequence using quantile_l_to_r.  The lists of 
         inter-class bounds returned by these recursive calls are appended 
         together and returned.  
+
+        The sub-Sequences are ranges of runs of one run length encoding 
+        of data, shared by all the recursive calls, so data is neither 
+        copied nor searched for the spikes' indices.  
     """
     if ordered_counter is None:
-        ordered_counter = OrderedCounter(data)
-    logger.debug(ordered_counter)
-    num_inter_class_bounds = num_classes - 1
-    if num_inter_class_bounds <= 0:
-        return []
-    if num_inter_class_bounds == 1:
-        return quantile_l_to_r(data, num_inter_class_bounds + 1, options)
-    inter_class_bounds = []
-    if num_inter_class_bounds >= 2:
-        if options.min_num is None:
-            min_num = len(data) // num_classes
+        values, counts, offsets = run_length_encode(data)
+    else:
+        values = list(ordered_counter.keys())
+        counts = list(ordered_counter.values())
+        offsets = cumulative_offsets(counts)
+
+    def classify_runs(start, stop, num_classes):
+        #type(int, int, int) -> list
+        # Classifies data[offsets[start]:offsets[stop]], i.e. the data 
+        # points in the runs values[start:stop].
+        data_start, data_stop = offsets[start], offsets[stop]
+        num_data_points = data_stop - data_start
+        if (data_start, data_stop) == (0, len(data)):
+            sub_data = data
         else:
-            min_num = options.min_num
-        logger.debug('min_num == %s' % min_num)
-        logger.debug('max_width == %s ' % options.max_width)
-        logger.debug('data == %s,...,%s' % (tuple(data[:4]), tuple(data[-4:])))
-        logger.debug('len(data) == %s ' % len(data))
-        spike_interval = max_interval_lt_width_w_with_most_data_points(ordered_counter
-                                                                      ,min_num
-                                                                      ,w = options.max_width
-                                                                      )
-        if spike_interval:
-            logger.debug('num_classes - 1 == %s' % (num_classes - 1))
-            logger.debug('index_a (in OrderedCounter)== %s' % spike_interval.index_a)
-            logger.debug('index_b (in OrderedCounter) == %s' % spike_interval.index_b)
-            spike_data_index_a = data.index(ordered_counter.keys()[spike_interval.index_a])
-            spike_data_index_b = tuple(reversed(data)).index(ordered_counter.keys()[spike_interval.index_b])
-            spike_data_index_b = len(data) - 1 - spike_data_index_b
-            logger.debug('spike_data_index_a == %s' % spike_data_index_a)
-            logger.debug('spike_data_index_b == %s' % spike_data_index_b)
-            if (num_classes - 3 <= 0 or 
-               (spike_data_index_a == 0 and spike_data_index_b == len(data)- 1)):
-                extra_classes_a, extra_classes_b = 0, 0
-            else:
-                logger.debug('n == %s, N_1 == %s, N_2 == %s ' %   (num_classes - 3
-                                                           ,spike_data_index_a
-                                                           ,len(data) - spike_data_index_b - 1
-                                                           )
-                            )
-                extra_classes_a, extra_classes_b = pro_rata(num_classes - 3
-                                                           ,spike_data_index_a
-                                                           ,len(data) - spike_data_index_b - 1
-                                                           ,tol = options.tol
-                                                           )
-            logger.debug('extra_classes_a == %s, extra_classes_b == %s' % (extra_classes_a, extra_classes_b))
-            inter_class_bounds = []
-            if spike_data_index_a >= 1:
-                __, midpoint_i_a, __ = data_point_midpoint_and_next(data
-                                                                  ,spike_data_index_a - 1
-                                                                  )
-                logger.debug('midpoint_i_a == %s' % midpoint_i_a)
-                inter_class_bounds += spike_isolating_quantile(data[:spike_data_index_a]
-                                                              ,extra_classes_a + 1
-                                                              ,options = options
-                                                              ) 
-                inter_class_bounds += [midpoint_i_a]
-                logger.debug('left of a inter_class_bounds == %s ' % inter_class_bounds)
-            if spike_data_index_b <= len(data) - 2:
-
-                __, midpoint_i_b, __ = data_point_midpoint_and_next(data
-                                                                  ,spike_data_index_b
-                                                                  )
-                logger.debug('midpoint_i_b == %s' % midpoint_i_b)
-                inter_class_bounds += [midpoint_i_b]
-                inter_class_bounds += spike_isolating_quantile(data[spike_data_index_b + 1:]
-                                                              ,extra_classes_b + 1
-                                                              ,options = options
-                                                              )
-                logger.debug('right of b inter_class_bounds == %s ' % inter_class_bounds)
-
-
+            sub_data = SequenceView(data, data_start, data_stop)
 
+        num_inter_class_bounds = num_classes - 1
+        if num_inter_class_bounds <= 0:
+            return []
+        if num_inter_class_bounds == 1:
+            return quantile_l_to_r(sub_data, num_inter_class_bounds + 1, options)
 
+        if options.min_num is None:
+            min_num = num_data_points // num_classes
+        else:
+            min_num = options.min_num
+        logger.debug('min_num == %s, max_width == %s, data indices: [%s, %s)' 
+                    ,min_num, options.max_width, data_start, data_stop
+                    )
+        spike_interval = max_run_interval_lt_width_w_with_most_data_points(
+                                                         values
+                                                        ,counts
+                                                        ,start
+                                                        ,stop
+                                                        ,min_num
+                                                        ,w = options.max_width
+                                                        )
+        if not spike_interval:
+            return quantile_l_to_r(sub_data, num_classes, options)
+
+        # Indices in sub_data of the first and last data points in the spike
+        spike_data_index_a = offsets[spike_interval.index_a] - data_start
+        spike_data_index_b = offsets[spike_interval.index_b + 1] - 1 - data_start
+        logger.debug('spike_data_index_a == %s, spike_data_index_b == %s' 
+                    ,spike_data_index_a, spike_data_index_b
+                    )
+        if (num_classes - 3 <= 0 or 
+           (spike_data_index_a == 0 and spike_data_index_b == num_data_points - 1)):
+            extra_classes_a, extra_classes_b = 0, 0
         else:
-            inter_class_bounds = quantile_l_to_r(data, num_classes, options)
-    return inter_class_bounds
+            extra_classes_a, extra_classes_b = pro_rata(num_classes - 3
+                                                       ,spike_data_index_a
+                                                       ,num_data_points - spike_data_index_b - 1
+                                                       ,tol = options.tol
+                                                       )
+        logger.debug('extra_classes_a == %s, extra_classes_b == %s', extra_classes_a, extra_classes_b)
+
+        inter_class_bounds = []
+        if spike_data_index_a >= 1:
+            __, midpoint_i_a, __ = data_point_midpoint_and_next(sub_data
+                                                              ,spike_data_index_a - 1
+                                                              )
+            inter_class_bounds += classify_runs(start
+                                               ,spike_interval.index_a
+                                               ,extra_classes_a + 1
+                                               )
+            inter_class_bounds += [midpoint_i_a]
+        if spike_data_index_b <= num_data_points - 2:
+            __, midpoint_i_b, __ = data_point_midpoint_and_next(sub_data
+                                                              ,spike_data_index_b
+                                                              )
+            inter_class_bounds += [midpoint_i_b]
+            inter_class_bounds += classify_runs(spike_interval.index_b + 1
+                                               ,stop
+                                               ,extra_classes_b + 1
+                                               )
+        logger.debug('inter_class_bounds == %s ', inter_class_bounds)
+        return inter_class_bounds
+
+    return classify_runs(0, len(values), num_classes)
     
             
 def max_and_min_are_valid(max_, min_):
@@ -817,6 +927,91 @@ def max_and_min_are_valid(max_, min_):
            )
 
 
+class ClassLookup(object):
+    """ Breakpoint table, built once from a list of inter-class bounds, 
+        that finds the class of a data point (and its class's midpoint) 
+        by binary search, in O(log k) for k classes.  
+        
+        Classes include their lower bound, i.e. the class with index i 
+        is [lower_bounds[i], upper_bounds[i]), except the first and last 
+        classes, which contain everything below and above the lowest and 
+        highest inter-class bounds respectively.  
+    """
+
+    def __init__(self, inter_class_bounds, x_min, x_max):
+        #type(Iterable[Number], Number, Number) -> None
+        self.inter_class_bounds = sorted(inter_class_bounds)
+        self.x_min = x_min
+        self.x_max = x_max
+        self.lower_bounds = [x_min] + self.inter_class_bounds
+        self.upper_bounds = self.inter_class_bounds + [x_max]
+        self.mid_points = [0.5*(upper + lower) 
+                           for lower, upper in zip(self.lower_bounds
+                                                  ,self.upper_bounds
+                                                  )
+                          ]
+
+    def __len__(self):
+        #type() -> int
+        """ The number of classes.  """
+        return len(self.mid_points)
+
+    def class_index(self, x):
+        #type(Number) -> int
+        return bisect.bisect_right(self.inter_class_bounds, x)
+
+    def class_mid_point(self, x):
+        #type(Number) -> float
+        return self.mid_points[self.class_index(x)]
+
+    def classes(self):
+        #type() -> Iterator[tuple[Number, float, Number]]
+        """ Lower bound, midpoint and upper bound of each class in turn.  """
+        return zip(self.lower_bounds, self.mid_points, self.upper_bounds)
+
+
+class LookupTable(object):
+    """ The values of f at num_entries evenly spaced points from x_min to 
+        x_max, computed once (e.g. a colour ramp's colours), so that f(x) 
+        is approximated by the entry nearest x, in O(1) with no calls to f.
+        Each entry is the same object every time it is returned.  
+        
+        Outside [x_min, x_max], f itself is called (so any extrapolation 
+        by f is unchanged).  
+    """
+
+    def __init__(self, f, x_min, x_max, num_entries = 1024):
+        #type(function, Number, Number, int) -> None
+        check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+        if num_entries < 2:
+            msg = 'num_entries: %s must be at least 2' % num_entries
+            logger.error(msg)
+            raise ValueError(msg)
+        self.f = f
+        self.x_min = x_min
+        self.x_max = x_max
+        self.max_index = num_entries - 1
+        step = (x_max - x_min) / float(self.max_index)
+        self.scale = 1 / step
+        self.entries = [f(x_min + i * step) for i in range(self.max_index)]
+        self.entries.append(f(x_max))
+
+    def __len__(self):
+        #type() -> int
+        return len(self.entries)
+
+    def index(self, x):
+        #type(Number) -> int
+        """ Index of the entry nearest x, for x_min <= x <= x_max. """
+        return int((x - self.x_min) * self.scale + 0.5)
+
+    def __call__(self, x):
+        #type(Number) -> type[any]
+        if self.x_min <= x <= self.x_max:
+            return self.entries[self.index(x)]
+        return self.f(x)
+
+
 def geometric(
          data
         ,num_classes
@@ -857,9 +1052,271 @@ def geometric(
 
 
 
+class FisherJenksOptions(object):
+    max_points = 1000 # More distinct data values than this are pre-binned
+                      # before the O(k*n^2) dynamic program is run.  
+                      # None or 0 => never pre-bin.
+    use_numpy = True  # Only used if NumPy can be imported.
+
+
+def weighted_histogram(ordered_counter, max_points = None):
+    #type(OrderedCounter, int) -> list, list, list, list
+    """ Merges consecutive distinct values in a frequency distribution 
+        (e.g. an OrderedCounter of sorted data) into at most max_points 
+        bins, of roughly equal numbers of data points.  Returns the 
+        weighted mean value of each bin, the number of data 
+        points in it, and its lowest and highest values.  
+    """
+    items = sorted(ordered_counter.items())
+
+    if not max_points or len(items) <= max_points:
+        values = [value for value, __ in items]
+        return values, [count for __, count in items], values, values
+
+    bin_size = sum(count for __, count in items) / float(max_points)
+
+    sums, weights, lows, highs = [], [], [], []
+    num_data_points = 0
+    for value, count in items:
+        if not weights or num_data_points >= len(weights) * bin_size:
+            sums.append(0)
+            weights.append(0)
+            lows.append(value)
+            highs.append(value)
+        sums[-1] += count * value
+        weights[-1] += count
+        highs[-1] = value
+        num_data_points += count
+
+    means = [sum_ / float(weight) for sum_, weight in zip(sums, weights)]
+    return means, weights, lows, highs
+
+
+def fisher_jenks_class_starts_without_numpy(values, weights, num_classes):
+    #type(Sequence[Number], Sequence[Number], int) -> list
+    """ Fisher's dynamic program for Jenks' natural breaks, generalised 
+        to weighted values, and otherwise as in mapclassif_Iron's
+        _fisher_jenks_means_without_numpy.  values must be sorted.
+
+        Returns the table of 1-based indices of the first value in the 
+        last class, of the optimal classification of values[:l] into j 
+        classes, for row l and column j.  
+    """
+    n = len(values)
+    inf = float('inf')
+    class_starts = [[0] * (num_classes + 1) for __ in range(n + 1)]
+    variances = [[0.0] * (num_classes + 1) for __ in range(n + 1)]
+
+    for j in range(1, num_classes + 1):
+        class_starts[1][j] = 1
+        for i in range(2, n + 1):
+            variances[i][j] = inf
+
+    v = 0.0
+    for l in range(2, n + 1):
+        s1 = s2 = w = 0.0
+        starts_l, variances_l = class_starts[l], variances[l]
+        for i3 in range(l, 0, -1):
+            val, weight = values[i3 - 1], weights[i3 - 1]
+            s2 += weight * val * val
+            s1 += weight * val
+            w += weight
+            v = s2 - (s1 * s1) / w
+            i4 = i3 - 1
+            if i4 != 0:
+                variances_i4 = variances[i4]
+                for j in range(2, num_classes + 1):
+                    if variances_l[j] >= v + variances_i4[j - 1]:
+                        starts_l[j] = i3
+                        variances_l[j] = v + variances_i4[j - 1]
+        starts_l[1] = 1
+        variances_l[1] = v
+
+    return class_starts
+
+
+def fisher_jenks_class_starts_numpy(values, weights, num_classes):
+    #type(Sequence[Number], Sequence[Number], int) -> list
+    """ As fisher_jenks_class_starts_without_numpy, but the inner loops 
+        (over the first value in the last class, and over the number of 
+        classes) are vectorised using the cumulative sums of 
+        values.  Requires NumPy.
+    """
+    n = len(values)
+    x = numpy.asarray(values, dtype = float)
+    w = numpy.asarray(weights, dtype = float)
+    zero = numpy.zeros(1)
+    S1 = numpy.concatenate((zero, numpy.cumsum(w * x)))
+    S2 = numpy.concatenate((zero, numpy.cumsum(w * x * x)))
+    W = numpy.concatenate((zero, numpy.cumsum(w)))
+
+    class_starts = numpy.ones((n + 1, num_classes + 1), dtype = int)
+    variances = numpy.zeros((n + 1, num_classes + 1))
+    columns = numpy.arange(num_classes - 1)
+
+    for l in range(2, n + 1):
+        i3 = numpy.arange(2, l + 1)
+        s1 = S1[l] - S1[i3 - 1]
+        v = (S2[l] - S2[i3 - 1]) - s1 * s1 / (W[l] - W[i3 - 1])
+        candidates = v[:, None] + variances[i3 - 1, 1:num_classes]
+        # argmin returns the first minimum, i.e. the lowest i3, as 
+        # the >= comparison does in the pure Python version.
+        best = numpy.argmin(candidates, axis = 0)
+        variances[l, 2:] = candidates[best, columns]
+        class_starts[l, 2:] = i3[best]
+        variances[l, 1] = S2[l] - S1[l] * S1[l] / W[l]
+
+    return class_starts.tolist()
+
+
 def fisher_jenks(
              data
             ,num_classes
             ,options = None
             ):
-    return _fisher_jenks_means_without_numpy(data, num_classes)
\ No newline at end of file
+    #type(Iterable[Number], int, NamedTuple) -> list
+    """ Jenks natural breaks (Fisher's exact optimal classification), 
+        returning inter-class bounds midway between the highest value
+        in each class and the lowest value in the next one.  
+        
+        The dynamic program is run on the weighted histogram of distinct 
+        data values (pre-binned if there are more than options.max_points
+        of them), so that classes never split repeated values, and is 
+        vectorised with NumPy if possible.  
+    """
+    if options is None:
+        options = FisherJenksOptions
+
+    values, weights, lows, highs = weighted_histogram(OrderedCounter(data)
+                                                     ,options.max_points
+                                                     )
+    num_classes = min(num_classes, len(values))
+    if num_classes <= 1:
+        return []
+
+    if options.use_numpy and numpy is not None:
+        class_starts = fisher_jenks_class_starts_numpy(values, weights, num_classes)
+    else:
+        class_starts = fisher_jenks_class_starts_without_numpy(values, weights, num_classes)
+
+    # Indices of the highest value in each class but the last.
+    class_ends = set()
+    l = len(values)
+    for j in range(num_classes, 1, -1):
+        start = class_starts[l][j]
+        if start < 2:
+            # No more values left for the lower classes.
+            break
+        class_ends.add(start - 2)
+        l = start - 1
+
+    return [0.5*(highs[i] + lows[i + 1]) for i in sorted(class_ends)]
+
+
+def array_log_spline(x, x_min, base, x_max, y_min, y_max):
+    # type(numpy.ndarray, Number, Number, Number, Number, Number) -> numpy.ndarray
+    """ log_spline, vectorised over a NumPy array of x.  """
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    log_2 = math.log(2, base)
+
+    # math.log(y, base) == math.log(y) / math.log(base)
+    return y_min + (y_max / log_2) * (numpy.log(1 + ((x-x_min)/(x_max-x_min)))
+                                      / math.log(base)
+                                     )
+
+
+# linearly_interpolate and exp_spline only use arithmetic operators (and 
+# pow), so already broadcast over NumPy arrays.
+array_splines = dict(splines, logarithmic = array_log_spline)
+
+
+class ArrayData(object):
+    """ Array backed alternative to the OrderedDict of data values built 
+        by DataParser, supporting the parts of its interface DataParser 
+        uses (len, keys, values and items).  The values are kept in a 
+        contiguous float array (self.array), in parallel to a list of 
+        their keys, so that they can be sorted and renormalised in 
+        batches.  Requires NumPy.
+    """
+
+    def __init__(self, keys, values):
+        #type(Iterable, Iterable[Number]) -> None
+        if numpy is None:
+            msg = 'NumPy is required for ArrayData, but could not be imported. '
+            logger.error(msg)
+            raise ImportError(msg)
+
+        self._keys = list(keys)
+        self._values = list(values)
+
+        if len(self._keys) != len(self._values):
+            msg = 'Got %s keys but %s values. ' 
+            msg %= (len(self._keys), len(self._values))
+            logger.error(msg)
+            raise ValueError(msg)
+
+        # Strings (e.g. from User Text) would be sorted differently
+        # to Numbers by the pure Python path, so must be rejected here.
+        not_numbers = [x for x in self._values if not isinstance(x, Number)]
+        if not_numbers:
+            msg = 'All values need to be Numbers.  Invalid values: %s' 
+            msg %= not_numbers[:3]
+            logger.error(msg)
+            raise TypeError(msg)
+
+        self.array = numpy.asarray(self._values, dtype = float)
+
+    @classmethod
+    def from_dict(cls, dict_):
+        #type(type[cls], dict) -> ArrayData
+        return cls(dict_.keys(), dict_.values())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        #type() -> list
+        return self._keys
+
+    def values(self):
+        #type() -> list
+        # The original Python Numbers are returned until the array is changed.
+        if self._values is None:
+            self._values = self.array.tolist()
+        return self._values
+
+    def items(self):
+        #type() -> list
+        return list(zip(self._keys, self.values()))
+
+    def sort(self):
+        #type() -> None
+        """ Sorts keys and values in ascending order of values.  Like 
+            sorted, this sort is stable (equal values keep their order).  
+        """
+        order = numpy.argsort(self.array, kind = 'mergesort').tolist()
+        self._keys = [self._keys[i] for i in order]
+        if self._values is not None:
+            self._values = [self._values[i] for i in order]
+        self.array = self.array[order]
+
+    def _set_array(self, array):
+        self.array = array
+        self._values = None
+
+    def apply_spline(self, spline, x_min, x_mid, x_max, y_min, y_max):
+        #type(function, Number, Number, Number, Number, Number) -> None
+        """ Replaces all values with spline(value, ...), in one batch.  
+            spline must support NumPy arrays, e.g. from array_splines.
+        """
+        self._set_array(spline(self.array, x_min, x_mid, x_max, y_min, y_max))
+
+    def replace_with_class_mid_points(self, class_lookup):
+        #type(ClassLookup) -> None
+        """ Replaces each value with the midpoint of its class, 
+            vectorising class_lookup.class_mid_point.  
+        """
+        bounds = numpy.asarray(class_lookup.inter_class_bounds, dtype = float)
+        mid_points = numpy.asarray(class_lookup.mid_points, dtype = float)
+        class_indices = numpy.searchsorted(bounds, self.array, side = 'right')
+        self._set_array(mid_points[class_indices])
@@ -37,10 +37,13 @@ import itertools
 import collections
 if hasattr(collections, 'Iterable'):
     Iterable = collections.Iterable 
+    Mapping, MutableMapping = collections.Mapping, collections.MutableMapping
 else:
     import collections.abc
     Iterable = collections.abc.Iterable
+    Mapping, MutableMapping = collections.abc.Mapping, collections.abc.MutableMapping
 import warnings
+from array import array
 
 import Rhino
 import Grasshopper
@@ -55,7 +58,19 @@ try:
 except NameError:
     basestring = str
     
+try:
+    integer_types = (int, long) #type: ignore
+except NameError:
+    integer_types = (int,)
+
 OrderedDict = collections.OrderedDict
+izip = getattr(itertools, 'izip', zip)
+
+try:
+    array('q') # 8 byte ints.  'l' is only 4 bytes on Windows.
+    INT_TYPECODE = 'q'
+except ValueError: # Python 2 has no 'q'.
+    INT_TYPECODE = 'l'
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -132,7 +147,7 @@ class GeomDataMapping(OrderedDict):
         # This check won't allow legend tags through. Later functions 
         # must handle invalid geometry
         # 
-        logger.debug(str(Data))
+        logger.debug('Data == %s', Data)
         if (Data in [[], None, [None]] or
             getattr(Data,'BranchCount',999)==0):
             Data = OrderedDict()
@@ -168,8 +183,8 @@ class GeomDataMapping(OrderedDict):
             # same as any other list below:
 
 
-        logger.debug('len(Geom) == %s' % len(Geom))
-        logger.debug('len(Data) == %s' % len(Data))
+        logger.debug('len(Geom) == %s', len(Geom))
+        logger.debug('len(Data) == %s', len(Data))
 
 
 
@@ -200,6 +215,317 @@ class GeomDataMapping(OrderedDict):
 
 
 
+class Missing(object):
+    """ Placeholder in a column, for an object without that field. """
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = Missing()
+
+
+def array_typecode(value):
+    #type(type[any]) -> str / None
+    """ The typecode of an array column for value's type (floats or 
+        ints, not bools), or None if value needs a list column.
+    """
+    if isinstance(value, float):
+        return 'd'
+    if isinstance(value, integer_types) and not isinstance(value, bool):
+        return INT_TYPECODE
+    return None
+
+
+def put_in_column(column, value, index = None):
+    #type(array / list, type[any], int) -> array / list
+    """ Appends value to column (or sets it at index).  An array column is
+        widened to a list first if value is of another type, or overflows
+        it.  Returns the column (the new list, if widened).
+    """
+    if isinstance(column, array):
+        if array_typecode(value) == column.typecode:
+            try:
+                if index is None:
+                    column.append(value)
+                else:
+                    column[index] = value
+                return column
+            except OverflowError:
+                pass
+        column = list(column)
+    if index is None:
+        column.append(value)
+    else:
+        column[index] = value
+    return column
+
+
+def new_column(length, value = MISSING):
+    #type(int, type[any]) -> array / list
+    """ A column of length, ending with value, and otherwise MISSING. """
+    typecode = array_typecode(value)
+    if length == 1 and typecode is not None:
+        try:
+            return array(typecode, [value])
+        except OverflowError:
+            pass
+    column = [MISSING] * length
+    column[-1] = value
+    return column
+
+
+class ColumnarRow(MutableMapping):
+    """ View of one object's fields in a ColumnarGeomDataMapping.  Writes
+        go straight to the columns.  Views of objects after a deleted one 
+        are invalid.
+    """
+    __slots__ = ('gdm', 'index')
+
+    def __init__(self, gdm, index):
+        self.gdm = gdm
+        self.index = index
+
+    def __getitem__(self, field):
+        value = self.gdm.columns[field][self.index]
+        if value is MISSING:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field, value):
+        self.gdm.set_value(self.index, field, value)
+
+    def __delitem__(self, field):
+        self[field] # raises KeyError if missing
+        self.gdm.set_value(self.index, field, MISSING)
+
+    def __iter__(self):
+        index = self.index
+        for field, column in self.gdm.columns.items():
+            if column[index] is not MISSING:
+                yield field
+
+    def __len__(self):
+        return sum(1 for __ in self)
+
+    def copy(self):
+        return OrderedDict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+class ColumnarGeomDataMapping(GeomDataMapping):
+    """ A GeomDataMapping that stores the values of each field of the
+        objects' data in a column (an array of floats or ints, if they all
+        are, else a list), instead of in a dict for each object.  Each key maps 
+        to its row number in the columns.  
+        
+        The values are ColumnarRows, mutable views of the columns, 
+        so existing code for GeomDataMappings of dicts also works on these.
+        Only Mappings can be values.  
+    """
+
+    def __init__(self, keys_and_vals = ()):
+        #type(Iterable) -> None
+        self.columns = OrderedDict()
+        super(ColumnarGeomDataMapping, self).__init__(keys_and_vals)
+
+    @classmethod
+    def from_columns(cls, keys, columns):
+        #type(Iterable, dict) -> ColumnarGeomDataMapping
+        """ Uses the columns (arrays or lists, all as long as keys) 
+            without copying them.
+        """
+        gdm = cls()
+        for index, key in enumerate(keys):
+            OrderedDict.__setitem__(gdm, key, index)
+        for field, column in columns.items():
+            if len(column) != len(gdm):
+                msg = 'Column: %s has %s values, not %s' % (field, len(column), len(gdm))
+                logger.error(msg)
+                raise ValueError(msg)
+            gdm.columns[field] = column
+        return gdm
+
+    def row(self, key):
+        return ColumnarRow(self, OrderedDict.__getitem__(self, key))
+
+    def __getitem__(self, key):
+        return self.row(key)
+
+    def get(self, key, default = None):
+        if key in self:
+            return self.row(key)
+        return default
+
+    def set_value(self, index, field, value):
+        #type(int, str, type[any]) -> None
+        if field not in self.columns:
+            self.columns[field] = new_column(len(self))
+        self.columns[field] = put_in_column(self.columns[field], value, index)
+
+    def __setitem__(self, key, row):
+        if not isinstance(row, Mapping):
+            msg = ('Only Mappings can be values in a ColumnarGeomDataMapping. '
+                  +'Got: %s for key: %s ' % (row, key)
+                  )
+            logger.error(msg)
+            raise TypeError(msg)
+        if key in self:
+            index = OrderedDict.__getitem__(self, key)
+            for field in self.columns:
+                self.set_value(index, field, row.get(field, MISSING))
+            for field, value in row.items():
+                self.set_value(index, field, value)
+            return
+        index = len(self)
+        values = dict(row.items())
+        columns = self.columns
+        for field, column in columns.items():
+            value = values.pop(field, MISSING)
+            if (not isinstance(column, array) or 
+                (value.__class__ is float and column.typecode == 'd')):
+                #
+                column.append(value)
+            else:
+                columns[field] = put_in_column(column, value)
+        if values:
+            for field, value in row.items():
+                if field in values:
+                    columns[field] = new_column(index + 1, value)
+        OrderedDict.__setitem__(self, key, index)
+
+    def __delitem__(self, key):
+        index = OrderedDict.__getitem__(self, key)
+        OrderedDict.__delitem__(self, key)
+        for column in self.columns.values():
+            del column[index]
+        for new_index, later_key in enumerate(list(self)[index:], start = index):
+            OrderedDict.__setitem__(self, later_key, new_index)
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        retval = self.row(key).copy()
+        del self[key]
+        return retval
+
+    def popitem(self, last = True):
+        if not self:
+            raise KeyError('popitem(): ColumnarGeomDataMapping is empty')
+        key = next(reversed(self)) if last else next(iter(self))
+        return key, self.pop(key)
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [ColumnarRow(self, index) for index in range(len(self))]
+
+    def items(self):
+        return [(key, ColumnarRow(self, index)) for index, key in enumerate(self)]
+
+    def itervalues(self):
+        return (ColumnarRow(self, index) for index in range(len(self)))
+
+    def iteritems(self):
+        return ((key, ColumnarRow(self, index)) for index, key in enumerate(self))
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return list(self.keys()) == list(other.keys()) and all(
+               row == other[key] for key, row in self.iteritems()
+               )
+
+    def __ne__(self, other):
+        retval = self.__eq__(other)
+        return retval if retval is NotImplemented else not retval
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__
+                          ,[(key, row.copy()) for key, row in self.iteritems()]
+                          )
+
+    def copy(self):
+        return self.__class__.from_columns(self
+                                          ,OrderedDict((field, column[:]) 
+                                                       for field, column in self.columns.items()
+                                                      )
+                                          )
+
+    def column(self, field):
+        #type(str) -> array / list
+        """ The field's column itself (not a copy), in the same order as 
+            the keys.  Objects without that field have MISSING in it.  
+        """
+        return self.columns[field]
+
+    def has_complete_column(self, field):
+        #type(str) -> bool
+        """ True if every object has a value for field. """
+        column = self.columns.get(field)
+        if column is None:
+            return False
+        return isinstance(column, array) or all(value is not MISSING for value in column)
+
+    def column_items(self, field):
+        #type(str) -> Iterator[tuple]
+        """ (key, value) of field for each object that has one. """
+        return ((key, value) 
+                for key, value in izip(self, self.columns[field]) 
+                if value is not MISSING
+               )
+
+    def project(self, fields):
+        #type(Iterable[str]) -> ColumnarGeomDataMapping
+        """ A ColumnarGeomDataMapping of the same keys, and only fields, 
+            sharing their columns with self (don't mutate either). 
+        """
+        return self.__class__.from_columns(self
+                                          ,OrderedDict((field, self.columns[field])
+                                                       for field in fields
+                                                      )
+                                          )
+
+    def slice(self, start = None, stop = None):
+        #type(int, int) -> ColumnarGeomDataMapping
+        return self.__class__.from_columns(list(self)[start:stop]
+                                          ,OrderedDict((field, column[start:stop]) 
+                                                       for field, column in self.columns.items()
+                                                      )
+                                          )
+
+    def merge(self, other):
+        #type(Mapping) -> ColumnarGeomDataMapping
+        """ Adds other's keys and values to self, (overriding any existing 
+            keys' values), extending whole columns at once if other is a 
+            ColumnarGeomDataMapping.  Returns self.  
+        """
+        if (not isinstance(other, ColumnarGeomDataMapping) or
+            any(key in self for key in other)):
+            #
+            self.update(other)
+            return self
+        num_rows, num_other_rows = len(self), len(other)
+        for field in other.columns:
+            if field not in self.columns:
+                self.columns[field] = [MISSING] * num_rows
+        for field, column in self.columns.items():
+            other_column = other.columns.get(field)
+            if other_column is None:
+                other_column = [MISSING] * num_other_rows
+            if (isinstance(column, array) and 
+                getattr(other_column, 'typecode', None) != column.typecode):
+                #
+                column = self.columns[field] = list(column)
+            column.extend(other_column)
+        for index, key in enumerate(other, start = num_rows):
+            OrderedDict.__setitem__(self, key, index)
+        return self
+
+
 def is_gdm(x):
     return isinstance(x, GeomDataMapping)
 
@@ -257,7 +583,7 @@ def nested_lists_of_keys_and_values_or_values(dict_):
 
 def DataTree_and_list_from_dict(nested_dict):
     # type(dict) -> Grasshopper.DataTree[object], list
-    if all(isinstance(val, dict) for val in nested_dict.values()):    
+    if all(isinstance(val, Mapping) for val in nested_dict.values()):    
         # User_Text_Keys = [list(group_dict.keys()) # list() for Python 3
         #                   for group_dict in nested_dict.values()
         #                  ]
@@ -276,7 +602,7 @@ def DataTree_and_list_from_dict(nested_dict):
     #layerTree = []
 
 def keys_and_values_lists_if_nested_dict_else_values(dict_):
-    if all(isinstance(val, dict) for val in dict_.values()):
+    if all(isinstance(val, Mapping) for val in dict_.values()):
         return nested_lists_of_keys_and_values_or_values(dict_) 
     return list(dict_.values())
 
@@ -324,12 +650,12 @@ def override_gdm(lesser, override, merge_subdicts = True):
     for key, val in override.items():
         if (merge_subdicts and
             key in lesser and
-            isinstance(val, dict) and
-            isinstance(lesser[key], dict)):
+            isinstance(val, Mapping) and
+            isinstance(lesser[key], Mapping)):
             #
             lesser[key].update(val)
         else:
-            lesser[key] = val.copy() if isinstance(val, dict) else val
+            lesser[key] = val.copy() if isinstance(val, Mapping) else val
     return lesser
 
 
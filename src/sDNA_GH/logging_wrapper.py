@@ -110,6 +110,57 @@ def set_handler_level(handler, level):
         handler.setLevel(level)
 
 
+def set_logger_level_to_handlers(logger):
+    #type(logging.Logger) -> int
+    """ Raises (or lowers) the logger's level to that of its most verbose
+        (non-null) handler, so logging calls that no handler would emit
+        return straight away from logger.isEnabledFor, before creating
+        a LogRecord.
+    """
+    levels = [handler.level
+              for handler in logger.handlers
+              if not isinstance(handler, logging.NullHandler)
+             ]
+    if levels:
+        # A handler at NOTSET emits everything it's passed.
+        logger.setLevel(min(levels) or logging.DEBUG)
+    return logger.level
+
+
+def debug_enabled(logger):
+    #type(logging.Logger) -> bool
+    """ Fast path guard for debug messages that are expensive to build,
+        or for logging calls inside loops:
+
+        if debug_enabled(logger):
+            logger.debug('data == %s' % data)
+    """
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+class Lazy(object):
+    """ Defers calling func (and formatting its result) until a handler
+        actually emits the log record it's an argument of, e.g.:
+
+        logger.debug('data == %s', Lazy(lambda: data.items()[:3]))
+
+        The message must be given to the logger with separate args
+        (not pre-formatted with %), for the deferral to work.
+    """
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+    def __repr__(self):
+        return repr(self.func(*self.args, **self.kwargs))
+
+
 def get_existing_file_handler_or_add_new_one(logger, options = LoggingOptions):
     #type:(logging.Logger, LoggingOptions | tuple) -> logging.FileHandler
     dir_name = os.path.join(options.working_folder, options.logs_dir)
@@ -187,6 +238,8 @@ def get_logger_and_handlers(stream = None
                                             )
     else:
         stream_handler = logging.NullHandler()
+
+    set_logger_level_to_handlers(logger)
     
     return logger, file_handler, console_handler, stream_handler 
 
@@ -251,6 +251,7 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
                       ,tools.sDNA_ToolWrapper.Options
                       ,tools.ConfigManager.Options
                       ,AutoRunToolOptions
+                      ,runner.RunToolsOptions
                       ):            
     ###########################################################################
     #Operating System
@@ -287,6 +288,13 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     #
     ##########################################################################
     #
+    # Overrides for .skel.tools.runner
+    #
+    record_timings = False # Output timings of each tool, and log them.
+    trace_memory = False
+    #
+    ##########################################################################
+    #
     # Overrides for tools.sDNA_ToolWrapper
     #
     prepped_fmt = '{name}_prepped'
@@ -336,10 +344,22 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     uuid_length = 36 # 32 in 5 blocks (2 x 6 & 2 x 5) with 4 separator characters.
     num_dp = 10 # decimal places
     min_sizes = True
+    two_pass = '' # '' => cache all the coerced records in memory first.
+                  # 'reiterate' => second pass over my_iterable to write them.
+                  # 'spool' => spool shapes and records to a temporary file.
     #
     ###########################################################################
     # Override for sDNA_ToolWrapper
     python = ''
+    python_cache = os.path.join(os.path.dirname(__file__), 'python_cache.json')
+    python_search_depth = 3
+    use_worker = False
+    max_workers = 4
+    use_results_cache = False
+    results_cache_dir = os.path.join(os.path.dirname(__file__), 'results_cache')
+    results_cache_max_MB = 1024
+    use_spec_cache = True
+    spec_cache = os.path.join(os.path.dirname(__file__), 'input_specs_cache.json')
     ###########################################################################
     #
     # Overrides for ShapefileWriter
@@ -355,6 +375,7 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     bake = False
     new_geom = False
     del_after_read = True
+    read_fields = '' # '' => read all fields.
     sDNA_names_fmt = '{name}.shp.names.csv'  
     ###########################################################################   
     #         
@@ -409,6 +430,8 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     exclude = False
     suppress_small_classes_error = False
     suppress_class_overlap_error = False
+    use_numpy = True
+    max_points = 1000
 
     #
     #
@@ -466,13 +489,81 @@ output.debug('message == %s ' % module_opts['options'].message)
 
 #########################################################################
 #
+def copy_opts(opts):
+    #type(dict) -> dict
+    """ Copies the nested dicts in opts, sharing its (immutable) namedtuples. """
+    return opts.__class__((key, copy_opts(val) if isinstance(val, dict) else val)
+                          for key, val in opts.items()
+                         )
+
+
+NON_OPTION_PARAMS = ('Geom', 'Data', 'gdm', 'file')
+
+
+def opts_resolution_key(local_opts, overrides, params, local_metas, not_shared):
+    #type(dict, list, dict, namedtuple, tuple) -> tuple
+    """ Everything override_all_opts reads, as of now: the contents of 
+        its args and of module_opts, and the modification times of the 
+        config.toml files.  gdms are only compared by identity, and the 
+        params in NON_OPTION_PARAMS (e.g. long lists of Geom) are left 
+        out, as they are not options.  
+    """
+    config_files = [DEFAULT_METAS.config]
+    if isinstance(params.get('config', None), basestring):
+        config_files.append(params['config'])
+
+    by_identity = (gdm_from_GH_Datatree.GeomDataMapping,)
+
+    params_key = tuple((key, options_manager.structural_key(val, by_identity))
+                       for key, val in params.items()
+                       if key not in NON_OPTION_PARAMS
+                      )
+
+    return (options_manager.structural_key(local_opts)
+           ,None if local_opts is module_opts else options_manager.structural_key(module_opts)
+           ,options_manager.structural_key(overrides, by_identity)
+           ,params_key
+           ,options_manager.structural_key(local_metas)
+           ,frozenset(not_shared)
+           ,tuple(options_manager.file_stamp(config_file) 
+                  for config_file in config_files
+                 )
+           )
+
+
+def cached_opts(cache, local_opts, overrides):
+    #type(dict, dict, list) -> dict, namedtuple
+    """ Returns the opts and local_metas override_all_opts resolved when
+        it was last called with the same inputs (and updates local_opts or
+        module_opts to them in place, if it did).  
+    """
+    cache['hits'] += 1
+
+    # As override_nt_with_vals_for_key_else_dict would have.
+    for override in overrides:
+        override.pop('local_metas', None)
+        override.pop('metas', None)
+
+    opts = copy_opts(cache['opts'])
+    if cache['updated'] == 'module_opts':
+        updated = module_opts
+    elif cache['updated'] == 'local_opts':
+        updated = local_opts
+    else:
+        return opts, cache['local_metas']
+    updated.clear()
+    updated.update(opts)
+    return updated, cache['local_metas']
+
+
 def override_all_opts(local_opts #  mutated
                      ,overrides
                      ,params
                      ,local_metas = DEFAULT_LOCAL_METAS
                      ,not_shared = ('advanced', 'input', 'output')
+                     ,cache = None
                      ):
-    #type(dict, list, dict, namedtuple, namedtuple, tuple) -> dict, namedtuple
+    #type(dict, list, dict, namedtuple, namedtuple, tuple, dict) -> dict, namedtuple
     """    
     The options override function for sDNA_GH.  
 
@@ -484,11 +575,27 @@ def override_all_opts(local_opts #  mutated
     3) The nested dict from config.toml can contain other general data 
        fields at higher levels.  These are applied to all tools below them 
        in the tree.
+
+    4) If cache is a dict, the result is stored in it, and returned from
+       it by the next call if nothing override_all_opts reads has changed
+       (including the config.toml files, and module_opts if shared), 
+       instead of being resolved again.  
    
     Mutates: local_opts
     Returns: local_metas, local_opts
     """
 
+    if cache is not None:
+        resolution_key = opts_resolution_key(local_opts
+                                            ,overrides
+                                            ,params
+                                            ,local_metas
+                                            ,not_shared
+                                            )
+        if cache.get('key', None) == resolution_key:
+            return cached_opts(cache, local_opts, overrides)
+        input_opts = local_opts
+
     metas = local_opts['metas']
 
     params = params.copy()# OrderedDict((key, value) 
@@ -534,8 +641,6 @@ def override_all_opts(local_opts #  mutated
                  ,params
                  ]
 
-    output.debug('overrides == %s' % (overrides,))
-
     old_sync = local_metas.sync
 
     ###########################################################################
@@ -636,6 +741,20 @@ def override_all_opts(local_opts #  mutated
 
     #output.debug('local_opts (opts) == %s' % local_opts)
 
+    if cache is not None:
+        if local_opts is module_opts:
+            updated = 'module_opts'
+        elif local_opts is input_opts:
+            updated = 'local_opts'
+        else:
+            updated = None
+        cache.update(key = resolution_key
+                    ,opts = copy_opts(local_opts)
+                    ,local_metas = local_metas
+                    ,updated = updated
+                    )
+        cache.setdefault('hits', 0)
+
     return local_opts, local_metas
 
 ##############################################################################
@@ -745,6 +864,7 @@ do_not_remove = ('out'   # TODO: Removing Params has proved to be a
                 ,'l_metas'
                 ,'retcode' # But if user adds it, we won't remove it
                 ,'class_bounds'
+                ,'timings' # Optional.  Only output if the user adds it.
                 )
 
 #
@@ -1028,6 +1148,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
         self.ghdoc = ghdoc
         self.tools_default_opts = {}
         self.not_shared = set()
+        self.opts_cache = {}
         #sDNA_GH_path = sDNA_GH_path
         #sDNA_GH_package = sDNA_GH_package
         self.do_not_remove = do_not_remove
@@ -1071,7 +1192,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
 
         gdm = smart_comp.first_item_if_seq(kwargs.get('gdm', {}))
 
-        self.logger.debug(('gdm from start of RunScript == %s' % gdm)[:80])
+        self.logger.debug('gdm from start of RunScript == %.50s', gdm)
         
         result = self.try_to_update_nick_name()
         nick_name = self.nick_name
@@ -1115,6 +1236,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                                 ,params = kwargs
                                 ,local_metas = self.local_metas 
                                 ,not_shared = self.not_shared
+                                ,cache = self.opts_cache
                                 )
         #######################################################################
         kwargs['opts'] = self.opts
@@ -1128,6 +1250,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                                )
                               ):
             logging_wrapper.set_handler_level(handler, level)
+        logging_wrapper.set_logger_level_to_handlers(logger)
 
 
         self.logger.debug('Opts overridden....    ')
@@ -1150,7 +1273,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                 not tool.already_loaded(self.opts)): # already loaded sDNA
                 #
                 self.logger.debug('tool.already_loaded(self.opts) == False')
-                tool.load_sDNA_tool(self.opts)
+                tool.load_sDNA_tool(self.opts, lazy = True)
                 any_sDNA_tools_updated = True
                 # This isn't necessary just to run these tools later.
                 # They're just being updated now so they can get their 
@@ -1251,9 +1374,18 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
             kwargs['gdm'] = gdm
             kwargs['f_name'] = f_name # put back in here so it doesn't go in opts
 
+            timings = [] if self.options.record_timings else None
             ##################################################################
-            ret_vals_dict = runner.run_tools(self.tools, kwargs)
+            ret_vals_dict = runner.run_tools(self.tools
+                                            ,kwargs
+                                            ,timings = timings
+                                            ,trace_memory = self.options.trace_memory
+                                            )
             ##################################################################
+            if timings is not None:
+                ret_vals_dict['timings'] = [runner.timing_line(record)
+                                            for record in timings
+                                           ]
             gdm = ret_vals_dict.get('gdm', {})
             if isinstance(gdm, (Iterable, gdm_from_GH_Datatree.GeomDataMapping)):
                 #
@@ -1285,6 +1417,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
         ret_vals_dict['opts'] = [self.opts.copy()] # could become external_opts
                                                    # in another component
         ret_vals_dict['l_metas'] = self.local_metas #immutable
+        ret_vals_dict.setdefault('timings', None)
 
         self.logger.debug('Returning from self.script. opts.keys() == %s ' % self.opts.keys() )
 
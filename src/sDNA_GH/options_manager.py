@@ -54,6 +54,11 @@ if hasattr(collections, 'Set'):
 else:
     import collections.abc
     Set = collections.abc.Set
+if hasattr(collections, 'Mapping'):
+    Mapping = collections.Mapping 
+else:
+    import collections.abc
+    Mapping = collections.abc.Mapping
 from numbers import Number
 
 import toml_tools
@@ -403,6 +408,45 @@ def dict_from_toml_file(path):
 
 
 
+def file_stamp(path):
+    #type(str) -> tuple
+    """ The path, modification time and size of a file, to tell if it has 
+        changed since it was last read.  
+    """
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return path, None
+    return path, stat.st_mtime, stat.st_size
+
+
+def structural_key(obj, by_identity = ()):
+    #type(type[any], tuple) -> tuple
+    """ A snapshot of the current contents of nested Mappings, lists, tuples
+        and namedtuples (e.g. opts), that compares equal to another 
+        snapshot if and only if they had equal contents, even if they were
+        mutated in place in between.  Instances of classes in by_identity 
+        (e.g. large data) are represented by their ids instead.
+    """
+    if by_identity and isinstance(obj, by_identity):
+        return 'id', id(obj)
+    if isinstance(obj, Mapping):
+        return type(obj), tuple((key, structural_key(val, by_identity))
+                                for key, val in obj.items()
+                               )
+    if isnamedtuple(obj):
+        # namedtuple_from_dict makes a new class for each namedtuple.
+        return (type(obj).__name__
+               ,obj._fields
+               ,tuple(structural_key(item, by_identity) for item in obj)
+               )
+    if isinstance(obj, (list, tuple)):
+        return type(obj), tuple(structural_key(item, by_identity) 
+                                for item in obj
+                               )
+    return obj
+
+
 override_funcs_dict = {  dict : override_namedtuple_with_dict  }
 
 
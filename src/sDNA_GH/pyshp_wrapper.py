@@ -39,6 +39,10 @@ import logging
 import warnings
 import itertools
 import locale
+import decimal
+import tempfile
+import numbers
+import struct
 from collections import OrderedDict
 from datetime import date
 import collections
@@ -49,6 +53,8 @@ else:
     import collections.abc
     Iterable, Callable = collections.abc.Iterable, collections.abc.Callable
 
+izip = getattr(itertools, 'izip', zip) # Python 2 zip returns a list
+
 if hasattr(abc, 'ABC'):
     ABC = abc.ABC
 else:
@@ -69,6 +75,11 @@ try:
 except NameError:
     basestring = str              
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
@@ -135,24 +146,45 @@ class CoerceAndGetCodeOptions(object):
     use_memo = False # Use the 'M' field code in Shapefiles for un-coerced data
 
 
-def coerce_and_get_type(x, options = CoerceAndGetCodeOptions):
-    #type coercer function
+YEAR_PATTERN = r'([0-3]?\d{3})|\d{2}'
+MONTH_PATTERN = r'([0]?\d)|(1[0-2])'
+DAY_PATTERN = r'([0-2]?\d)|(3[01])'
+SEP_PATTERN = r'([-\.,:/ \\])' # allows different seps r'(?P<sep>[-.,:\\/ ])'
 
-    if options.decimal:
-        import decimal as dec
-    x = str(x)  # To convert False to 'False' and 0 to '0'
-    dec.getcontext().prec = options.precision #if else options.precision    # significant figures,  >= # decimal places
-    if  x.lower() in ['true','false']:   
-        return x, bool  # i.e. 'L'
-    try:
-        y = int(x)   # if isinstance(x,int):  # Bool test needs to come before this as int(True) == 1
-        return y, int    # i.e.   'N'
-    except ValueError:
+
+def date_patterns(yyyy_mm_dd = False):
+    #type(bool) -> list
+    year, month, day, sep = YEAR_PATTERN, MONTH_PATTERN, DAY_PATTERN, SEP_PATTERN
+    test_patterns =  [ year + sep + month + sep + day ]   # datetime.date requires yyyy, mm, dd
+    if not yyyy_mm_dd:
+        test_patterns += [  day + sep + month + sep + year   # https://en.wikipedia.org/wiki/Date_format_by_country
+                           ,month + sep + day + sep + year]  # 
+    return test_patterns
+
+
+def coercer_factory(options = CoerceAndGetCodeOptions):
+    #type(type[any]) -> function
+    """ Builds a coerce_and_get_type function for options.  The date 
+        patterns are compiled, and the decimal context and quantize 
+        exponent are created, once only (instead of on every call).  
+        bools, ints, floats and dates are classified by their Python type 
+        first, before falling back to parsing their str.  
+    """
+    n = options.max_dp
+    use_decimal = options.decimal
+    keep_floats = options.keep_floats
+    if use_decimal:
+        context = decimal.Context(prec = options.precision)  # significant figures,  >= # decimal places
+        exponent = decimal.Decimal('.'*int( bool(n) ) + '0'*(n-1) + '1')   # e.g. '1' if n=0, else '0.000... (#n 0s) ...0001'
+    matchers = [re.compile(pattern).match 
+                for pattern in date_patterns(options.yyyy_mm_dd)
+               ]
+
+    def coerce_float(x):
+        #type(str) -> str/Decimal/float, type
         try:
-            n = options.max_dp
-            if options.decimal:
-                y = dec.Decimal(x)
-                y = y.quantize(  dec.Decimal('.'*int( bool(n) ) + '0'*(n-1) + '1')  )   # e.g. '1' if n=0, else '0.000... (#n 0s) ...0001'
+            if use_decimal:
+                y = decimal.Decimal(x).quantize(exponent, context = context)
             else:
                 y = float(x)   
                 
@@ -163,36 +195,55 @@ def coerce_and_get_type(x, options = CoerceAndGetCodeOptions):
                 #  Beware:  
                 # https://docs.python.org/2.7/tutorial/floatingpoint.html#tut-fp-issues                                                      
                 
-            return x if options.keep_floats else y, float
+            return x if keep_floats else y, float
                     # Tuple , binds to result of ternary operator
-        except (dec.InvalidOperation, ValueError):
-            if isinstance(x, date):
-                return x, date   # i.e. 'D'   
+        except (decimal.InvalidOperation, ValueError):
+            if any(match(x) for match in matchers):
+                return x, date          # TODO, optionally, return datetime.date() object?
+            return x, str  # i.e. 'C'  
+
+    def coerce_and_get_type(x, options = None):
+        #type coercer function
+        if isinstance(x, bool):
+            return str(x), bool  # i.e. 'L'.  Bool test needs to come before int, as int(True) == 1
+        if isinstance(x, numbers.Integral):
+            return int(x), int    # i.e.   'N'
+        if isinstance(x, float):
+            return coerce_float(str(x))  # str of a float never parses as an int
+        if isinstance(x, date):
+            return str(x), date   # i.e. 'D'.  str of a date always matches the yyyy-mm-dd pattern
+
+        x = str(x)  # To convert False to 'False' and 0 to '0'
+        if  x.lower() in ('true','false'):   
+            return x, bool  # i.e. 'L'
+        try:
+            return int(x), int    # i.e.   'N'
+        except ValueError:
+            return coerce_float(x)
+
+    return coerce_and_get_type
 
-            if isinstance(x, list) and len(x) == 3 and all(isinstance(z, int) for z in x):
-                x = ':'.join(map(str, x))
-    
-            if isinstance(x, basestring):
-                year=r'([0-3]?\d{3})|\d{2}'
-                month=r'([0]?\d)|(1[0-2])'
-                day=r'([0-2]?\d)|(3[01])'
-                sep=r'([-\.,:/ \\])' # allows different seps r'(?P<sep>[-.,:\\/ ])'
-                test_patterns =  [ year + sep + month + sep + day ]   # datetime.date requires yyyy, mm, dd
-                if not options.yyyy_mm_dd:
-                    test_patterns += [  day + sep + month + sep + year   # https://en.wikipedia.org/wiki/Date_format_by_country
-                                       ,month + sep + day + sep + year]  # 
-                if any(re.match(pattern, x) for pattern in test_patterns):
-                    return x, date          # TODO, optionally, return datetime.date() object?
-                else:
-                    return x, str  # i.e. 'C'  
-            else:
-                msg = 'Failed to coerce UserText to PyShp record data type.  '
-                if options.use_memo:
-                    logger.warning(msg + 'Using Memo.  ')
-                    return str(x), 'M'
-                else:
-                    logger.error(msg)
-                    raise TypeError(msg)
+
+coercers_cache = {}
+
+
+def get_coercer(options = CoerceAndGetCodeOptions):
+    #type(type[any]) -> function
+    """ Memoised coercer_factory, keyed on the options it depends on. """
+    key = (options.decimal
+          ,options.precision
+          ,options.max_dp
+          ,options.yyyy_mm_dd
+          ,options.keep_floats
+          )
+    if key not in coercers_cache:
+        coercers_cache[key] = coercer_factory(options)
+    return coercers_cache[key]
+
+
+def coerce_and_get_type(x, options = CoerceAndGetCodeOptions):
+    #type coercer function
+    return get_coercer(options)(x)
 
 
 class LocaleOptions(object):
@@ -262,6 +313,7 @@ class FieldInfo(object):
     longest_val = None
     fieldType = str
     decimal = 0
+    all_zero_or_one = True # Of the values in the field so far.
 
 
     def field_kwargs_dict(self):
@@ -316,6 +368,22 @@ class FieldInfo(object):
     def increase_decimal_req_for(self, value):
         self.increase_decimal_req_to(dec_places_req(value), for_val = value)
 
+    def update_stats(self, value, val_type):
+        #type(type[any], type) -> int, int
+        """ Returns the size in bytes and the decimal places of value
+            (0 unless val_type is float).  
+        """
+        if value not in (0, 1):
+            self.all_zero_or_one = False
+
+        size = len_bytes(value, self.options)
+
+        decimal = 0
+        if val_type is float:
+            decimal = dec_places_req(value)
+
+        return size, decimal
+
     def update_field(self, fieldType, size = 1, decimal = 0, value = None):
         self.fieldType = fieldType
         
@@ -346,6 +414,9 @@ class FieldInfo(object):
         self.name = name
         self.options = options
 
+        if value is not None:
+            self.update_stats(value, fieldType)
+
         self.update_field(fieldType, size, decimal, value)
 
 
@@ -358,12 +429,17 @@ def ensure_correct(fields
                   ,options = EnsureCorrectOptions
                   ): 
     # type(dict, str, type[any], str, dict namedtuple) -> None
+    # attribute_tables is no longer rescanned (the FieldInfo statistics 
+    # are used instead), but is still accepted for backwards compatibility.
     if nice_key in fields:
         field_info = fields[nice_key]
-        field_info.increase_size_req_for(value)
+        # Only the previous values, not this one
+        all_zero_or_one = field_info.all_zero_or_one
+        size, decimal = field_info.update_stats(value, val_type)
+        field_info.increase_size_req_to(size, for_val = value)
             
         if val_type is float and field_info.fieldType is float:
-            field_info.increase_decimal_req_for(value) 
+            field_info.increase_decimal_req_to(decimal, for_val = value) 
 
         if val_type is not field_info.fieldType:
             if (val_type in (int, float) and
@@ -372,8 +448,7 @@ def ensure_correct(fields
                 field_info.update_field(fieldType=val_type, value = value)
             elif (val_type is bool and
                   field_info.fieldType is int and
-                  all(attribute_tables[i][nice_key] in [0,1] 
-                      for i in attribute_tables)):
+                  all_zero_or_one):
                 #
                 field_info.update_field(fieldType=bool, value = value)
                 #1s and 0s are in a Boolean field as integers or a 1 or a 0 
@@ -383,7 +458,9 @@ def ensure_correct(fields
                 #        or flag for recheck all at end
             elif (val_type is float
                   and field_info.fieldType is int):
-                field_info.update_field(fieldType = float, value = value)  
+                # The size req has already been increased for value.
+                field_info.fieldType = float
+                field_info.increase_decimal_req_to(decimal, for_val = value)
             else:
                 field_info.update_field(fieldType = str)
                 #logger.error('Type mismatch in same field.  Cannot store ' 
@@ -420,6 +497,23 @@ class WriteIterableToShpOptions(EnsureCorrectOptions):
     uuid_length = 36 # 32 in 5 blocks (2 x 6 & 2 x 5) with 4 separator characters.
     num_dp = 10 # decimal places
     min_sizes = True
+    two_pass = '' # '' => cache all the coerced records in memory first.
+                  # 'reiterate' => second pass over my_iterable to write them.
+                  # 'spool' => spool shapes and records to a temporary file.
+
+
+TWO_PASS_MODES = ('', 'reiterate', 'spool')
+
+
+def spooled_shapes_and_records(spool):
+    #type(file) -> Iterator[list, OrderedDict]
+    spool.seek(0)
+    while True:
+        try:
+            list_of_shapes, items = pickle.load(spool)
+        except EOFError:
+            return
+        yield list_of_shapes, OrderedDict(items)
 
 
 def write_iterable_to_shp(my_iterable 
@@ -490,41 +584,80 @@ def write_iterable_to_shp(my_iterable
                           }
                          )
     
-    if AttributeTablesClass is None:
+    two_pass = options.two_pass
+    if two_pass not in TWO_PASS_MODES:
+        msg = 'Invalid two_pass: %s.  Must be one of: %s' % (two_pass, TWO_PASS_MODES)
+        logger.error(msg)
+        raise ValueError(msg)
+
+    if two_pass == 'reiterate' and iter(my_iterable) is my_iterable:
+        logger.warning('Cannot re-iterate over an iterator.  Spooling instead. ')
+        two_pass = 'spool'
+
+    if two_pass:
+        # Only the fields' statistics are kept from the first pass, so peak 
+        # memory is bounded by the number of fields, not of records.
+        attribute_tables = None
+    elif AttributeTablesClass is None:
         attribute_tables = OrderedDict()
     else:
         attribute_tables = AttributeTablesClass()
 
+    spool = tempfile.TemporaryFile() if two_pass == 'spool' else None
+
+    coerce = get_coercer(options)
+
+    def get_values(item, update_fields = True):
+        #type(type[any], bool) -> OrderedDict
+        keys = key_finder(item) # e.g. rhinoscriptsyntax.GetUserText(item,None)
+        values = OrderedDict( {options.uuid_field : shape_IDer(item) } )   
+        for key in keys:
+            # Demangle and cache the user text keys and values
+            nice_match = key_matcher(key)            
+            if nice_match:
+                nice_key = nice_match.group('name')
+                #TODO: Support more fields, e.g. type, size
+                value = value_demangler(item, key) 
+
+                value, val_type = coerce(value)
+                values[nice_key] = value 
+
+                if not update_fields:
+                    continue
+
+                # Update the shp field sizes if they aren't big enough or the field is new, and type check
+                if options.min_sizes:
+                    ensure_correct(fields, nice_key, value, val_type, attribute_tables, options)
+                    # mutates fields, adding nice_key to it if not already there, else updating its val
+                else:
+                    fields[nice_key] = FieldInfo(name = nice_key
+                                                ,size = options.field_size
+                                                ,value = value
+                                                ,fieldType = val_type
+                                                ,decimal = options.num_dp
+                                                ,options = options
+                                                )  
+        return values
+
+    def check_is_shape(shape):
+        if not is_shape(shape, shape_code):
+            msg = 'Shape: %s cannot be converted to shape_code: %s' 
+            msg %= (shape, shape_code)
+            logger.error(msg)
+            raise TypeError(msg)
+
     if True: #field_names is None or options.cache_iterable: 
         
         for item in my_iterable:    
-            keys = key_finder(item) # e.g. rhinoscriptsyntax.GetUserText(item,None)
-            values = OrderedDict( {options.uuid_field : shape_IDer(item) } )   
-            for key in keys:
-                # Demangle and cache the user text keys and values
-                nice_match = key_matcher(key)            
-                if nice_match:
-                    nice_key = nice_match.group('name')
-                    #TODO: Support more fields, e.g. type, size
-                    value = value_demangler(item, key) 
-
-                    value, val_type = coerce_and_get_type(value, options)
-                    values[nice_key] = value 
-
-
-                    # Update the shp field sizes if they aren't big enough or the field is new, and type check
-                    if options.min_sizes:
-                        ensure_correct(fields, nice_key, value, val_type, attribute_tables, options)
-                        # mutates fields, adding nice_key to it if not already there, else updating its val
-                    else:
-                        fields[nice_key] = FieldInfo(name = nice_key
-                                                    ,size = options.field_size
-                                                    ,value = value
-                                                    ,fieldType = val_type
-                                                    ,decimal = options.num_dp
-                                                    ,options = options
-                                                    )  
-            attribute_tables[item] = values.copy()  # item may not be hashable so can't use dict of dicts
+            values = get_values(item)
+            if spool is not None:
+                check_is_shape(item)
+                pickle.dump((shape_mangler(item), list(values.items()))
+                           ,spool
+                           ,pickle.HIGHEST_PROTOCOL
+                           )
+            elif not two_pass:
+                attribute_tables[item] = values.copy()  # item may not be hashable so can't use dict of dicts
         
     else:
         for name in field_names:
@@ -534,6 +667,24 @@ def write_iterable_to_shp(my_iterable
         #TODO setup basic fields dict from list without looping over my_iterable        
 
 
+    def shapes_and_records():
+        #type() -> Iterator[list, dict]
+        if spool is not None:
+            for list_of_shapes, attribute_table in spooled_shapes_and_records(spool):
+                yield list_of_shapes, attribute_table
+            return
+
+        if two_pass:
+            items_and_tables = ((item, get_values(item, update_fields = False))
+                                for item in my_iterable
+                               )
+        else:
+            items_and_tables = attribute_tables.items()
+
+        for shape, attribute_table in items_and_tables:
+            check_is_shape(shape)
+            yield shape_mangler(shape), attribute_table
+
 
     def default_record_dict(item):
         retval = { key_matcher(key).group('name') : 
@@ -577,14 +728,7 @@ def write_iterable_to_shp(my_iterable
         add_geometric_object = getattr(w,  pyshp_writer_method[shape_code])
         # e.g. add_geometric_object = w.linez
 
-        for shape, attribute_table in attribute_tables.items():
-            if not is_shape(shape, shape_code):
-                msg = 'Shape: %s cannot be converted to shape_code: %s' 
-                msg %= (shape, shape_code)
-                logger.error(msg)
-                raise TypeError(msg)
-
-            list_of_shapes = shape_mangler(shape)
+        for list_of_shapes, attribute_table in shapes_and_records():
             if list_of_shapes:
 
                 add_geometric_object(list_of_shapes) 
@@ -592,7 +736,8 @@ def write_iterable_to_shp(my_iterable
 
                 w.record(**attribute_table)    
 
-
+    if spool is not None:
+        spool.close()
 
     return 0, shapefile_path, fields, attribute_tables
 
@@ -692,10 +837,161 @@ class OutputFileDeletionOptions(GetFileNameOptions, FieldRecsShapesOptions):
     strict_no_del = InputFileDeletionOptions.strict_no_del 
     del_after_read = True
     OUTPUT_FILE_DELETER = None
+    OUTPUT_FILE_DELETERS = () # One per auto generated output file of a batch.
 
 class ShapeRecordsOptions(OutputFileDeletionOptions):
     copy_dicts = False
     shp_type = 'POLYLINEZ'
+    read_fields = '' # '' => decode all fields of each record into a dict.
+                     # Else field names (a list, or comma separated) to decode 
+                     # into a LazyRecord, decoding any others only if looked up.
+
+
+def fields_to_read(options = ShapeRecordsOptions):
+    #type(type[any]) -> list / None
+    """ The field names in options.read_fields, or None for all of them. """
+    read_fields = getattr(options, 'read_fields', '')
+    if not read_fields:
+        return None
+    if isinstance(read_fields, basestring):
+        read_fields = read_fields.split(',')
+    return [field.strip() for field in read_fields if field.strip()]
+
+
+def decode_dbf_value(value, field_type, decimal, encoding = 'utf-8', errors = 'strict'):
+    #type(bytes, str, int, str, str) -> type[any]
+    """ Decodes the bytes of a field of a .dbf record, the same way as 
+        shapefile.Reader (pyshp 2) does.
+    """
+    if field_type in ('N', 'F'):
+        value = value.split(b'\0')[0].replace(b'*', b'')
+        if not value.strip():
+            return None
+        try:
+            if decimal:
+                return float(value)
+            try:
+                return int(value)
+            except ValueError:
+                return int(float(value))
+        except ValueError:
+            return None
+    if field_type == 'D':
+        if not value.replace(b'\x00', b'').replace(b' ', b'').replace(b'0', b''):
+            return None
+        try:
+            return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        except ValueError:
+            return value.strip().decode('utf-8')
+    if field_type == 'L':
+        if value in (b'Y', b'y', b'T', b't', b'1'):
+            return True
+        if value in (b'N', b'n', b'F', b'f', b'0'):
+            return False
+        return None
+    return value.decode(encoding, errors).strip().rstrip('\x00')
+
+
+class DbfLayout(object):
+    """ Positions of fields in the records of a .dbf file (shared by all 
+        its LazyRecords).
+    """
+    def __init__(self, fields, encoding = 'utf-8', errors = 'strict'):
+        #type(list, str, str) -> None
+        """ fields are shapefile.Reader.fields[1:], i.e. without the 
+            deletion flag.
+        """
+        self.encoding = encoding
+        self.errors = errors
+        self.fields = OrderedDict()
+        start = 1 # after the deletion flag
+        for name, field_type, size, decimal in fields:
+            self.fields[name] = (start, start + size, field_type, decimal)
+            start += size
+
+    def check(self, field_names):
+        #type(Iterable[str]) -> None
+        invalid = [name for name in field_names if name not in self.fields]
+        if invalid:
+            msg = ('Fields: %s not found in shape file fields: %s '
+                  % (invalid, list(self.fields))
+                  )
+            logger.error(msg)
+            raise ValueError(msg)
+
+    def decode(self, raw, name):
+        #type(bytes, str) -> type[any]
+        start, end, field_type, decimal = self.fields[name]
+        return decode_dbf_value(raw[start:end]
+                               ,field_type
+                               ,decimal
+                               ,self.encoding
+                               ,self.errors
+                               )
+
+
+class LazyRecord(OrderedDict):
+    """ A record of a .dbf file, as an OrderedDict of its decoded fields 
+        (in the order they were decoded), that also keeps the record's raw 
+        bytes.  Any other field of the record is decoded and added when 
+        first looked up (by [] or get).  Its keys, len and in are of the 
+        decoded fields only.
+    """
+    __slots__ = ('raw', 'layout')
+
+    def __init__(self, raw, layout, field_names = ()):
+        #type(bytes, DbfLayout, Iterable[str]) -> None
+        super(LazyRecord, self).__init__()
+        self.raw = raw
+        self.layout = layout
+        for name in field_names:
+            self[name] = layout.decode(raw, name)
+
+    def __missing__(self, key):
+        if key not in self.layout.fields:
+            raise KeyError(key)
+        value = self[key] = self.layout.decode(self.raw, key)
+        return value
+
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self):
+        retval = LazyRecord(self.raw, self.layout)
+        retval.update(self)
+        return retval
+
+    def decode_all(self):
+        #type() -> LazyRecord
+        """ Decodes every field, reordering them as in the .dbf file. """
+        for name in self.layout.fields:
+            value = self.pop(name) if name in self else self.layout.decode(self.raw, name)
+            self[name] = value
+        return self
+
+
+def lazy_records(reader, field_names = ()):
+    #type(shp.Reader, Iterable[str]) -> Iterator[LazyRecord]
+    """ Like reader.iterRecords(fields = field_names), but yields 
+        LazyRecords.
+    """
+    layout = DbfLayout(reader.fields[1:]
+                      ,reader.encoding
+                      ,getattr(reader, 'encodingErrors', 'strict')
+                      )
+    layout.check(field_names)
+    dbf = reader.dbf
+    dbf.seek(0)
+    num_records, header_length, record_length = struct.unpack('<4xLHH', dbf.read(12))
+    dbf.seek(header_length)
+    for __ in range(num_records):
+        raw = dbf.read(record_length)
+        if raw[:1] != b' ': # deleted record
+            continue
+        yield LazyRecord(raw, layout, field_names)
 
 
 class NullDeleter(object):
@@ -731,7 +1027,10 @@ class SizedIterator(object):
     
     def next(self):
         return next(self.iterator)
-    
+
+    def __next__(self): # Python 3
+        return self.next()
+
     def __iter__(self):
         return self
 
@@ -850,6 +1149,9 @@ class TmpFileDeletingRecordsIterator(TmpFileDeletingIterator):
         delete_files method must be called directly.
     """
     def generator(self):
+        field_names = fields_to_read(self.opts['options'])
+        if field_names is not None:
+            return lazy_records(self.reader, field_names)
         return (record.as_dict() for record in self.reader.iterRecords())
 
 
@@ -867,8 +1169,11 @@ def clone_dicts(group):
     return [[(obj, dict_.copy()) for obj, dict_ in list_] for list_ in group]
 
     
+def rec_as_dict(record):
+    return record if isinstance(record, dict) else record.as_dict()
+
 def shape_and_rec_as_dict(shape_record):
-    return shape_record.shape, shape_record.record.as_dict()
+    return shape_record.shape, rec_as_dict(shape_record.record)
 
 def shapes_and_recs_as_dicts(shape_records):
         return [shape_and_rec_as_dict(shape_record)
@@ -961,9 +1266,19 @@ class TmpFileDeletingShapeRecordsIterator(TmpFileDeletingIterator):
 
 
 
+    def shape_records(self):
+        field_names = fields_to_read(self.opts['options'])
+        if field_names is None:
+            return self.reader.iterShapeRecords()
+        return (shp.ShapeRecord(shape = shape, record = record)
+                for shape, record in izip(self.reader.iterShapes()
+                                         ,lazy_records(self.reader, field_names)
+                                         )
+               )
+
     def generator(self):
         return funcs.multi_item_unpacking_iterator(
-                                         items = self.reader.iterShapeRecords()
+                                         items = self.shape_records()
                                         ,is_single_item = is_single_shape
                                         ,manglers = self.manglers
                                         )
@@ -0,0 +1,133 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Registry of discovered Python interpreters, cached on disk, so that
+    searching for one (walking through folders) is only needed once, not
+    every time an sDNA tool is loaded.
+"""
+
+import os
+import json
+import logging
+import subprocess
+
+
+try:
+    basestring #type: ignore
+except NameError:
+    basestring = str
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class PythonRegistryOptions(object):
+    python_cache = os.path.join(os.path.dirname(__file__), 'python_cache.json')
+    python_search_depth = 3 # Max depth of sub folders of python_paths to search
+
+
+def walk_bounded(folder, max_depth):
+    #type(str, int) -> Iterator[str]
+    """ Yields folder and its sub folders, to at most max_depth levels below
+        it (folder itself is level 0), in the same order as os.walk.
+    """
+    base_depth = folder.rstrip(os.sep).count(os.sep)
+    for dirpath, dirnames, __ in os.walk(folder):
+        yield dirpath
+        if dirpath.rstrip(os.sep).count(os.sep) - base_depth >= max_depth:
+            dirnames[:] = [] # os.walk then skips them.
+
+
+def search_key(python, folders, pythons):
+    #type(str, Iterable[str], Iterable[str]) -> str
+    """ The cache key, for the search options. """
+    return json.dumps([python, list(folders), list(pythons)], default = str)
+
+
+def python_version(python):
+    #type(str) -> str
+    try:
+        output = subprocess.check_output([python, '-c', 'import sys; print(sys.version)']
+                                        ,stderr = subprocess.STDOUT
+                                        )
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+    if not isinstance(output, str):
+        output = output.decode('utf-8', 'replace')
+    return output.strip().split(' ')[0]
+
+
+def stat_fingerprint(path):
+    #type(str) -> list / None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+class PythonRegistry(object):
+    """ Maps search keys to records of an interpreter: its path, version,
+        and its mtime and size, to validate it against with a single stat
+        call.
+    """
+
+    def __init__(self, options = PythonRegistryOptions):
+        self.path = options.python_cache
+        self.records = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.records = json.load(f)
+            except (IOError, OSError, ValueError):
+                logger.warning('Ignoring invalid Python cache: %s' % self.path)
+
+    def get(self, key):
+        #type(str) -> str / None
+        """ The cached interpreter for key if it is unchanged, else None. """
+        record = self.records.get(key)
+        if not record:
+            return None
+        if stat_fingerprint(record['python']) != record['fingerprint']:
+            logger.debug('Cached interpreter changed or missing: %s' % record)
+            return None
+        return record['python']
+
+    def add(self, key, python):
+        #type(str, str) -> None
+        self.records[key] = dict(python = python
+                                ,version = python_version(python)
+                                ,fingerprint = stat_fingerprint(python)
+                                )
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.records, f, indent = 4)
+        except (IOError, OSError):
+            logger.warning('Could not write Python cache: %s' % self.path)
@@ -0,0 +1,190 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Content addressed cache of the output files of sDNA runs, keyed on
+    the bytes of the input shapefile (and of any other files named by the 
+    tool's options), the tool's options and the sDNA version, with least 
+    recently used eviction when over a maximum size.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+INPUT_EXTS = ('.shp', '.dbf', '.shx')
+
+OUTPUT_EXTS = ('.shp', '.dbf', '.shx', '.prj', '.cpg', '.shp.names.csv')
+
+ENTRY_FILE_NAME = 'output'
+
+CHUNK_SIZE = 1 << 20
+
+
+class ResultsCacheOptions(object):
+    results_cache_dir = os.path.join(os.path.dirname(__file__), 'results_cache')
+    results_cache_max_MB = 1024
+
+
+def update_hash_from_file(hash_, path):
+    #type(hashlib._Hash, str) -> None
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda : f.read(CHUNK_SIZE), b''):
+            hash_.update(chunk)
+
+
+def results_key(input_file, *args, **kwargs):
+    #type(str, *type[any], **list) -> str
+    """ Hash of the bytes of input_file's .shp, .dbf and .shx files, of 
+        any files in the keyword arg extra_files (e.g. zone files), and 
+        of args (which must be serialisable to JSON, e.g. the tool name,
+        its fully resolved options and the sDNA version).
+    """
+    extra_files = kwargs.pop('extra_files', ())
+    hash_ = hashlib.sha256()
+    name = os.path.splitext(input_file)[0]
+    for ext in INPUT_EXTS:
+        hash_.update(ext.encode('ascii'))
+        path = name + ext
+        if not os.path.isfile(path):
+            continue
+        update_hash_from_file(hash_, path)
+    for path in extra_files:
+        hash_.update(b'extra file')
+        update_hash_from_file(hash_, path)
+    hash_.update(json.dumps(args, sort_keys = True, default = str).encode('utf-8'))
+    return hash_.hexdigest()
+
+
+def output_exts(output_file):
+    #type(str) -> tuple
+    """ output_file's own extension (e.g. .csv), then OUTPUT_EXTS. """
+    ext = os.path.splitext(output_file)[1]
+    if ext and ext not in OUTPUT_EXTS:
+        return (ext,) + OUTPUT_EXTS
+    return OUTPUT_EXTS
+
+
+def folder_size(folder):
+    #type(str) -> int
+    return sum(os.path.getsize(os.path.join(dirpath, file_name))
+               for dirpath, __, file_names in os.walk(folder)
+               for file_name in file_names
+              )
+
+
+class ResultsCache(object):
+    """ Each entry is a sub folder named by its key, containing copies of
+        the output files.  Its modification time is its last use.
+    """
+
+    def __init__(self, options = ResultsCacheOptions):
+        self.folder = options.results_cache_dir
+        self.max_bytes = int(options.results_cache_max_MB * 1024 * 1024)
+
+    def entry(self, key):
+        return os.path.join(self.folder, key)
+
+    def get(self, key, output_file):
+        #type(str, str) -> bool
+        """ Copies the cached output files for key to output_file (and its
+            sidecar files).  Returns True if there were any, else False.
+        """
+        entry = self.entry(key)
+        if not os.path.isdir(entry):
+            return False
+        name = os.path.splitext(output_file)[0]
+        cached_files = [(os.path.join(entry, ENTRY_FILE_NAME + ext), name + ext)
+                        for ext in output_exts(output_file)
+                       ]
+        cached_files = [(path, dest) for path, dest in cached_files if os.path.isfile(path)]
+        if not cached_files:
+            logger.debug('Deleting empty results cache entry: %s' % key)
+            shutil.rmtree(entry, ignore_errors = True)
+            return False
+        for path, dest in cached_files:
+            shutil.copyfile(path, dest)
+        os.utime(entry, None)
+        logger.debug('Results cache hit: %s' % key)
+        return True
+
+    def put(self, key, output_file):
+        #type(str, str) -> None
+        """ Caches the output files of output_file, for key. """
+        if os.path.isdir(self.entry(key)):
+            os.utime(self.entry(key), None)
+            return
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+        # Copy to a temporary folder first, so an entry is only ever
+        # found complete.
+        tmp_entry = tempfile.mkdtemp(dir = self.folder, prefix = '.tmp_')
+        name = os.path.splitext(output_file)[0]
+        exts = [ext for ext in output_exts(output_file) if os.path.isfile(name + ext)]
+        if not exts:
+            logger.warning('No output files to cache for: %s' % output_file)
+            shutil.rmtree(tmp_entry, ignore_errors = True)
+            return
+        for ext in exts:
+            shutil.copyfile(name + ext
+                           ,os.path.join(tmp_entry, ENTRY_FILE_NAME + ext)
+                           )
+        try:
+            os.rename(tmp_entry, self.entry(key))
+        except OSError:
+            # Already cached, e.g. by a concurrent run.
+            shutil.rmtree(tmp_entry, ignore_errors = True)
+        self.evict()
+
+    def evict(self):
+        #type() -> None
+        """ Deletes the least recently used entries until the cache's total
+            size is no more than max_bytes.
+        """
+        entries = []
+        for key in os.listdir(self.folder):
+            entry = self.entry(key)
+            if key.startswith('.') or not os.path.isdir(entry):
+                continue
+            entries.append((os.path.getmtime(entry), folder_size(entry), entry))
+        total = sum(size for __, size, __ in entries)
+        for __, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            logger.debug('Evicting from results cache: %s' % entry)
+            shutil.rmtree(entry, ignore_errors = True)
+            total -= size
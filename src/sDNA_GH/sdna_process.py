@@ -0,0 +1,227 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Runs sDNA commands in a subprocess, streaming each line of its stdout 
+    and stderr to callbacks (e.g. a logger's methods) as soon as it is 
+    printed, instead of all at once when it exits (as check_output does).  
+    Lines reporting sDNA's progress percentage are also passed to a 
+    progress callback.  A run can be given a timeout, and cancelled 
+    cooperatively (from another thread) via an Event.  In either case the 
+    process and any processes it started are killed.  
+
+    Standard library only (Python 2 and 3).
+"""
+
+import os
+import re
+import sys
+import time
+import shlex
+import signal
+import logging
+import threading
+import subprocess
+
+if sys.version_info.major <= 2:
+    import Queue as queue
+else:
+    import queue
+
+try:
+    basestring #type: ignore
+except NameError:
+    basestring = str
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+# e.g. 'Progress: 42%' or 'sDNA progress 42.5 %'
+PROGRESS_PATTERN = r'(?i)progress\D*?(\d+(?:\.\d+)?)\s*%'
+
+
+class ProcessRunnerOptions(object):
+    sDNA_timeout = None # Seconds to let sDNA run for before killing it. 
+                        # None to wait for it to finish, however long.
+    sDNA_progress_pattern = PROGRESS_PATTERN # Regex.  Group 1 is the percentage.
+
+
+class ProcessTimeoutError(Exception):
+    def __init__(self, command, timeout, output = ''):
+        super(ProcessTimeoutError, self).__init__(
+                        'Killed: %s after timeout: %s seconds. ' % (command, timeout)
+                        )
+        self.command = command
+        self.timeout = timeout
+        self.output = output
+
+
+class ProcessCancelledError(Exception):
+    def __init__(self, command, output = ''):
+        super(ProcessCancelledError, self).__init__('Cancelled: %s ' % command)
+        self.command = command
+        self.output = output
+
+
+def kill_process_tree(process):
+    #type(subprocess.Popen) -> None
+    """ Kills process and its child processes (on Windows with taskkill, 
+        otherwise by killing its process group, which run_process started
+        it in a new one of).
+    """
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == 'nt':
+            with open(os.devnull, 'w') as devnull:
+                subprocess.call(['taskkill', '/F', '/T', '/PID', str(process.pid)]
+                               ,stdout = devnull
+                               ,stderr = devnull
+                               )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    if process.poll() is None:
+        try:
+            process.kill()
+        except OSError:
+            pass
+    process.wait()
+
+
+def enqueue_lines(stream, name, lines):
+    #type(file, str, queue.Queue) -> None
+    try:
+        for line in iter(stream.readline, ''):
+            lines.put((name, line))
+    except (IOError, OSError, ValueError):
+        pass # stream closed after its process was killed.
+    lines.put((name, None))
+
+
+def run_process(command
+               ,output = None
+               ,errors = None
+               ,progress = None
+               ,timeout = None
+               ,cancel_event = None
+               ,progress_pattern = PROGRESS_PATTERN
+               ,poll_interval = 0.05
+               ):
+    #type(str / list, function, function, function, float, threading.Event, str, float) -> int, str
+    """ Runs command, calling output on each line of its stdout and errors
+        (output by default) on each line of its stderr, in this thread,
+        as soon as they are printed.  progress is called on the percentage
+        (a float) in each line matching progress_pattern.  
+        
+        Raises ProcessTimeoutError if command is still running after 
+        timeout seconds, and ProcessCancelledError if cancel_event is set
+        before it finishes, after killing its process tree.  
+
+        Returns its return code and all its output.
+    """
+    if errors is None:
+        errors = output
+    progress_regex = re.compile(progress_pattern)
+
+    popen_kwargs = {}
+    if os.name != 'nt':
+        # Windows programs parse the command line themselves.
+        if isinstance(command, basestring):
+            command = shlex.split(command)
+        popen_kwargs['preexec_fn'] = os.setsid
+
+    process = subprocess.Popen(command
+                              ,stdout = subprocess.PIPE
+                              ,stderr = subprocess.PIPE
+                              ,universal_newlines = True
+                              ,**popen_kwargs
+                              )
+
+    lines = queue.Queue()
+    readers = [threading.Thread(target = enqueue_lines
+                               ,args = (stream, name, lines)
+                               )
+               for stream, name in ((process.stdout, 'stdout')
+                                   ,(process.stderr, 'stderr')
+                                   )
+              ]
+    for reader in readers:
+        reader.daemon = True
+        reader.start()
+
+    if timeout is not None:
+        deadline = time.time() + timeout
+
+    all_lines = []
+    open_streams = len(readers)
+    try:
+        while open_streams or process.poll() is None:
+            try:
+                name, line = lines.get(timeout = poll_interval)
+            except queue.Empty:
+                pass
+            else:
+                if line is None:
+                    open_streams -= 1
+                else:
+                    all_lines.append(line)
+                    line = line.rstrip('\r\n')
+                    callback = output if name == 'stdout' else errors
+                    if callback is not None:
+                        callback(line)
+                    match = progress_regex.search(line)
+                    if progress is not None and match:
+                        progress(float(match.group(1)))
+
+            if cancel_event is not None and cancel_event.is_set():
+                kill_process_tree(process)
+                e = ProcessCancelledError(command, ''.join(all_lines))
+                logger.error(str(e))
+                raise e
+
+            if timeout is not None and time.time() > deadline:
+                kill_process_tree(process)
+                e = ProcessTimeoutError(command, timeout, ''.join(all_lines))
+                logger.error(str(e))
+                raise e
+    finally:
+        kill_process_tree(process)
+        for reader in readers:
+            reader.join(1) # EOF is immediate, unless an unkilled 
+                           # grandchild still holds the pipes open.
+        for stream in (process.stdout, process.stderr):
+            try:
+                stream.close()
+            except IOError:
+                pass # Still being read in Python 2.
+
+    return process.returncode, ''.join(all_lines)
@@ -0,0 +1,406 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" A long lived Python worker process to run sDNA commands in, and a client
+    class (Worker) for sDNA_GH to send it jobs.  The worker imports the sDNA
+    modules once, so each job does not pay for interpreter start up, or for
+    importing sDNA.
+
+    Only the standard library is used, as this module is also run as a
+    script by the Python interpreter that runs sDNA (Python 2 or 3), e.g.:
+    python -u -E sdna_worker.py <sDNA folder> sDNAUISpec runsdnacommand
+
+    Each job is a line of JSON on the worker's stdin:
+    {"script" : <path of .py file>, "argv" : [<args>, ...]}.
+    Its output lines are streamed back on the worker's stdout, followed by
+    a line starting with DONE_SENTINEL, and then the job's return code.
+    A job can be given a timeout, and cancelled cooperatively (from 
+    another thread) via an Event.  In either case the worker is killed, 
+    and restarted for the next job.
+"""
+
+import os
+import sys
+import json
+import time
+import runpy
+import atexit
+import logging
+import threading
+import subprocess
+import traceback
+
+if sys.version_info.major <= 2:
+    import Queue as queue
+else:
+    import queue
+
+try:
+    from .sdna_process import kill_process_tree
+except (ImportError, ValueError): # Run as a script, by sDNA's Python.
+    kill_process_tree = None
+
+
+try:
+    basestring #type: ignore
+except NameError:
+    basestring = str
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+DONE_SENTINEL = '__sDNA_GH_worker_job_done__ '
+
+WORKER_SCRIPT = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+
+
+def split_command_line(command_line):
+    #type(str) -> list
+    """ Splits a command line string into a list of args (sys.argv[1:]),
+        following the quoting rules of the Microsoft C runtime (that the
+        Python interpreter on Windows parses its command line with):
+        backslashes are literal, unless they precede a double quote.
+    """
+    args = []
+    arg = []
+    in_arg = False
+    in_quotes = False
+    backslashes = 0
+    for char in command_line:
+        if char == '\\':
+            backslashes += 1
+            in_arg = True
+            continue
+        if char == '"':
+            arg.append('\\' * (backslashes // 2))
+            if backslashes % 2:
+                arg.append('"')
+            else:
+                in_quotes = not in_quotes
+            backslashes = 0
+            in_arg = True
+            continue
+        arg.append('\\' * backslashes)
+        backslashes = 0
+        if char in ' \t' and not in_quotes:
+            if in_arg:
+                args.append(''.join(arg))
+                arg = []
+                in_arg = False
+            continue
+        arg.append(char)
+        in_arg = True
+    arg.append('\\' * backslashes)
+    if in_arg:
+        args.append(''.join(arg))
+    return args
+
+
+class LineStartTracker(object):
+    """ File-like wrapper of a stream, recording if the last character
+        written to it ended a line.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.at_line_start = True
+
+    def write(self, text):
+        if text:
+            self.stream.write(text)
+            self.at_line_start = text.endswith('\n')
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+
+def run_job(script, argv, stream):
+    #type(str, list, file) -> int
+    """ Runs script as __main__, as if by python script *argv, writing its
+        output and any errors to stream.  Returns its return code.
+    """
+    out = LineStartTracker(stream)
+    old_argv, old_path = sys.argv, sys.path[:]
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.argv = [script] + list(argv)
+    sys.path.insert(0, os.path.dirname(script))
+    sys.stdout = sys.stderr = out
+    try:
+        runpy.run_path(script, run_name = '__main__')
+        retcode = 0
+    except SystemExit as e:
+        if e.code is None:
+            retcode = 0
+        elif isinstance(e.code, int):
+            retcode = e.code
+        else:
+            out.write('%s\n' % e.code)
+            retcode = 1
+    except Exception:
+        traceback.print_exc()
+        retcode = 1
+    finally:
+        sys.argv, sys.path[:] = old_argv, old_path
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+
+    if not out.at_line_start:
+        stream.write('\n')
+    stream.write('%s%s\n' % (DONE_SENTINEL, retcode))
+    stream.flush()
+    return retcode
+
+
+def native_str(text):
+    #type(unicode / str) -> str
+    """ json decodes strings to unicode in Python 2, but sys.argv is str. """
+    if isinstance(text, str):
+        return text
+    return text.encode(sys.getfilesystemencoding() or 'utf-8')
+
+
+def worker_main(argv = None):
+    #type(list) -> None
+    """ The worker's job loop.  argv is the sDNA folder, followed by the
+        names of modules to import from it before the first job.  Runs
+        until its stdin is closed.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv:
+        folder, module_names = argv[0], argv[1:]
+        sys.path.insert(0, folder)
+        for module_name in module_names:
+            try:
+                __import__(module_name)
+            except ImportError:
+                # Importing up front is only an optimisation.
+                sys.stderr.write('Could not import: %s\n' % module_name)
+
+    stdin, stdout = sys.stdin, sys.stdout
+    while True:
+        line = stdin.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        job = json.loads(line)
+        run_job(native_str(job['script'])
+               ,[native_str(arg) for arg in job['argv']]
+               ,stdout
+               )
+
+
+class WorkerCrashedError(Exception):
+    pass
+
+
+class WorkerTimeoutError(Exception):
+    pass
+
+
+class WorkerCancelledError(Exception):
+    pass
+
+
+def enqueue_lines(stream, lines):
+    #type(file, queue.Queue) -> None
+    try:
+        for line in iter(stream.readline, ''):
+            lines.put(line)
+    except (IOError, OSError, ValueError):
+        pass # stream closed after the worker was killed.
+    lines.put(None)
+
+
+class Worker(object):
+    """ Client for a worker process, started by command.  The worker is
+        restarted automatically for the next job if it has exited or 
+        crashed.  A job that was running when it crashed raises 
+        WorkerCrashedError (after being retried up to max_retries times).
+    """
+    def __init__(self, command, max_retries = 0, poll_interval = 0.05):
+        #type(list, int, float) -> None
+        self.command = list(command)
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self.process = None
+        self.lines = None
+        self.reader = None
+        self.num_starts = 0
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.stop()
+        logger.info('Starting worker: %s' % self.command)
+        popen_kwargs = {}
+        if os.name != 'nt':
+            # In a new process group, so kill_process_tree can kill it and
+            # any processes a job started (e.g. sDNA's own).
+            popen_kwargs['preexec_fn'] = os.setsid
+        self.process = subprocess.Popen(self.command
+                                       ,stdin = subprocess.PIPE
+                                       ,stdout = subprocess.PIPE
+                                       ,universal_newlines = True
+                                       ,**popen_kwargs
+                                       )
+        # Read on a thread, so a job's output can be waited for with a 
+        # timeout, and cancelled.
+        self.lines = queue.Queue()
+        self.reader = threading.Thread(target = enqueue_lines
+                                      ,args = (self.process.stdout, self.lines)
+                                      )
+        self.reader.daemon = True
+        self.reader.start()
+        self.num_starts += 1
+
+    def stop(self, kill = False):
+        #type(bool) -> None
+        """ Stops the worker, at the end of its current job (or right away 
+            if kill, with any processes the job started).
+        """
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if not kill:
+            try:
+                process.stdin.close()  # The worker exits at EOF
+            except (IOError, OSError):
+                pass
+        if kill:
+            kill_process_tree(process)
+        elif process.poll() is None:
+            process.terminate()
+        process.wait()
+        self.reader.join(1)
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except (IOError, OSError):
+                pass # Still being read in Python 2.
+
+    def _run(self, script, argv, output = None, timeout = None, cancel_event = None):
+        #type(str, list, function, float, threading.Event) -> int, str
+        job = json.dumps(dict(script = script, argv = list(argv)))
+        try:
+            self.process.stdin.write(job + '\n')
+            self.process.stdin.flush()
+        except (IOError, OSError, ValueError):
+            raise WorkerCrashedError('Could not send job to worker. ')
+
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        lines = []
+        while True:
+            try:
+                line = self.lines.get(timeout = self.poll_interval)
+            except queue.Empty:
+                line = ''
+            if line is None:
+                raise WorkerCrashedError('Worker exited with return code: %s '
+                                         % self.process.wait()
+                                        )
+            if line.startswith(DONE_SENTINEL):
+                return int(line[len(DONE_SENTINEL):]), ''.join(lines)
+            if line:
+                lines.append(line)
+                if output is not None:
+                    output(line.rstrip('\n'))
+
+            if cancel_event is not None and cancel_event.is_set():
+                self.stop(kill = True)
+                msg = 'Cancelled: %s %s ' % (script, argv)
+                logger.error(msg)
+                raise WorkerCancelledError(msg)
+
+            if timeout is not None and time.time() > deadline:
+                self.stop(kill = True)
+                msg = ('Killed worker running: %s %s after timeout: %s seconds. '
+                      % (script, argv, timeout)
+                      )
+                logger.error(msg)
+                raise WorkerTimeoutError(msg)
+
+    def run(self, script, argv, output = None, timeout = None, cancel_event = None):
+        #type(str, list, function, float, threading.Event) -> int, str
+        """ Runs script with argv in the worker, calling output on each of
+            its output lines as they arrive.  Returns its return code and
+            all its output.  
+
+            Raises WorkerTimeoutError if the job is still running after 
+            timeout seconds, and WorkerCancelledError if cancel_event is 
+            set before it finishes, after killing the worker.
+        """
+        for __ in range(self.max_retries + 1):
+            if not self.is_alive():
+                self.start()
+            try:
+                return self._run(script, argv, output, timeout, cancel_event)
+            except WorkerCrashedError as e:
+                logger.warning(str(e))
+                self.stop() # The next job (or retry) restarts the worker.
+        msg = ('Worker crashed running: %s %s, %s time(s). '
+               % (script, argv, self.max_retries + 1)
+              )
+        logger.error(msg)
+        raise WorkerCrashedError(msg)
+
+
+workers = {}
+
+
+def get_worker(python, folder, module_names = ()):
+    #type(str, str, Iterable[str]) -> Worker
+    """ Returns the worker for python that has imported module_names from
+        folder, creating it if need be.
+    """
+    key = (python, folder, tuple(module_names))
+    if key not in workers:
+        workers[key] = Worker([python, '-u', '-E', WORKER_SCRIPT, folder]
+                              + list(module_names)
+                             )
+    return workers[key]
+
+
+@atexit.register
+def stop_workers():
+    for worker in workers.values():
+        worker.stop()
+
+
+if __name__ == '__main__':
+    worker_main()
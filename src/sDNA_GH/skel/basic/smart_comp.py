@@ -54,6 +54,8 @@ __version__ = '3.0.0'
 
 import logging
 import inspect
+import types
+import weakref
 import collections
 from numbers import Number
 if hasattr(collections, 'Sequence'):
@@ -108,20 +110,59 @@ def first_item_if_seq(l, null_container = {}):
 
 
 
+if hasattr(inspect, 'getargspec'):
+    getargspec = inspect.getargspec
+else:
+    ArgSpec = collections.namedtuple('ArgSpec', 'args varargs keywords defaults')
+    def getargspec(func):
+        #type(function) -> ArgSpec
+        # inspect.getargspec was removed in Python 3.11
+        return ArgSpec(*inspect.getfullargspec(func)[:4])
+
+
+def args_spec_key(callable):
+    #type(Callable) -> Callable | None
+    """ The function or class whose signature determines callable's argspec 
+        (so all bound methods of a function, and all instances of a class, 
+        share an argspec), or None if it could depend on the instance 
+        (e.g. for a functools.partial).
+    """
+    if isinstance(callable, types.MethodType):
+        return callable.__func__
+    if isinstance(callable, types.FunctionType):
+        return callable
+    call = getattr(callable.__class__, '__call__', None)
+    if isinstance(getattr(call, '__func__', call), types.FunctionType):
+        return callable.__class__
+    return None
+
+
+args_specs = weakref.WeakKeyDictionary()
+binding_plans = weakref.WeakKeyDictionary()
+
+
 def get_args_spec(callable):
     if not isinstance(callable, Callable):
         raise TypeError('Argument is not callable, therefore has no args')
     # assert hasattr(callable, '__call__')
+
+    key = args_spec_key(callable)
+    if key in args_specs:
+        return args_specs[key]
+
     try:
-        arg_spec = inspect.getargspec(callable)
+        arg_spec = getargspec(callable)
     except TypeError:
         try:
-            arg_spec = inspect.getargspec(callable.__call__)
+            arg_spec = getargspec(callable.__call__)
         except TypeError:
             raise Exception("Could not get argspec for " + str(callable))
     
     if arg_spec.args[0] in ('self', 'cls'):
         arg_spec = arg_spec._replace(args = arg_spec.args[1:])
+
+    if key is not None:
+        args_specs[key] = arg_spec
     return arg_spec
 
 
@@ -205,18 +246,29 @@ def component_Outputs(self, sources):
 
 
 
-def prepare_args(function
-                ,params_dict
-                ,anon_pos_args = []
-                ,anon_kwargs = []
-                ,prioritise_kwargs = True
-                ,add_unrecognised_names_to_pos_args = False
-                ):
-    #type(function, dict, list, list, bool, bool) -> tuple, dict
-    argspec = get_args_spec(function)
-    logger.debug('argspec(function) == %s ' % argspec)
+def make_binding_plan(argspec
+                      ,param_names
+                      ,anon_pos_args = ()
+                      ,anon_kwargs = ()
+                      ,prioritise_kwargs = True
+                      ,add_unrecognised_names_to_pos_args = False
+                      ):
+    #type(ArgSpec, tuple, tuple, tuple, bool, bool) -> tuple, tuple
+    """ Works out which of param_names (e.g. the keys of a dict of Input Param 
+        values) to pass to a function with argspec as positional args (in 
+        order), and which as keyword args.  
 
-    params_dict = params_dict.copy()  #We'll be popping keys out later
+        Returns: the param names to pass as positional args, and a tuple of 
+        (keyword, param name) pairs.  
+    """
+    logger.debug('argspec(function) == %s ' % (argspec,))
+
+    anon_pos_args, anon_kwargs = list(anon_pos_args), list(anon_kwargs)
+
+    # Bind each param name to itself.  We'll be popping keys out later
+    params_dict = OrderedDict((param_name, param_name) 
+                              for param_name in param_names
+                             )  
 
     args_dict = {}
     pos_args = {} # positional arguments
@@ -268,7 +320,7 @@ def prepare_args(function
                 # and this tool was intended for different usage.
         elif not prioritise_kwargs:
             if param_name in anon_pos_args and argspec.varargs:
-                unnamed_pos_args += (params_dict.pop(param_name))
+                unnamed_pos_args += (params_dict.pop(param_name),)
             elif param_name in anon_kwargs and argspec.keywords:
                 args_dict[param_name] = params_dict.pop(param_name)
             #else:  unnamed_pos_args == anon_kwargs == [] etc. 
@@ -318,7 +370,39 @@ def prepare_args(function
     #logger.debug('pos_args == %s ' % pos_args_tupl))
     #logger.debug('args_dict == %s ' % args_dict))
 
-    return pos_args_tupl, args_dict
+    return pos_args_tupl, tuple(args_dict.items())
+
+
+def prepare_args(function
+                ,params_dict
+                ,anon_pos_args = []
+                ,anon_kwargs = []
+                ,prioritise_kwargs = True
+                ,add_unrecognised_names_to_pos_args = False
+                ):
+    #type(function, dict, list, list, bool, bool) -> tuple, dict
+    """ Binds the values in params_dict to function's args, according to
+        a binding plan made (by make_binding_plan) the first time function 
+        (or any other instance of its class) is called with the same keys,
+        and cached.  
+    """
+    plan_key = (tuple(params_dict)
+               ,tuple(anon_pos_args)
+               ,tuple(anon_kwargs)
+               ,prioritise_kwargs
+               ,add_unrecognised_names_to_pos_args
+               )
+    key = args_spec_key(function)
+    plans = {} if key is None else binding_plans.setdefault(key, {})
+
+    if plan_key not in plans:
+        plans[plan_key] = make_binding_plan(get_args_spec(function), *plan_key)
+
+    pos_arg_names, kwarg_names = plans[plan_key]
+
+    return (tuple(params_dict[name] for name in pos_arg_names)
+           ,dict((kwarg, params_dict[name]) for kwarg, name in kwarg_names)
+           )
 
 
 def delistify(l):
@@ -359,9 +443,10 @@ def custom_inputs_class_deco(BaseComponent
         # If tools accept **kwargs or *args
         # duped kwargs or args could be a problem here. ymmv.
 
-            logger.debug('\n'.join('%s : %s' %(key, value) if isinstance(value, (str, Number, bool)) else key 
-                                   for key, value in params_dict.items())
-                        )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('\n'.join('%s : %s' %(key, value) if isinstance(value, (str, Number, bool)) else key 
+                                       for key, value in params_dict.items())
+                            )
 
             pos_args, args_dict = prepare_args(self.script
                                               ,params_dict = params_dict
@@ -35,7 +35,7 @@ __version__ = '3.0.0'
 import os
 import logging
 import itertools
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 import System  #.Net from IronPython #type: ignore
 
 import Rhino #type: ignore
@@ -162,7 +162,29 @@ def get_geom_and_source_else_leave(obj):
 #     return ghdoc.Objects.FindGeometry(obj)
 
 
-# One call in Read_Geom, 3 calls in Write_Shp
+def is_shape_in_source(obj, source, shp_type):
+    #type(type[any], type[any], str) -> bool
+    """ is_shape, for obj already found in source by 
+        get_geom_and_source_else_leave.
+    """
+    if not funcs.is_uuid(obj):
+        return False
+        #We might have legend tags, group names or layer names in the gdm
+
+    allowers = Rhino_obj_checkers_for_shape[shp_type]
+    if isinstance(allowers, basestring):
+        allowers = [allowers] 
+    tmp = sc.doc
+    sc.doc = source
+    try:
+        return any( getattr(rs, allower )( obj ) if isinstance(allower, basestring) else allower(obj)
+                    for allower in allowers
+                  )
+    finally:
+        sc.doc = tmp
+
+
+# One call in Read_Geom.  Write_Shp uses a GeomResolutionCache.
 def is_shape(obj, shp_type):   #e.g. polyline
     # type(type[any], str) -> bool
 
@@ -185,24 +207,81 @@ def is_shape(obj, shp_type):   #e.g. polyline
         msg += 'not object Geometry: %s, obj: %s ' % (type(obj), obj)
         raise NotImplementedError(msg) 
     
-    if not funcs.is_uuid(obj):
-        return False
-        #We might have legend tags, group names or layer names in the gdm
-
-    allowers = Rhino_obj_checkers_for_shape[shp_type]
-    if isinstance(allowers, basestring):
-        allowers = [allowers] 
     # logging.DEBUG == 10
     # This module logger, the package logger, and one of its handlers need to 
     # be set to level 1 to see these log messages
-    tmp = sc.doc
-    sc.doc = source
-    retval = any( getattr(rs, allower )( obj ) if isinstance(allower, basestring) else allower(obj)
-                  for allower in allowers
-                )
-    sc.doc = tmp
-    
-    return retval
+    return is_shape_in_source(obj, source, shp_type)
+
+
+class ResolvedGeom(object):
+    __slots__ = ('geom', 'source', 'is_shape', 'points')
+
+    def __init__(self, geom, source, is_shape, points = None):
+        self.geom = geom
+        self.source = source
+        self.is_shape = is_shape
+        self.points = points
+
+
+class GeomResolutionCache(object):
+    """ Per run cache of each object's geometry, the document it was found
+        in, whether it is a shp_type shape, and its list of vertices, so that
+        validating, mangling and writing a shapefile's shapes only parse 
+        each Guid and look it up in the Rhino and Grasshopper documents once.
+
+        is_shape and get_points are drop in replacements for is_shape and 
+        get_points_from_obj (e.g. for pyshp_wrapper.write_iterable_to_shp).
+    """
+    def __init__(self
+                ,shp_type = 'POLYLINEZ'
+                ,get_geom_and_source = get_geom_and_source_else_leave
+                ,is_shape_in_source = is_shape_in_source
+                ,get_points_from_geom = get_points_from_obj
+                ):
+        self.shp_type = shp_type
+        self.get_geom_and_source = get_geom_and_source
+        self.is_shape_in_source = is_shape_in_source
+        self.get_points_from_geom = get_points_from_geom
+        self.resolved = {}
+
+    def resolve(self, obj):
+        #type(type[any]) -> ResolvedGeom
+        if obj in self.resolved:
+            return self.resolved[obj]
+        geom, source = self.get_geom_and_source(obj)
+        if source == SOURCES.IS_ALREADY_GEOM:
+            msg = 'Call is_shape on Rhino or Grasshopper Guid, '
+            msg += 'not object Geometry: %s, obj: %s ' % (type(obj), obj)
+            logger.error(msg)
+            raise NotImplementedError(msg) 
+        resolved = ResolvedGeom(geom
+                               ,source
+                               ,self.is_shape_in_source(obj, source, self.shp_type)
+                               )
+        self.resolved[obj] = resolved
+        return resolved
+
+    def resolve_all(self, objs):
+        #type(Iterable) -> list
+        """ Resolves each of objs, in one pass.  Returns the ones that are 
+            not shp_type shapes. 
+        """
+        return [obj for obj in objs if not self.resolve(obj).is_shape]
+
+    def is_shape(self, obj, shp_type = None):
+        #type(type[any], str) -> bool
+        if shp_type is not None and shp_type != self.shp_type:
+            return is_shape(obj, shp_type)
+        return self.resolve(obj).is_shape
+
+    def get_points(self, obj):
+        #type(type[any]) -> list
+        resolved = self.resolve(obj)
+        if resolved.points is None:
+            resolved.points = self.get_points_from_geom(resolved.geom
+                                                       ,self.shp_type
+                                                       )
+        return resolved.points
 
 Rhino_obj_code_for_shape = dict(NULL = None
                                ,POINT = 1         
@@ -230,6 +309,165 @@ def get_Rhino_objs(shp_type='POLYLINEZ'):
                            ,state = 0
                            )
 
+
+def is_polyline_geom(geom):
+    #type(Rhino.Geometry.Curve) -> bool
+    """ The checks of is_shape for polylines (IsLine, IsPolyline and 
+        is_degree_1_Nurbs_Curve), on a curve's geometry instead of its id.
+    """
+    return geom.Degree == 1 or geom.IsPolyline()
+
+Rhino_geom_checkers_for_obj_code = {4 : is_polyline_geom}
+
+
+def doc_objects(doc):
+    #type(Rhino.RhinoDoc) -> Iterable[Rhino.DocObjects.RhinoObject]
+    """ The objects of doc that get_Rhino_objs searches (all except 
+        deleted objects, lights and grips).
+    """
+    # https://github.com/mcneel/rhinoscriptsyntax/blob/c49bd0bf24c2513bdcb84d1bf307144489600fd9/Scripts/rhinoscript/selection.py#L368
+    settings = Rhino.DocObjects.ObjectEnumeratorSettings()
+    settings.DeletedObjects = False
+    settings.ActiveObjects = True
+    settings.ReferenceObjects = True
+    settings.IncludeLights = False
+    settings.IncludeGrips = False
+    settings.NormalObjects = True
+    settings.LockedObjects = True
+    settings.HiddenObjects = True
+    return doc.Objects.GetObjectList(settings)
+
+
+class RhinoDocIndex(object):
+    """ The ids of a Rhino document's objects by object type code (as in 
+        Rhino_obj_code_for_shape) and layer (full path, as returned by 
+        rs.ObjectLayer), and the ids of its selected objects.  Built in 
+        one pass over its object table, instead of calling is_shape, 
+        rs.ObjectLayer and rs.IsObjectSelected on each object.  
+        
+        Objects whose geometry fails the checker for their type code in 
+        geom_checkers (e.g. curves that are not polylines) are left out.
+    """
+    def __init__(self
+                ,objects
+                ,layer_name
+                ,geom_checkers = Rhino_geom_checkers_for_obj_code
+                ):
+        #type(Iterable[RhinoObject], function, dict) -> None
+        self.ids = {} # type code -> [ids] (in object table order)
+        self.ids_by_layer = {} # type code -> OrderedDict(layer -> [ids])
+        self.positions = {} # id -> position in object table
+        self.selected = set()
+        layer_names = {}
+        for position, obj in enumerate(objects):
+            code = int(obj.ObjectType)
+            checker = geom_checkers.get(code)
+            if checker is not None and not checker(obj.Geometry):
+                continue
+            layer_index = obj.Attributes.LayerIndex
+            if layer_index not in layer_names:
+                layer_names[layer_index] = layer_name(layer_index)
+            layer = layer_names[layer_index]
+            id_ = str(obj.Id)
+            self.ids.setdefault(code, []).append(id_)
+            by_layer = self.ids_by_layer.setdefault(code, OrderedDict())
+            by_layer.setdefault(layer, []).append(id_)
+            self.positions[id_] = position
+            if obj.IsSelected(False):
+                self.selected.add(id_)
+
+    @classmethod
+    def from_doc(cls, doc):
+        #type(Rhino.RhinoDoc) -> RhinoDocIndex
+        return cls(objects = doc_objects(doc)
+                  ,layer_name = lambda index: doc.Layers[index].FullPath
+                  )
+
+    def get_ids(self, shp_type = 'POLYLINEZ', layers = (), only_selected = False):
+        #type(str, Iterable[str], bool) -> list
+        """ The ids of the objects of shp_type in object table order, only 
+            from layers (if any), and only selected ones if only_selected.
+        """
+        code = Rhino_obj_code_for_shape[shp_type]
+        if layers:
+            by_layer = self.ids_by_layer.get(code, {})
+            layers = set(layers)
+            ids = [id_ 
+                   for layer in layers 
+                   for id_ in by_layer.get(layer, ())
+                  ]
+            if len(layers) >= 2:
+                ids.sort(key = self.positions.get)
+        else:
+            ids = self.ids.get(code, [])
+        if only_selected:
+            return [id_ for id_ in ids if id_ in self.selected]
+        return ids[:]
+
+
+class RhinoDocIndexCache(object):
+    """ RhinoDocIndexes of Rhino documents (by runtime serial number), 
+        kept until a document event adds, deletes or modifies an object, 
+        or changes the layer table.  Selection events just update the 
+        selected ids of the cached index.
+    """
+    def __init__(self, index_factory = RhinoDocIndex.from_doc):
+        self.index_factory = index_factory
+        self.indices = {}
+        self.subscribed = False
+
+    def subscribe(self):
+        Rhino.RhinoDoc.AddRhinoObject += self.invalidate
+        Rhino.RhinoDoc.DeleteRhinoObject += self.invalidate
+        Rhino.RhinoDoc.UndeleteRhinoObject += self.invalidate
+        Rhino.RhinoDoc.ReplaceRhinoObject += self.invalidate
+        Rhino.RhinoDoc.ModifyObjectAttributes += self.invalidate
+        Rhino.RhinoDoc.LayerTableEvent += self.invalidate
+        Rhino.RhinoDoc.CloseDocument += self.invalidate
+        Rhino.RhinoDoc.SelectObjects += self.update_selection
+        Rhino.RhinoDoc.DeselectObjects += self.update_selection
+        Rhino.RhinoDoc.DeselectAllObjects += self.clear_selection
+        self.subscribed = True
+
+    def get(self, doc):
+        #type(Rhino.RhinoDoc) -> RhinoDocIndex
+        if not self.subscribed:
+            self.subscribe()
+        key = doc.RuntimeSerialNumber
+        if key not in self.indices:
+            self.indices[key] = self.index_factory(doc)
+        return self.indices[key]
+
+    def invalidate(self, sender = None, e = None):
+        self.indices.clear()
+
+    def update_selection(self, sender, e):
+        #type(type[any], Rhino.DocObjects.RhinoObjectSelectionEventArgs) -> None
+        index = self.indices.get(e.Document.RuntimeSerialNumber)
+        if index is None:
+            return
+        ids = [str(obj.Id) for obj in e.RhinoObjects]
+        if e.Selected:
+            index.selected.update(ids)
+        else:
+            index.selected.difference_update(ids)
+
+    def clear_selection(self, sender, e):
+        #type(type[any], Rhino.DocObjects.RhinoDeselectAllObjectsEventArgs) -> None
+        index = self.indices.get(e.Document.RuntimeSerialNumber)
+        if index is not None:
+            index.selected.clear()
+
+
+doc_index_cache = RhinoDocIndexCache()
+
+
+def get_doc_index(doc = None):
+    #type(Rhino.RhinoDoc) -> RhinoDocIndex
+    if doc is None:
+        doc = Rhino.RhinoDoc.ActiveDoc
+    return doc_index_cache.get(doc)
+
 Rhino_obj_adder_for_shape = dict(NULL = None
                                 ,POINT = 'AddPoint'
                                 ,MULTIPATCH = 'AddMesh'    
@@ -473,4 +711,72 @@ def add_GH_rectangle(xmin, ymin, xmax, ymax, plane = None):
     
     sc.doc = tmp
 
-    return leg_frame
\ No newline at end of file
+    return leg_frame
+
+def group_by_colour(objs_and_colours):
+    #type(Iterable[tuple[type[any], type[any]]]) -> OrderedDict
+    """ The objs of each colour, so each distinct colour is coerced once. """
+    groups = OrderedDict()
+    for obj, colour in objs_and_colours:
+        groups.setdefault(colour, []).append(obj)
+    return groups
+
+
+def recolour_objects(objs_and_colours
+                    ,doc
+                    ,line_width = None
+                    ,coerce_colour = rs.coercecolor
+                    ,to_guid = System.Guid
+                    ,colour_sources = None
+                    ):
+    #type(Iterable[tuple], Rhino.RhinoDoc, Number, function, type, tuple) -> list, list
+    """ Sets the colour of each of objs_and_colours' Rhino objects in doc,
+        through doc's object table with redraws suspended (and then one 
+        redraw), instead of rs.ObjectColor (which redraws) and then 
+        rs.ObjectPrintColorSource etc. per object.  
+        Each object's colour source (and if line_width is given, its print 
+        colour source, print width source and print width) is changed in 
+        one modification of its attributes.  
+        
+        Returns the recoloured objects, and the others (e.g. Grasshopper 
+        geometry, not in doc).
+    """
+    if colour_sources is None:
+        # As rs.ObjectColorSource(objs, 1), rs.ObjectPrintColorSource(objs, 2)
+        # and rs.ObjectPrintWidthSource(objs, 1) set them.
+        colour_sources = (Rhino.DocObjects.ObjectColorSource.ColorFromObject
+                         ,Rhino.DocObjects.ObjectPlotColorSource.PlotColorFromDisplay
+                         ,Rhino.DocObjects.ObjectPlotWeightSource.PlotWeightFromObject
+                         )
+    colour_source, print_colour_source, print_width_source = colour_sources
+
+    recoloured, not_recoloured = [], []
+    objects = doc.Objects
+    redraw_enabled = doc.Views.RedrawEnabled
+    doc.Views.RedrawEnabled = False
+    try:
+        for colour, objs in group_by_colour(objs_and_colours).items():
+            colour = coerce_colour(colour)
+            for obj in objs:
+                rhino_obj = None
+                if funcs.is_uuid(obj):
+                    rhino_obj = objects.FindId(to_guid(str(obj)))
+                if rhino_obj is None:
+                    not_recoloured.append(obj)
+                    continue
+                attributes = rhino_obj.Attributes.Duplicate()
+                attributes.ObjectColor = colour
+                attributes.ColorSource = colour_source
+                if line_width is not None:
+                    attributes.PlotColorSource = print_colour_source
+                    attributes.PlotWeightSource = print_width_source
+                    attributes.PlotWeight = line_width
+                if objects.ModifyAttributes(rhino_obj, attributes, True):
+                    recoloured.append(obj)
+                else:
+                    not_recoloured.append(obj)
+    finally:
+        doc.Views.RedrawEnabled = redraw_enabled
+    if recoloured and redraw_enabled:
+        doc.Views.Redraw()
+    return recoloured, not_recoloured
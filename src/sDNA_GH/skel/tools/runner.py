@@ -33,8 +33,15 @@ __version__ = '3.0.0'
 
 
 import logging
+import json
+import time
 from collections import OrderedDict
+import collections
 import abc
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None # Python < 3.4 and IronPython
 
 
 from ..basic import smart_comp
@@ -48,11 +55,114 @@ else:
         __metaclass__ = abc.ABCMeta
 abstractmethod = abc.abstractmethod
 
+if hasattr(collections, 'Mapping'):
+    Mapping = collections.Mapping
+else:
+    import collections.abc
+    Mapping = collections.abc.Mapping
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 tools_dict = OrderedDict()
 
+wall_clock = getattr(time, 'perf_counter', time.time)
+cpu_clock = time.process_time if hasattr(time, 'process_time') else time.clock
+
+
+class RunToolsOptions(object):
+    record_timings = False # Record each tool's run time in timings.
+    trace_memory = False # Also record each tool's peak memory use (this
+                         # requires tracemalloc, from Python 3.4).
+
+
+class Span(object):
+    """ Context manager that records the wall time, CPU time, and if memory 
+        is True and tracemalloc is tracing, the peak memory allocated by 
+        a block of code (in bytes), into self.record.  Sub spans (opened
+        by span in the block) are recorded in self.record['spans'], and 
+        report their peaks back to their parent span.
+    """
+    def __init__(self, name, memory = False, **info):
+        #type(str, bool, **type[any]) -> None
+        self.record = OrderedDict([('name', name)])
+        self.record.update(sorted(info.items()))
+        self.memory = memory and tracemalloc is not None and tracemalloc.is_tracing()
+        self.spans = []
+        self.parent = None
+        self.sub_spans_peak = 0
+
+    def __enter__(self):
+        global current_span
+        self.parent, current_span = current_span, self
+        if self.memory:
+            if (hasattr(tracemalloc, 'reset_peak') and # Python >= 3.9
+                (self.parent is None or not self.parent.memory)):
+                # Only in the outermost span, not to wipe its peak so far.
+                tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_cpu = cpu_clock()
+        self.start_wall = wall_clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        global current_span
+        self.record['wall_time'] = wall_clock() - self.start_wall
+        self.record['cpu_time'] = cpu_clock() - self.start_cpu
+        if self.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.sub_spans_peak)
+            self.record['peak_memory'] = peak - self.start_memory
+            if self.parent is not None and self.parent.memory:
+                self.parent.sub_spans_peak = max(self.parent.sub_spans_peak, peak)
+        if self.spans:
+            self.record['spans'] = [span.record for span in self.spans]
+        current_span = self.parent
+        if self.parent is not None:
+            self.parent.spans.append(self)
+        return False
+
+
+class NullSpan(object):
+    """ Does nothing, when not timing tools. """
+    record = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+current_span = None
+
+
+def span(name, **info):
+    #type(str, **type[any]) -> Span / NullSpan
+    """ A sub Span of the tool being timed by run_tools, or if no tool is 
+        being timed, NULL_SPAN (so timing parts of tools costs next to 
+        nothing when timings are not recorded).
+    """
+    if current_span is None:
+        return NULL_SPAN
+    return Span(name, memory = current_span.memory, **info)
+
+
+def num_gdm_entries(gdm):
+    #type(type[any]) -> int / None
+    """ The number of entries in gdm, or in a list of gdms. """
+    if isinstance(gdm, Mapping):
+        return len(gdm)
+    if isinstance(gdm, (list, tuple)) and all(isinstance(x, Mapping) for x in gdm):
+        return sum(len(x) for x in gdm)
+    return None
+
+
+def timing_line(record):
+    #type(dict) -> str
+    return json.dumps(record, default = str)
+
 
 class RunnableTool(ABC):    
     """ Template for tools that can be run by run_tools()
@@ -85,8 +195,16 @@ class RunnableTool(ABC):
 
 def run_tools(tools
              ,args_dict
-             ,enforceABC = False):  
-    #type(list[Tool], dict)-> dict
+             ,enforceABC = False
+             ,timings = None
+             ,trace_memory = RunToolsOptions.trace_memory
+             ):  
+    #type(list[Tool], dict, bool, list, bool)-> dict
+    """ Runs each tool in tools, on the values in args_dict and the return 
+        values of the tools before it.  If timings is a list, a record 
+        of each tool's run (from a Span, with the number of gdm entries
+        input to and output from it) is appended to it.
+    """
 
     if not isinstance(tools, list):
         tools = list(tools)
@@ -105,8 +223,25 @@ def run_tools(tools
 
     vals_dict = args_dict
 
-    
+    trace_memory = (timings is not None and 
+                    trace_memory and
+                    tracemalloc is not None and
+                    not tracemalloc.is_tracing()
+                   )
+    if trace_memory:
+        tracemalloc.start()
 
+    try:
+        run_each_tool(tools, vals_dict, timings)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return vals_dict
+
+
+def run_each_tool(tools, vals_dict, timings = None):
+    #type(list[Tool], dict, list) -> None
 
     logger.debug(tools)                            
     for tool in tools:
@@ -116,7 +251,7 @@ def run_tools(tools
 
         anon_pos_args = getattr(tool, 'anon_pos_args', [])
         anon_kwargs = getattr(tool, 'anon_kwargs', [])
-        logger.debug('vals_dict.keys() == %s ' % vals_dict.keys())
+        logger.debug('vals_dict.keys() == %s ', vals_dict.keys())
 
         pos_args, input_kw_args = smart_comp.prepare_args(
                                      function = tool
@@ -127,7 +262,22 @@ def run_tools(tools
                                     ,add_unrecognised_names_to_pos_args = False
                                     )
         
-        retvals = tool(*pos_args, **input_kw_args)
+        if timings is None:
+            retvals = tool(*pos_args, **input_kw_args)
+        else:
+            tool_span = Span(getattr(tool, 'tool_name', tool.__class__.__name__)
+                            ,memory = True
+                            ,gdm_in = num_gdm_entries(vals_dict.get('gdm'))
+                            )
+            timings.append(tool_span.record)
+            with tool_span:
+                retvals = tool(*pos_args, **input_kw_args)
+            retvals = tuple(retvals)
+            tool_span.record['gdm_out'] = num_gdm_entries(
+                                           dict(zip(tool.retvals, retvals)).get('gdm')
+                                           )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info('Timings: %s' % timing_line(tool_span.record))
 
 
         vals_dict.update( zip(tool.retvals, retvals) )
@@ -139,6 +289,4 @@ def run_tools(tools
                   +' exited with status code %s ' % retcode
                   )
             logger.error(msg)
-            raise Exception(msg)
-
-    return vals_dict     
\ No newline at end of file
+            raise Exception(msg)     
\ No newline at end of file
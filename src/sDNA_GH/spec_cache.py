@@ -0,0 +1,120 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Cache of the input specs of sDNA tools (from getInputSpec in 
+    sDNAUISpec.py), so sDNA_GH's components can be set up on a warm start
+    without importing sDNA at all.  Entries are keyed on the path and 
+    modification time of sDNAUISpec.py, and the tool name.
+"""
+
+import os
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class SpecCacheOptions(object):
+    use_spec_cache = True
+    spec_cache = os.path.join(os.path.dirname(__file__), 'input_specs_cache.json')
+
+
+def spec_key(sDNAUISpec_path, tool_name):
+    #type(str, str) -> str / None
+    """ None if sDNAUISpec_path is not a file. """
+    try:
+        mtime = os.stat(sDNAUISpec_path).st_mtime
+    except (OSError, TypeError):
+        return None
+    return json.dumps([os.path.abspath(sDNAUISpec_path), mtime, tool_name])
+
+
+class SpecCache(object):
+    """ Maps keys from spec_key to input specs, lists of tuples of 
+        (varname, display_name, data_type, filter_, default, required).
+    """
+
+    def __init__(self, options = SpecCacheOptions):
+        self.path = options.spec_cache
+        self.specs = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.specs = json.load(f)
+            except (IOError, OSError, ValueError):
+                logger.warning('Ignoring invalid input spec cache: %s' % self.path)
+
+    def get(self, key):
+        #type(str) -> list / None
+        if key not in self.specs:
+            return None
+        logger.debug('Input spec cache hit: %s' % key)
+        return [tuple(spec) for spec in self.specs[key]]
+
+    def put(self, key, input_spec):
+        #type(str, list) -> None
+        """ Caches a copy of input_spec for key, if it is serialisable. """
+        if key is None:
+            return
+        specs = dict(self.specs)
+        specs[key] = list(input_spec)
+        try:
+            specs = json.loads(json.dumps(specs)) # copies, if serialisable
+        except (TypeError, ValueError):
+            logger.warning('Could not cache input spec for: %s' % key)
+            return
+        # Remove entries of the same tool for old versions of sDNAUISpec
+        path, __, tool_name = json.loads(key)
+        for old_key in list(specs):
+            old_path, __, old_tool_name = json.loads(old_key)
+            if old_key != key and (old_path, old_tool_name) == (path, tool_name):
+                del specs[old_key]
+        self.specs = specs
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.specs, f, indent = 4)
+        except (IOError, OSError):
+            logger.warning('Could not write input spec cache: %s' % self.path)
+
+
+caches = {}
+
+
+def get_cache(options = SpecCacheOptions):
+    #type(type[any]) -> SpecCache
+    """ Returns the SpecCache of options.spec_cache, creating it (reading 
+        the file) only the first time.
+    """
+    path = options.spec_cache
+    if path not in caches:
+        caches[path] = SpecCache(options)
+    return caches[path]
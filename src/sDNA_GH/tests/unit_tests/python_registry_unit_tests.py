@@ -0,0 +1,108 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Unit tests of python_registry.  Standard library only, so runnable outside 
+    of Grasshopper, e.g. from src:
+    python -m unittest sDNA_GH.tests.unit_tests.python_registry_unit_tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from ... import python_registry
+
+
+class TestPythonRegistry(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        class Options(python_registry.PythonRegistryOptions):
+            python_cache = os.path.join(self.folder, 'python_cache.json')
+        self.Options = Options
+        self.python = os.path.join(self.folder, 'python.exe')
+        with open(self.python, 'w') as f:
+            f.write('Not really an interpreter')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_walk_bounded(self):
+        deepest = os.path.join(self.folder, 'a', 'b', 'c')
+        os.makedirs(deepest)
+        self.assertEqual(list(python_registry.walk_bounded(self.folder, 0))
+                        ,[self.folder]
+                        )
+        self.assertEqual(list(python_registry.walk_bounded(self.folder, 2))
+                        ,[self.folder
+                         ,os.path.join(self.folder, 'a')
+                         ,os.path.join(self.folder, 'a', 'b')
+                         ]
+                        )
+        self.assertIn(deepest, list(python_registry.walk_bounded(self.folder, 3)))
+
+    def test_add_then_get_from_new_registry(self):
+        key = python_registry.search_key('', [self.folder], ['python.exe'])
+        python_registry.PythonRegistry(self.Options).add(key, self.python)
+        registry = python_registry.PythonRegistry(self.Options)
+        self.assertEqual(registry.get(key), self.python)
+        self.assertEqual(registry.records[key]['version'], '')
+        other_key = python_registry.search_key('', [self.folder], ['py27.exe'])
+        self.assertIsNone(registry.get(other_key))
+
+    def test_changed_or_deleted_interpreter_is_invalid(self):
+        key = python_registry.search_key('', [self.folder], ['python.exe'])
+        registry = python_registry.PythonRegistry(self.Options)
+        registry.add(key, self.python)
+        with open(self.python, 'a') as f:
+            f.write(' (updated)')
+        self.assertIsNone(registry.get(key))
+        registry.add(key, self.python)
+        os.remove(self.python)
+        self.assertIsNone(registry.get(key))
+
+    def test_records_version(self):
+        key = python_registry.search_key(sys.executable, [], [])
+        registry = python_registry.PythonRegistry(self.Options)
+        registry.add(key, sys.executable)
+        self.assertEqual(registry.records[key]['version']
+                        ,sys.version.split(' ')[0]
+                        )
+
+    def test_invalid_cache_file_is_ignored(self):
+        with open(self.Options.python_cache, 'w') as f:
+            f.write('{Not JSON')
+        registry = python_registry.PythonRegistry(self.Options)
+        self.assertEqual(registry.records, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Unit tests of results_cache.  Standard library only, so runnable outside 
+    of Grasshopper, e.g. from src:
+    python -m unittest sDNA_GH.tests.unit_tests.results_cache_unit_tests
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from ... import results_cache
+
+
+def write_shapefile(name, contents):
+    for ext in ('.shp', '.dbf', '.shx'):
+        with open(name + ext, 'wb') as f:
+            f.write((contents + ext).encode('ascii'))
+
+
+class TestResultsCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        class Options(results_cache.ResultsCacheOptions):
+            results_cache_dir = os.path.join(self.folder, 'cache')
+            results_cache_max_MB = 1.5 / 1024 # 1.5kB
+        self.cache = results_cache.ResultsCache(Options)
+        self.input_name = os.path.join(self.folder, 'input')
+        write_shapefile(self.input_name, 'network')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_key_depends_on_contents_and_options(self):
+        key = results_cache.results_key(self.input_name + '.shp', 'sDNAIntegral', {'radii' : 'n'})
+        copy_name = os.path.join(self.folder, 'copy')
+        write_shapefile(copy_name, 'network')
+        self.assertEqual(key, results_cache.results_key(copy_name + '.shp', 'sDNAIntegral', {'radii' : 'n'}))
+        self.assertNotEqual(key, results_cache.results_key(copy_name + '.shp', 'sDNAIntegral', {'radii' : '400'}))
+        write_shapefile(copy_name, 'other network')
+        self.assertNotEqual(key, results_cache.results_key(copy_name + '.shp', 'sDNAIntegral', {'radii' : 'n'}))
+
+    def test_put_then_get(self):
+        output_name = os.path.join(self.folder, 'output')
+        write_shapefile(output_name, 'results')
+        with open(output_name + '.shp.names.csv', 'w') as f:
+            f.write('abbreviations')
+        self.assertFalse(self.cache.get('key', output_name + '.shp'))
+        self.cache.put('key', output_name + '.shp')
+
+        new_output_name = os.path.join(self.folder, 'new_output')
+        self.assertTrue(self.cache.get('key', new_output_name + '.shp'))
+        for ext in ('.shp', '.dbf', '.shx', '.shp.names.csv'):
+            with open(output_name + ext) as f, open(new_output_name + ext) as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_least_recently_used_evicted(self):
+        output_name = os.path.join(self.folder, 'output')
+        write_shapefile(output_name, 'x' * 150) # c. 0.5kB per entry
+        for key in ('a', 'b', 'c'):
+            self.cache.put(key, output_name + '.shp')
+            os.utime(self.cache.entry(key), (time.time() - 10, time.time() - 10))
+        self.assertTrue(self.cache.get('a', output_name + '.shp'))
+        self.cache.put('d', output_name + '.shp')
+        self.assertEqual(['a', 'c', 'd'], sorted(os.listdir(self.cache.folder)))
+
+    def test_key_depends_on_extra_files_contents(self):
+        zones = os.path.join(self.folder, 'zones.csv')
+        with open(zones, 'w') as f:
+            f.write('zone,weight\na,1')
+        key = results_cache.results_key(self.input_name + '.shp', 'sDNAIntegral', extra_files = [zones])
+        with open(zones, 'w') as f:
+            f.write('zone,weight\na,2')
+        self.assertNotEqual(key, results_cache.results_key(self.input_name + '.shp', 'sDNAIntegral', extra_files = [zones]))
+
+    def test_put_then_get_non_shapefile_output(self):
+        output_name = os.path.join(self.folder, 'output')
+        with open(output_name + '.csv', 'w') as f:
+            f.write('results')
+        self.cache.put('key', output_name + '.csv')
+
+        new_output_name = os.path.join(self.folder, 'new_output')
+        self.assertTrue(self.cache.get('key', new_output_name + '.csv'))
+        with open(new_output_name + '.csv') as f:
+            self.assertEqual('results', f.read())
+
+    def test_empty_entry_is_a_miss(self):
+        self.cache.put('key', os.path.join(self.folder, 'missing.shp'))
+        self.assertFalse(os.path.isdir(self.cache.entry('key')))
+        os.makedirs(self.cache.entry('key'))
+        self.assertFalse(self.cache.get('key', os.path.join(self.folder, 'output.shp')))
+        self.assertFalse(os.path.isdir(self.cache.entry('key')))
@@ -33,10 +33,19 @@ __version__ = '3.0.0'
 
 import sys
 import os
+import re
+import time
+import tempfile
 import unittest
+import functools
+import threading
+import logging
+import collections
+from datetime import date
+from array import array
 from time import asctime    
 from itertools import repeat, izip
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 
 from ghpythonlib import treehelpers 
 
@@ -45,9 +54,16 @@ from ... import main
 from ... import launcher
 from ... import tools
 from ...skel.tools.helpers import checkers
+from ...skel.tools.helpers import rhino_gh_geom
+from ...skel.tools import runner
+from ...skel.basic import smart_comp
 
 from ... import data_cruncher
 from ... import gdm_from_GH_Datatree
+from ... import pyshp_wrapper
+from ... import logging_wrapper
+from ...tools.support import Read_Geom
+from ...tools.support import Read_Usertext
 
 
 
@@ -162,8 +178,8 @@ class TestDataCruncher(unittest.TestCase):
         test_data = [#'expected' : 'input_'  
                      ([], ([2,]*9, 7))
                     ,([0.5, 1.5], ([0,0] +[1]*9 + [2] * 9,7))
-                    ,([[2.2651515007, 2.3030302524549997, 2.3409091234199999
-                       ,2.4848486185050001, 2.6868686676050002, 2.99494946003]]
+                    ,([2.2651515007, 2.3030302524549997, 2.3409091234199999
+                      ,2.4848486185050001, 2.6868686676050002, 2.99494946003]
                      ,([2.24242424965, 2.25757575035, 2.25757575035 
                        ,2.2727272510500001, 2.2727272510500001, 2.3333332538599998
                        ,2.34848499298, 2.34848499298, 2.34848499298, 2.34848499298
@@ -172,6 +188,1055 @@ class TestDataCruncher(unittest.TestCase):
                        3.5303030014000001
                        ], 7))
                     ]
+        for expected, input_ in test_data:
+            actual = f(*input_)
+            self.assertEqual(len(expected), len(actual))
+            for x, y in zip(expected, actual):
+                self.assertAlmostEqual(x, y)
+
+    def test_weighted_histogram(self):
+        f = data_cruncher.weighted_histogram
+        ordered_counter = data_cruncher.OrderedCounter([1, 1, 2, 3, 3, 3])
+        self.assertEqual(([1, 2, 3], [2, 1, 3], [1, 2, 3], [1, 2, 3])
+                        ,f(ordered_counter)
+                        )
+        means, weights, lows, highs = f(ordered_counter, max_points = 2)
+        self.assertAlmostEqual(4 / 3.0, means[0])
+        self.assertEqual(([3.0], [3, 3], [1, 3], [2, 3])
+                        ,(means[1:], weights, lows, highs)
+                        )
+
+    def test_fisher_jenks(self):
+        class Options(data_cruncher.FisherJenksOptions):
+            use_numpy = False
+        data = [1, 2, 3, 10, 11, 12, 30, 31]
+        for options in (Options, data_cruncher.FisherJenksOptions):
+            self.assertEqual([6.5, 21.0], data_cruncher.fisher_jenks(data, 3, options))
+            # Repeated values are never split between classes
+            self.assertEqual([6.5, 21.0], data_cruncher.fisher_jenks(data*3, 3, options))
+
+    def test_class_lookup(self):
+        class_lookup = data_cruncher.ClassLookup([8, 3], 0, 11)
+        self.assertEqual(3, len(class_lookup))
+        self.assertEqual([1.5, 5.5, 9.5], class_lookup.mid_points)
+        # Classes include their lower bound
+        test_data = [#(expected, input_)
+                     ((0, 1.5), 0)
+                    ,((0, 1.5), 2.99)
+                    ,((1, 5.5), 3)
+                    ,((1, 5.5), 7.5)
+                    ,((2, 9.5), 8)
+                    ,((2, 9.5), 11)
+                    ]
+        for expected, input_ in test_data:
+            actual = (class_lookup.class_index(input_)
+                     ,class_lookup.class_mid_point(input_)
+                     )
+            self.assertEqual(expected, actual)
+
+        single_class = data_cruncher.ClassLookup([], 0, 11)
+        self.assertEqual([(0, 5.5, 11)], list(single_class.classes()))
+
+    def test_lookup_table(self):
+        calls = []
+        def colour(x):
+            calls.append(x)
+            rgb = data_cruncher.map_f_to_three_tuples(
+                             data_cruncher.three_point_quad_spline
+                            ,x, 0, 5, 10
+                            ,(0, 0, 125), (0, 155, 0), (155, 0, 0)
+                            )
+            return tuple(max(0, min(255, int(round(c)))) for c in rgb)
+
+        lookup_table = data_cruncher.LookupTable(colour, 0, 10, 1024)
+        self.assertEqual(1024, len(lookup_table))
+        self.assertEqual(1024, len(calls))
+        self.assertEqual(colour(0), lookup_table(0))
+        self.assertEqual(colour(10), lookup_table(10))
+        for i in range(1001):
+            x = i / 100.0
+            self.assertLessEqual(max(abs(a - b) for a, b in zip(colour(x), lookup_table(x)))
+                                ,1
+                                )
+        # Values in the same bin share one entry.
+        self.assertIs(lookup_table(5.0), lookup_table(5.001))
+        del calls[:]
+        self.assertEqual(colour(-1), lookup_table(-1)) # f extrapolates
+        self.assertEqual([-1, -1], calls)
+        with self.assertRaises(ValueError):
+            data_cruncher.LookupTable(colour, 10, 10)
+
+
+@unittest.skipIf(data_cruncher.numpy is None, 'NumPy not installed. ')
+class TestArrayData(unittest.TestCase):
+    data = OrderedDict([('a', 7), ('b', 2.5), ('c', 9), ('d', 2.5), ('e', 0)
+                       ,('f', 4.25), ('g', 11), ('h', 6)
+                       ])
+    x_min, x_max = 0.0, 11.0 # Floats, as the pure Python splines use / on them.
+
+    def sorted_array_data(self):
+        array_data = data_cruncher.ArrayData.from_dict(self.data)
+        array_data.sort()
+        return array_data
+
+    def test_sort_is_stable_and_keeps_values(self):
+        expected = sorted(self.data.items(), key = lambda tupl : tupl[1])
+        self.assertEqual(expected, self.sorted_array_data().items())
+
+    def test_non_numbers_rejected(self):
+        with self.assertRaises(TypeError):
+            data_cruncher.ArrayData(['a', 'b'], [1, '2'])
+
+    def test_splines_match_pure_Python(self):
+        for name, spline in data_cruncher.splines.items():
+            array_data = self.sorted_array_data()
+            expected = [spline(x, self.x_min, 10.0, self.x_max, 3.0, 303.0)
+                        for x in array_data.values()
+                       ]
+            array_data.apply_spline(data_cruncher.array_splines[name]
+                                   ,self.x_min, 10.0, self.x_max, 3.0, 303.0
+                                   )
+            for x, y in zip(expected, array_data.values()):
+                self.assertAlmostEqual(x, y)
+
+    def test_replace_with_class_mid_points(self):
+        array_data = self.sorted_array_data()
+        class_lookup = data_cruncher.ClassLookup([3, 8], self.x_min, self.x_max)
+        array_data.replace_with_class_mid_points(class_lookup)
+        self.assertEqual([1.5, 1.5, 1.5, 5.5, 5.5, 5.5, 9.5, 9.5]
+                        ,array_data.values()
+                        )
+
+
+CGDM = gdm_from_GH_Datatree.ColumnarGeomDataMapping
+
+def deep_getsizeof(obj, seen = None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(key, seen) + deep_getsizeof(val, seen)
+                    for key, val in obj.items()
+                   )
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    if isinstance(obj, CGDM):
+        size += deep_getsizeof(obj.columns, seen)
+    return size
+
+
+class TestColumnarGeomDataMapping(unittest.TestCase):
+    keys_and_vals = [('obj%s' % i, OrderedDict([('float', i / 4.0)
+                                               ,('int', i)
+                                               ,('str', 'x' * (i % 3))
+                                               ] 
+                                               + ([('some', 1.5)] if i % 4 else [])
+                                              )
+                     )
+                     for i in range(40)
+                    ]
+
+    def test_same_mapping_as_gdm(self):
+        gdm, cgdm = GDM(self.keys_and_vals), CGDM(self.keys_and_vals)
+        self.assertEqual(gdm, cgdm)
+        self.assertEqual(cgdm, gdm)
+        self.assertEqual(gdm, GDM(cgdm.items()))
+        self.assertEqual(list(gdm['obj1'].items()), list(cgdm['obj1'].items()))
+        self.assertNotIn('some', cgdm['obj0'])
+
+    def test_columns(self):
+        cgdm = CGDM(self.keys_and_vals)
+        self.assertIsInstance(cgdm.column('float'), array)
+        self.assertIs(cgdm.column('float'), cgdm.project(['float']).column('float'))
+        self.assertTrue(cgdm.has_complete_column('int'))
+        self.assertFalse(cgdm.has_complete_column('some'))
+        self.assertEqual([(key, val['some']) for key, val in self.keys_and_vals if 'some' in val]
+                        ,list(cgdm.column_items('some'))
+                        )
+
+    def test_rows_write_to_columns(self):
+        cgdm = CGDM(self.keys_and_vals)
+        cgdm['obj1']['float'] = 'not a float'
+        cgdm['obj2']['new'] = 7
+        del cgdm['obj3']['int']
+        self.assertEqual('not a float', cgdm.column('float')[1])
+        self.assertEqual([7], [val['new'] for val in cgdm.values() if 'new' in val])
+        self.assertNotIn('int', cgdm['obj3'])
+        copy = cgdm.copy()
+        copy['obj4']['int'] = -4
+        self.assertEqual(4, cgdm['obj4']['int'])
+
+    def test_delete_slice_and_merge(self):
+        cgdm = CGDM(self.keys_and_vals)
+        del cgdm['obj5']
+        self.assertEqual(GDM(kv for kv in self.keys_and_vals if kv[0] != 'obj5'), cgdm)
+        self.assertEqual(GDM(self.keys_and_vals[10:20]), CGDM(self.keys_and_vals).slice(10, 20))
+        merged = CGDM(self.keys_and_vals[:20]).merge(CGDM(self.keys_and_vals[20:]))
+        self.assertEqual(GDM(self.keys_and_vals), merged)
+        self.assertIsInstance(merged.column('float'), array)
+        self.assertIsInstance(merged.column('int'), array)
+
+    def test_int_columns_widen(self):
+        cgdm = CGDM(self.keys_and_vals)
+        self.assertEqual(gdm_from_GH_Datatree.INT_TYPECODE, cgdm.column('int').typecode)
+        cgdm['obj1']['int'] = 2**70 # overflows an array of ints
+        cgdm['obj2']['int'] = 1.5
+        cgdm['new'] = OrderedDict([('int', True)])
+        self.assertIsInstance(cgdm.column('int'), list)
+        self.assertEqual([0, 2**70, 1.5, 3], list(cgdm.column('int'))[:4])
+        self.assertIs(True, cgdm['new']['int'])
+        cgdm = CGDM(self.keys_and_vals)
+        cgdm['obj1']['int'] = 2.0
+        self.assertIsInstance(cgdm['obj1']['int'], float)
+        self.assertIsInstance(cgdm['obj0']['int'], int)
+
+    def test_only_mappings(self):
+        with self.assertRaises(TypeError):
+            CGDM([('obj', 1.0)])
+
+    @unittest.skipIf(not hasattr(sys, 'getsizeof'), 'Requires sys.getsizeof. ')
+    def test_smaller_than_gdm(self):
+        keys_and_vals = [('obj%s' % i, OrderedDict(('field%s' % j, i + j / 8.0)
+                                                   for j in range(20)
+                                                  )
+                         )
+                         for i in range(200)
+                        ]
+        gdm, cgdm = GDM(keys_and_vals), CGDM(keys_and_vals)
+        self.assertEqual(gdm, cgdm)
+        self.assertLess(deep_getsizeof(cgdm), deep_getsizeof(gdm))
+
+
+class TestCoerceAndGetType(unittest.TestCase):
+    values = [True, 'false', 0, -5, '42', 1.5, '2.25', 'abc', '2021-03-04'
+             ,date(2021, 3, 4), '04/03/21'
+             ]
+    expected = [('True', bool), ('false', bool), (0, int), (-5, int)
+               ,(42, int), ('1.5', float), ('2.25', float), ('abc', str)
+               ,('2021-03-04', date), ('2021-03-04', date), ('04/03/21', date)
+               ]
+
+    def test_coerce_and_get_type(self):
+        for value, expected in zip(self.values, self.expected):
+            self.assertEqual(expected, pyshp_wrapper.coerce_and_get_type(value))
+
+    def test_coercer_is_cached(self):
+        self.assertIs(pyshp_wrapper.get_coercer()
+                     ,pyshp_wrapper.get_coercer()
+                     )
+
+
+class TestEnsureCorrect(unittest.TestCase):
+    def fields_after(self, values):
+        fields = OrderedDict()
+        for value in values:
+            value, val_type = pyshp_wrapper.coerce_and_get_type(value)
+            pyshp_wrapper.ensure_correct(fields, 'key', value, val_type, None)
+        return fields['key']
+
+    def test_bool_after_zeros_and_ones(self):
+        field_info = self.fields_after([0, 1, 0, True])
+        self.assertIs(bool, field_info.fieldType)
+
+    def test_bool_after_other_ints(self):
+        field_info = self.fields_after([0, 2, True])
+        self.assertIs(str, field_info.fieldType)
+
+    def test_int_then_float(self):
+        field_info = self.fields_after([7, 3, -12, '2.125'])
+        self.assertIs(float, field_info.fieldType)
+        self.assertEqual((5, 3), (field_info.size_req, field_info.decimal))
+        self.assertFalse(field_info.all_zero_or_one)
+
+
+class TestWriteIterableToShpTwoPass(unittest.TestCase):
+    shapes = OrderedDict(('obj%s' % i, [[[i, 0.0, 0.0], [i, 1.0, 0.5 * i]]]) 
+                         for i in range(20)
+                        )
+    user_texts = OrderedDict(('obj%s' % i, OrderedDict([('int', i)
+                                                       ,('float', '%s.25' % i)
+                                                       ,('str', 'x' * (i % 7))
+                                                       ]
+                                                      )
+                             ) 
+                             for i in range(20)
+                            )
+
+    def write(self, two_pass, my_iterable):
+        class Options(pyshp_wrapper.ShpOptions):
+            pass
+        Options.two_pass = two_pass
+        shp_file_path = os.path.join(tempfile.mkdtemp(), 'test.shp')
+        retcode, f_name, fields, attribute_tables = pyshp_wrapper.write_iterable_to_shp(
+                     my_iterable = my_iterable
+                    ,shp_file_path = shp_file_path
+                    ,is_shape = lambda shape, shape_code : True
+                    ,shape_mangler = self.shapes.get
+                    ,shape_IDer = str
+                    ,key_finder = lambda item : self.user_texts[item].keys()
+                    ,key_matcher = re.compile(r'(?P<name>.*)').match
+                    ,value_demangler = lambda item, key : self.user_texts[item][key]
+                    ,shape_code = 'POLYLINEZ'
+                    ,options = Options
+                    )
+        with open(os.path.splitext(f_name)[0] + '.dbf', 'rb') as f:
+            return f.read(), attribute_tables
+
+    def test_two_pass_modes_write_same_records(self):
+        expected, attribute_tables = self.write('', list(self.shapes))
+        self.assertEqual(len(self.shapes), len(attribute_tables))
+        for two_pass, my_iterable in [('reiterate', list(self.shapes))
+                                     ,('spool', list(self.shapes))
+                                     ,('reiterate', iter(list(self.shapes)))
+                                     ]:
+            dbf, attribute_tables = self.write(two_pass, my_iterable)
+            self.assertEqual(expected, dbf)
+            self.assertIsNone(attribute_tables)
+
+
+class TestLazyRecords(unittest.TestCase):
+    def setUp(self):
+        self.shp_file_path = os.path.join(tempfile.mkdtemp(), 'test.shp')
+        shp = pyshp_wrapper.shp
+        with shp.Writer(self.shp_file_path, shapeType = shp.POLYLINEZ) as w:
+            w.field('str', 'C', 20)
+            w.field('int', 'N', 10, 0)
+            w.field('float', 'N', 18, 5)
+            w.field('date', 'D')
+            w.field('bool', 'L')
+            for i in range(20):
+                w.linez([[[i, 0.0, 0.0], [i, 1.0, 0.5 * i]]])
+                w.record(['', 'x' * (i % 7), None][i % 3]
+                        ,[None, i, -i][i % 3]
+                        ,[None, i / 7.0][i % 2]
+                        ,[None, date(2020, 1, i + 1)][i % 2]
+                        ,[None, True, False][i % 3]
+                        )
+
+    def records(self, Options):
+        return list(pyshp_wrapper.TmpFileDeletingRecordsIterator(
+                                            reader = self.shp_file_path
+                                           ,opts = dict(options = Options)
+                                           ))
+
+    def test_projected_records_decode_the_same(self):
+        class Options(pyshp_wrapper.ShapeRecordsOptions):
+            del_after_read = False
+        expected = self.records(Options)
+        Options.read_fields = 'float, int'
+        lazy_records = self.records(Options)
+        field_names = ['str', 'int', 'float', 'date', 'bool'] # In the file's order.
+        for expected_record, lazy_record in zip(expected, lazy_records):
+            self.assertEqual(['float', 'int'], list(lazy_record.keys()))
+            self.assertNotIn('str', lazy_record)
+            self.assertEqual(expected_record['date'], lazy_record['date'])
+            self.assertEqual(expected_record['bool'], lazy_record.get('bool'))
+            self.assertEqual(['float', 'int', 'date', 'bool'], list(lazy_record))
+            self.assertEqual(len(lazy_record), len(lazy_record.items()))
+            self.assertEqual(OrderedDict((name, expected_record[name]) for name in field_names)
+                            ,lazy_record.decode_all()
+                            )
+            self.assertEqual(field_names, list(lazy_record))
+            self.assertIsInstance(lazy_record.copy(), pyshp_wrapper.LazyRecord)
+
+    def test_unknown_field_raises(self):
+        class Options(pyshp_wrapper.ShapeRecordsOptions):
+            del_after_read = False
+            read_fields = ['int', 'not_a_field']
+        with self.assertRaises(ValueError):
+            self.records(Options)
+
+
+class TestBatchHelpers(unittest.TestCase):
+    def test_run_concurrently_keeps_order_and_bound(self):
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+        def job(i):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01 * (i % 3))
+            with lock:
+                running[0] -= 1
+            return i
+        funcs = [functools.partial(job, i) for i in range(12)]
+        results = tools.sdna.run_concurrently(funcs, max_workers = 3)
+        self.assertEqual(list(range(12)), results)
+        self.assertLessEqual(max_running[0], 3)
+
+    def test_run_concurrently_reraises(self):
+        def fail():
+            raise ValueError('Failed. ')
+        with self.assertRaises(ValueError):
+            tools.sdna.run_concurrently([fail, lambda : 1], max_workers = 2)
+
+    def test_tool_opts_variant(self):
+        self.assertEqual(OrderedDict([('radii', '400,800'), ('metric', 'ANGULAR')])
+                        ,tools.sdna.tool_opts_variant('radii=400,800;metric=ANGULAR;')
+                        )
+        self.assertEqual({'radii' : 400}
+                        ,tools.sdna.tool_opts_variant({'radii' : 400})
+                        )
+
+    def test_tool_opts_variant_checked_against_tool_opts(self):
+        ToolOpts = namedtuple('ToolOpts', 'radii cont weight_factor nonlinear')
+        tool_opts = ToolOpts(radii = 'n', cont = False, weight_factor = 1.0, nonlinear = 0)
+        self.assertEqual(OrderedDict([('radii', '400,800')
+                                     ,('cont', True)
+                                     ,('weight_factor', 2.5)
+                                     ,('nonlinear', 3)
+                                     ])
+                        ,tools.sdna.tool_opts_variant(
+                                ' radii = 400,800; cont=true ;weight_factor=2.5;nonlinear=3'
+                               ,tool_opts
+                               )
+                        )
+        with self.assertRaises(ValueError):
+            tools.sdna.tool_opts_variant('radius=400', tool_opts)
+        with self.assertRaises(ValueError):
+            tools.sdna.tool_opts_variant('cont=maybe', tool_opts)
+        with self.assertRaises(ValueError):
+            tools.sdna.tool_opts_variant({'nonlinear' : 'x'}, tool_opts)
+
+
+class StandInBatchTool(runner.RunnableTool):
+    """ Returns a list of output files, as sDNA_ToolWrapper does for a batch. """
+    retvals = ('retcode', 'f_name')
+
+    def __init__(self, f_names):
+        self.f_names = f_names
+
+    def __call__(self, f_name):
+        return 0, self.f_names
+
+
+class TestReadShpAfterBatch(unittest.TestCase):
+    def setUp(self):
+        shp = pyshp_wrapper.shp
+        dir_name = tempfile.mkdtemp()
+        self.f_names = []
+        for radius in (400, 800):
+            f_name = os.path.join(dir_name, 'batch_%s.shp' % radius)
+            with shp.Writer(f_name, shapeType = shp.POLYLINEZ) as w:
+                w.field('BtE%s' % radius, 'N', 18, 5)
+                for i in range(3):
+                    w.linez([[[i, 0.0, 0.0], [i, 1.0, 0.0]]])
+                    w.record(i * radius / 100.0)
+            self.f_names.append(f_name)
+
+    def test_reads_each_output_file_of_batch(self):
+        gdm = gdm_from_GH_Datatree.GeomDataMapping(('obj%s' % i, {}) for i in range(3))
+        vals = runner.run_tools([StandInBatchTool(self.f_names)
+                                ,tools.ShapefileReader(opts = main.module_opts)
+                                ]
+                               ,dict(f_name = 'input.shp'
+                                    ,gdm = gdm
+                                    ,opts = main.module_opts
+                                    )
+                               )
+        self.assertEqual(0, vals['retcode'])
+        self.assertEqual(2, len(vals['gdm']))
+        for sub_gdm, field in zip(vals['gdm'], ['BtE400', 'BtE800']):
+            self.assertEqual(list(gdm), list(sub_gdm))
+            self.assertIn(field, vals['fields'])
+        self.assertEqual(8.0, vals['gdm'][1]['obj1']['BtE800'])
+
+    def test_deletes_batch_output_files_with_deleters_after_reading(self):
+        deleted = []
+        class RecordingDeleter(pyshp_wrapper.ShapeFilesDeleter):
+            def delete_files(self, delete, opts):
+                deleted.append(self.file_name)
+        opts = main.copy_opts(main.module_opts)
+        opts['options'] = opts['options']._replace(
+                    del_after_read = True
+                   ,strict_no_del = False
+                   ,overwrite_shp = False
+                   ,OUTPUT_FILE_DELETERS = (RecordingDeleter(self.f_names[0]),)
+                   )
+        gdm = gdm_from_GH_Datatree.GeomDataMapping(('obj%s' % i, {}) for i in range(3))
+        vals = runner.run_tools([StandInBatchTool(self.f_names)
+                                ,tools.ShapefileReader(opts = opts)
+                                ]
+                               ,dict(f_name = 'input.shp'
+                                    ,gdm = gdm
+                                    ,opts = opts
+                                    )
+                               )
+        self.assertEqual(0, vals['retcode'])
+        self.assertEqual(self.f_names[:1], deleted)
+        self.assertEqual((), opts['options'].OUTPUT_FILE_DELETERS)
+
+
+class TimedTool(runner.RunnableTool):
+    retvals = ('gdm',)
+
+    def __init__(self, num_objs, sleep = 0, fail = False):
+        self.num_objs = num_objs
+        self.sleep = sleep
+        self.fail = fail
+
+    def __call__(self, gdm):
+        with runner.span('sub span', info = 'test'):
+            time.sleep(self.sleep)
+        if self.fail:
+            raise ValueError('Failed. ')
+        return (OrderedDict((i, {'x' : i}) for i in range(self.num_objs)),)
+
+
+class PeakBeforeSubSpanTool(runner.RunnableTool):
+    retvals = ('gdm',)
+
+    def __call__(self, gdm):
+        peak = [{'x' : i} for i in range(10000)]
+        del peak
+        with runner.span('sub span after peak'):
+            pass
+        return (gdm,)
+
+
+class TestRunToolsTimings(unittest.TestCase):
+    def test_no_timings_by_default(self):
+        vals = runner.run_tools([TimedTool(3)], dict(gdm = OrderedDict()))
+        self.assertEqual(3, len(vals['gdm']))
+        self.assertIs(runner.NULL_SPAN, runner.span('not timed'))
+
+    def test_records_each_tool_and_sub_spans(self):
+        timings = []
+        runner.run_tools([TimedTool(3, sleep = 0.02), TimedTool(5)]
+                        ,dict(gdm = [OrderedDict([(1, {}), (2, {})])])
+                        ,timings = timings
+                        )
+        self.assertEqual(['TimedTool', 'TimedTool'], [record['name'] for record in timings])
+        self.assertEqual([2, 3], [record['gdm_in'] for record in timings])
+        self.assertEqual([3, 5], [record['gdm_out'] for record in timings])
+        self.assertGreaterEqual(timings[0]['wall_time'], 0.02)
+        self.assertGreaterEqual(timings[0]['wall_time'], timings[0]['cpu_time'])
+        sub_span = timings[0]['spans'][0]
+        self.assertEqual(('sub span', 'test'), (sub_span['name'], sub_span['info']))
+        self.assertGreaterEqual(sub_span['wall_time'], 0.02)
+        self.assertIsNone(runner.current_span)
+        self.assertIn('"name": "TimedTool"', runner.timing_line(timings[0]))
+
+    def test_records_failed_tool(self):
+        timings = []
+        with self.assertRaises(ValueError):
+            runner.run_tools([TimedTool(3, fail = True)], dict(gdm = None), timings = timings)
+        self.assertIn('wall_time', timings[0])
+        self.assertIsNone(timings[0]['gdm_in'])
+        self.assertIsNone(runner.current_span)
+
+    def test_logs_timings_at_info(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        level = runner.logger.level
+        runner.logger.addHandler(handler)
+        runner.logger.setLevel(logging.INFO)
+        try:
+            runner.run_tools([TimedTool(3)], dict(gdm = OrderedDict()), timings = [])
+        finally:
+            runner.logger.removeHandler(handler)
+            runner.logger.setLevel(level)
+        self.assertEqual([logging.INFO]
+                        ,[record.levelno for record in records 
+                          if record.getMessage().startswith('Timings: ')
+                         ]
+                        )
+
+    @unittest.skipIf(runner.tracemalloc is None, 'Requires tracemalloc. ')
+    def test_trace_memory(self):
+        timings = []
+        runner.run_tools([TimedTool(10000)]
+                        ,dict(gdm = OrderedDict())
+                        ,timings = timings
+                        ,trace_memory = True
+                        )
+        self.assertGreater(timings[0]['peak_memory'], 10000 * 100)
+        self.assertFalse(runner.tracemalloc.is_tracing())
+
+    @unittest.skipIf(runner.tracemalloc is None, 'Requires tracemalloc. ')
+    def test_sub_span_keeps_peak_memory(self):
+        timings = []
+        runner.run_tools([PeakBeforeSubSpanTool()]
+                        ,dict(gdm = OrderedDict())
+                        ,timings = timings
+                        ,trace_memory = True
+                        )
+        self.assertGreater(timings[0]['peak_memory'], 10000 * 100)
+        self.assertIn('peak_memory', timings[0]['spans'][0])
+
+
+class BindingTool(object):
+    def __call__(self, gdm, opts, f_name = None, **kwargs):
+        return gdm, opts, f_name, kwargs
+
+
+class TestPrepareArgs(unittest.TestCase):
+    def test_binds_pos_args_and_kwargs(self):
+        vals_dict = OrderedDict([('opts', 'o'), ('x', 1), ('gdm', 'g'), ('f_name', 'f')])
+        pos_args, kwargs = smart_comp.prepare_args(BindingTool(), vals_dict)
+        self.assertEqual(('g', 'o'), pos_args)
+        self.assertEqual({'f_name' : 'f', 'x' : 1}, kwargs)
+
+    def test_missing_pos_arg(self):
+        with self.assertRaises(TypeError):
+            smart_comp.prepare_args(BindingTool(), {'gdm' : 'g'})
+
+    def test_binding_plan_shared_by_instances(self):
+        vals_dict = OrderedDict([('gdm', 'g'), ('opts', 'o')])
+        smart_comp.prepare_args(BindingTool(), vals_dict)
+        pos_args, kwargs = smart_comp.prepare_args(BindingTool()
+                                                  ,OrderedDict([('gdm', 1), ('opts', 2)])
+                                                  )
+        self.assertEqual(((1, 2), {}), (pos_args, kwargs))
+        self.assertEqual(1, len(smart_comp.binding_plans[BindingTool]))
+        self.assertIn(BindingTool, smart_comp.args_specs)
+
+    def test_partials_not_cached(self):
+        partial = functools.partial(lambda a, b : (a, b), 1)
+        self.assertIsNone(smart_comp.args_spec_key(partial))
+
+
+class TestLazyLogging(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('sDNA_GH.test_lazy_logging')
+        self.logger.propagate = False
+        self.stream = tempfile.TemporaryFile('w')
+        self.calls = []
+
+    def tearDown(self):
+        for handler in self.logger.handlers[:]:
+            self.logger.removeHandler(handler)
+        self.stream.close()
+
+    def make_lazy(self):
+        return logging_wrapper.Lazy(lambda : self.calls.append(1) or 'built')
+
+    def test_logger_level_synced_to_handlers(self):
+        handler = logging.StreamHandler(self.stream)
+        handler.setLevel('INFO')
+        self.logger.addHandler(handler)
+        self.logger.addHandler(logging.NullHandler())
+        self.assertEqual(logging.INFO
+                        ,logging_wrapper.set_logger_level_to_handlers(self.logger)
+                        )
+        self.assertFalse(logging_wrapper.debug_enabled(self.logger))
+        self.logger.debug('lazy == %s', self.make_lazy())
+        self.assertEqual([], self.calls)
+
+        handler.setLevel('DEBUG')
+        logging_wrapper.set_logger_level_to_handlers(self.logger)
+        self.assertTrue(logging_wrapper.debug_enabled(self.logger))
+        self.logger.debug('lazy == %s', self.make_lazy())
+        self.assertEqual([1], self.calls)
+
+    def test_lazy_formatting(self):
+        lazy = logging_wrapper.Lazy(sorted, [3, 1, 2])
+        self.assertEqual('[1, 2, 3]', str(lazy))
+        self.assertEqual('lazy == [1, 2, 3]', 'lazy == %s' % lazy)
+
+
+class TestOverrideAllOptsCache(unittest.TestCase):
+    def setUp(self):
+        self.module_opts = main.copy_opts(main.module_opts)
+        self.cache = {}
+
+    def tearDown(self):
+        main.module_opts.clear()
+        main.module_opts.update(self.module_opts)
+
+    def resolve(self, opts, local_metas = main.DEFAULT_LOCAL_METAS, **params):
+        return main.override_all_opts(local_opts = opts
+                                     ,overrides = [{}, {}]
+                                     ,params = params
+                                     ,local_metas = local_metas
+                                     ,not_shared = set()
+                                     ,cache = self.cache
+                                     )
+
+    def test_unchanged_inputs_hit_cache(self):
+        opts = main.copy_opts(main.module_opts)
+        for __ in range(3):
+            opts, local_metas = self.resolve(opts, num_classes = 4)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertEqual(4, opts['options'].num_classes)
+
+        opts, local_metas = self.resolve(opts, num_classes = 6)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertEqual(6, opts['options'].num_classes)
+
+    def test_mutated_shared_opts_invalidate_cache(self):
+        local_metas = main.DEFAULT_LOCAL_METAS._replace(sync = True)
+        for __ in range(3):
+            opts, local_metas = self.resolve(main.module_opts, local_metas, num_classes = 4)
+        self.assertIs(main.module_opts, opts)
+        self.assertEqual(1, self.cache['hits'])
+
+        # As if by another synchronised component.
+        main.module_opts['options'] = main.module_opts['options']._replace(
+                                                         message = 'Mutated'
+                                                         )
+        opts, local_metas = self.resolve(main.module_opts, local_metas, num_classes = 4)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertEqual('Mutated', opts['options'].message)
+
+    def test_changed_config_file_invalidates_cache(self):
+        config = os.path.join(tempfile.mkdtemp(), 'config.toml')
+        main.options_manager.save_toml_file(config, {'options' : {'message' : 'First'}})
+        opts = main.copy_opts(main.module_opts)
+        for __ in range(3):
+            opts, local_metas = self.resolve(opts, config = config)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertEqual('First', opts['options'].message)
+
+        main.options_manager.save_toml_file(config, {'options' : {'message' : 'Second'}})
+        mtime = os.path.getmtime(config) + 10
+        os.utime(config, (mtime, mtime))
+        opts, local_metas = self.resolve(opts, config = config)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertEqual('Second', opts['options'].message)
+
+    def test_geom_not_copied_into_cache(self):
+        Geom = ['Geom object %s' % i for i in range(100000)]
+        opts = main.copy_opts(main.module_opts)
+        for __ in range(3):
+            opts, local_metas = self.resolve(opts, num_classes = 4, Geom = Geom)
+        self.assertEqual(1, self.cache['hits'])
+        self.assertNotIn('Geom object 7', repr(self.cache['key']))
+
+    def test_fresh_equal_non_option_params_hit_cache(self):
+        # Grasshopper passes new objects each solve.
+        opts = main.copy_opts(main.module_opts)
+        for __ in range(4):
+            opts, local_metas = self.resolve(opts
+                                            ,num_classes = 4
+                                            ,Geom = ['Geom object %s' % i for i in range(10)]
+                                            ,file = ''.join(['input', '.shp'])
+                                            )
+        self.assertEqual(2, self.cache['hits'])
+
+
+class StandInCurve(object):
+    def __init__(self, degree = 1, is_polyline = False):
+        self.Degree = degree
+        self.is_polyline = is_polyline
+
+    def IsPolyline(self):
+        return self.is_polyline
+
+
+class StandInRhinoObject(object):
+    """ The attributes of a RhinoObject RhinoDocIndex reads. """
+    def __init__(self, id_, layer_index = 0, selected = False, code = 4, geom = None):
+        self.Id = id_
+        self.ObjectType = code
+        self.Geometry = StandInCurve() if geom is None else geom
+        self.Attributes = namedtuple('Attributes', 'LayerIndex')(layer_index)
+        self.selected = selected
+
+    def IsSelected(self, check_subobjects):
+        return int(self.selected)
+
+
+StandInDoc = namedtuple('StandInDoc', 'RuntimeSerialNumber objects')
+
+SelectionEventArgs = namedtuple('SelectionEventArgs', 'Document RhinoObjects Selected')
+
+
+class TestRhinoDocIndex(unittest.TestCase):
+    layer_names = ['Default', 'Roads', 'Roads::Minor']
+
+    def setUp(self):
+        self.objects = [StandInRhinoObject('a', 0, selected = True)
+                       ,StandInRhinoObject('arc', 0, geom = StandInCurve(degree = 2))
+                       ,StandInRhinoObject('b', 1)
+                       ,StandInRhinoObject('c', 0, geom = StandInCurve(3, is_polyline = True))
+                       ,StandInRhinoObject('point', 1, code = 1, geom = object())
+                       ,StandInRhinoObject('d', 2, selected = True)
+                       ]
+        self.layer_name_calls = []
+        self.index = rhino_gh_geom.RhinoDocIndex(self.objects, self.layer_name)
+
+    def layer_name(self, index):
+        self.layer_name_calls.append(index)
+        return self.layer_names[index]
+
+    def test_filters_are_index_lookups(self):
+        index = self.index
+        self.assertEqual([0, 1, 2], self.layer_name_calls)
+        self.assertEqual(['a', 'b', 'c', 'd'], index.get_ids('POLYLINEZ'))
+        self.assertEqual(['a', 'b', 'c', 'd'], index.get_ids('POLYGON'))
+        self.assertEqual(['point'], index.get_ids('POINTZ'))
+        self.assertEqual([], index.get_ids('MULTIPOINTZ'))
+        self.assertEqual(['a', 'c'], index.get_ids('POLYLINEZ', ('Default',)))
+        self.assertEqual(['a', 'c', 'd']
+                        ,index.get_ids('POLYLINEZ', ['Roads::Minor', 'Default'])
+                        )
+        self.assertEqual(['a', 'd'], index.get_ids('POLYLINEZ', only_selected = True))
+        self.assertEqual(['d'], index.get_ids('POLYLINEZ', ('Roads::Minor',), True))
+
+    def test_same_objects_as_per_object_calls(self):
+        objects = OrderedDict((obj.Id, obj) for obj in self.objects)
+
+        def is_shape(obj, shp_type):
+            return obj in self.index.ids[4]
+
+        def read(layers, only_selected, doc_index = None):
+            return list(Read_Geom.get_objs_and_OrderedDicts(
+                         only_selected = only_selected
+                        ,layers = layers
+                        ,all_objs_getter = lambda shp_type: list(objects)
+                        ,is_shape = is_shape
+                        ,is_selected = lambda obj: objects[obj].selected
+                        ,obj_layer = lambda obj: self.layer_names[
+                                          objects[obj].Attributes.LayerIndex]
+                        ,doc_layers = lambda: self.layer_names
+                        ,doc_index = doc_index
+                        ))
+
+        for layers in ('', 'Default', 'Not a layer', ['Roads', 'Roads::Minor']):
+            for only_selected in (False, True):
+                self.assertEqual(read(layers, only_selected)
+                                ,read(layers, only_selected, self.index)
+                                )
+
+    def test_cache_invalidation(self):
+        built = []
+
+        def index_factory(doc):
+            built.append(doc)
+            return rhino_gh_geom.RhinoDocIndex(doc.objects, self.layer_name)
+
+        cache = rhino_gh_geom.RhinoDocIndexCache(index_factory)
+        cache.subscribed = True # Not to Rhino's events, in these tests.
+        doc = StandInDoc(1, self.objects)
+        index = cache.get(doc)
+        self.assertIs(index, cache.get(doc))
+        self.assertEqual(1, len(built))
+
+        cache.update_selection(None, SelectionEventArgs(doc, self.objects[2:3], True))
+        cache.update_selection(None, SelectionEventArgs(doc, self.objects[:1], False))
+        self.assertEqual(['b', 'd'], cache.get(doc).get_ids(only_selected = True))
+        cache.clear_selection(None, SelectionEventArgs(doc, [], False))
+        self.assertEqual([], cache.get(doc).get_ids(only_selected = True))
+        self.assertEqual(1, len(built))
+
+        del self.objects[0]
+        cache.invalidate()
+        self.assertEqual(['b', 'c', 'd'], cache.get(doc).get_ids())
+        self.assertEqual(2, len(built))
+
+
+class TestGeomResolutionCache(unittest.TestCase):
+    uuids = ['64ff5ea2-fc0a-4d0d-b5f2-0953156b%04d' % i for i in range(10)]
+
+    def setUp(self):
+        self.calls = collections.Counter()
+
+        def get_geom_and_source(obj):
+            self.calls['get_geom_and_source'] += 1
+            return 'geom of %s' % obj, 'doc'
+
+        def is_shape_in_source(obj, source, shp_type):
+            self.calls['is_shape_in_source'] += 1
+            return obj in self.uuids
+
+        def get_points_from_geom(geom, shp_type):
+            self.calls['get_points_from_geom'] += 1
+            i = self.uuids.index(geom.rpartition(' ')[2])
+            return [[i, 0.0, 0.0], [i, 1.0, 0.5]]
+
+        self.geom_cache = rhino_gh_geom.GeomResolutionCache(
+                                 'POLYLINEZ'
+                                ,get_geom_and_source = get_geom_and_source
+                                ,is_shape_in_source = is_shape_in_source
+                                ,get_points_from_geom = get_points_from_geom
+                                )
+
+    def test_bad_shapes(self):
+        self.assertEqual(['Legend tag'], self.geom_cache.resolve_all(self.uuids + ['Legend tag']))
+        self.assertEqual('geom of Legend tag', self.geom_cache.resolve('Legend tag').geom)
+        self.assertFalse(self.geom_cache.is_shape('Legend tag', 'POLYLINEZ'))
+        self.assertEqual(11, self.calls['get_geom_and_source'])
+
+    def test_validating_and_writing_resolve_each_object_once(self):
+        class Options(pyshp_wrapper.ShpOptions):
+            two_pass = 'reiterate'
+        self.assertEqual([], self.geom_cache.resolve_all(self.uuids))
+        retcode, f_name, fields, attribute_tables = pyshp_wrapper.write_iterable_to_shp(
+                     my_iterable = self.uuids
+                    ,shp_file_path = os.path.join(tempfile.mkdtemp(), 'test.shp')
+                    ,is_shape = self.geom_cache.is_shape
+                    ,shape_mangler = lambda obj: [self.geom_cache.get_points(obj)]
+                    ,shape_IDer = str
+                    ,key_finder = lambda obj: ['id']
+                    ,key_matcher = re.compile(r'(?P<name>.*)').match
+                    ,value_demangler = lambda obj, key: obj[-4:]
+                    ,shape_code = 'POLYLINEZ'
+                    ,options = Options
+                    )
+        self.assertEqual(0, retcode)
+        self.assertEqual(collections.Counter(get_geom_and_source = 10
+                                            ,is_shape_in_source = 10
+                                            ,get_points_from_geom = 10
+                                            )
+                        ,self.calls
+                        )
+        shapes = pyshp_wrapper.shp.Reader(f_name).shapes()
+        self.assertEqual([[9.0, 0.0], [9.0, 1.0]], [list(p) for p in shapes[9].points])
+
+
+class StandInAttributes(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    def Duplicate(self):
+        return StandInAttributes(**self.__dict__)
+
+
+class StandInObjectTable(object):
+    """ The methods of a Rhino document's object table recolour_objects calls,
+        for objects keyed by id.
+    """
+    def __init__(self, ids, views):
+        self.objects = OrderedDict((id_, namedtuple('RhinoObject', 'Attributes')(
+                                              StandInAttributes(ObjectColor = None))
+                                   )
+                                   for id_ in ids
+                                  )
+        self.views = views
+        self.modifications = []
+
+    def FindId(self, guid):
+        return self.objects.get(guid)
+
+    def ModifyAttributes(self, rhino_obj, attributes, quiet):
+        assert not self.views.RedrawEnabled
+        self.modifications.append(attributes)
+        for id_, obj in self.objects.items():
+            if obj is rhino_obj:
+                self.objects[id_] = rhino_obj._replace(Attributes = attributes)
+        return True
+
+
+class StandInViews(object):
+    RedrawEnabled = True
+    redraws = 0
+
+    def Redraw(self):
+        self.redraws += 1
+
+
+class TestRecolourObjects(unittest.TestCase):
+    uuids = ['64ff5ea2-fc0a-4d0d-b5f2-0953156b%04d' % i for i in range(6)]
+
+    def test_group_by_colour(self):
+        groups = rhino_gh_geom.group_by_colour([('a', 'red'), ('b', 'blue'), ('c', 'red')])
+        self.assertEqual(OrderedDict([('red', ['a', 'c']), ('blue', ['b'])]), groups)
+
+    def test_one_attribute_modification_per_object(self):
+        views = StandInViews()
+        doc = namedtuple('Doc', 'Objects Views')(StandInObjectTable(self.uuids, views)
+                                                ,views
+                                                )
+        coerced = []
+        def coerce_colour(colour):
+            coerced.append(colour)
+            return colour.upper()
+
+        objs_and_colours = [(id_, 'red' if i % 2 else 'blue') 
+                            for i, id_ in enumerate(self.uuids)
+                           ]
+        objs_and_colours.insert(3, ('GH curve', 'red'))
+        objs_and_colours.append(('64ff5ea2-fc0a-4d0d-b5f2-0953156b9999', 'red'))
+        recoloured, not_recoloured = rhino_gh_geom.recolour_objects(
+                                             objs_and_colours
+                                            ,doc
+                                            ,line_width = 4
+                                            ,coerce_colour = coerce_colour
+                                            ,to_guid = str
+                                            ,colour_sources = (1, 2, 1)
+                                            )
+        self.assertEqual(['blue', 'red'], coerced)
+        self.assertEqual(sorted(self.uuids), sorted(recoloured))
+        self.assertEqual(['GH curve', '64ff5ea2-fc0a-4d0d-b5f2-0953156b9999'], not_recoloured)
+        self.assertEqual(6, len(doc.Objects.modifications))
+        self.assertTrue(views.RedrawEnabled)
+        self.assertEqual(1, views.redraws)
+        for i, id_ in enumerate(self.uuids):
+            self.assertEqual(dict(ObjectColor = 'RED' if i % 2 else 'BLUE'
+                                 ,ColorSource = 1
+                                 ,PlotColorSource = 2
+                                 ,PlotWeightSource = 1
+                                 ,PlotWeight = 4
+                                 )
+                            ,doc.Objects.objects[id_].Attributes.__dict__
+                            )
+
+
+class StandInUserStrings(OrderedDict):
+    """ The methods of the NameValueCollection of an object's User Text
+        read_User_Text calls.
+    """
+    @property
+    def AllKeys(self):
+        return list(self)
+
+    def Get(self, key):
+        return OrderedDict.get(self, key)
+
+
+class TestReadUserText(unittest.TestCase):
+    computed = '%<CurveLength("ac4669e5-53a6-4c2b-9080-bbc67129d93e")>%'
+
+    def setUp(self):
+        self.fetches = []
+        self.user_strings = OrderedDict(
+            (i, StandInUserStrings([('name', 'link %s' % i)
+                                   ,('length', self.computed)
+                                   ,('pct', '%s%%' % i)
+                                   ]
+                                  )
+            )
+            for i in range(3)
+            )
+
+    def coerce_Rhino_obj(self, obj):
+        def GetUserStrings():
+            self.fetches.append(obj)
+            return self.user_strings[obj]
+        attributes = namedtuple('Attributes', 'GetUserStrings')(GetUserStrings)
+        return namedtuple('RhinoObject', 'Id Attributes')(obj, attributes)
+
+    def read(self, **kwargs):
+        return OrderedDict(Read_Usertext.read_User_Text(
+                     self.user_strings
+                    ,coerce_Rhino_obj = self.coerce_Rhino_obj
+                    ,parse_text_field = lambda val, Rhino_obj: 10.0 * Rhino_obj.Id
+                    ,**kwargs
+                    ))
+
+    def test_one_fetch_per_object(self):
+        user_text = self.read()
+        self.assertEqual([0, 1, 2], self.fetches)
+        self.assertEqual(OrderedDict([('name', 'link 1'), ('length', 10.0), ('pct', '1%')])
+                        ,user_text[1]
+                        )
+        self.assertEqual(self.computed, self.read(compute_vals = False)[2]['length'])
+
+    def test_keys_projection(self):
+        user_text = self.read(keys = ['pct', 'missing', 'name'])
+        self.assertEqual(OrderedDict([('pct', '2%'), ('name', 'link 2')]), user_text[2])
+
+    def test_is_computed_field(self):
+        self.assertTrue(Read_Usertext.is_computed_field(self.computed))
+        self.assertFalse(Read_Usertext.is_computed_field(self.computed[1:]))
+        self.assertFalse(Read_Usertext.is_computed_field('50%'))
+
 
 GDM = gdm_from_GH_Datatree.GeomDataMapping
 
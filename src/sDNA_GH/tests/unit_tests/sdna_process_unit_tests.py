@@ -0,0 +1,148 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Unit tests of sdna_process, with a stand-in sDNA command script that 
+    prints progress lines.  Standard library only, so runnable outside of 
+    Grasshopper, e.g. from src:
+    python -m unittest sDNA_GH.tests.unit_tests.sdna_process_unit_tests
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ... import sdna_process
+
+
+STAND_IN_SDNA_COMMAND = '''
+import sys
+import time
+import subprocess
+
+if __name__ == '__main__':
+    delay = float(sys.argv[1])
+    if len(sys.argv) > 3:
+        # A child process, that outlives this one unless killed too.
+        subprocess.Popen([sys.executable
+                         ,'-c'
+                         ,'import time; time.sleep(1.5); open(%r, "w").close()' 
+                          % sys.argv[3]
+                         ])
+    print('Reading network')
+    sys.stderr.write('Warning: stand in sDNA\\n')
+    for percent in (0, 25, 50, 75, 100):
+        print('Progress: %s%%' % percent)
+        sys.stdout.flush()
+        time.sleep(delay)
+    print('sDNA done')
+    sys.exit(int(sys.argv[2]))
+'''
+
+
+class TestRunProcess(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.script = os.path.join(self.folder, 'stand in sDNA.py')
+        with open(self.script, 'w') as f:
+            f.write(STAND_IN_SDNA_COMMAND)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def command(self, delay, retcode = 0, child_file = ''):
+        return '"%s" -u "%s" %s %s %s' % (sys.executable
+                                         ,self.script
+                                         ,delay
+                                         ,retcode
+                                         ,child_file
+                                         )
+
+    def test_streams_lines_and_progress(self):
+        streamed, errors, progress = [], [], []
+        retcode, output = sdna_process.run_process(self.command(0, 2)
+                                                  ,output = streamed.append
+                                                  ,errors = errors.append
+                                                  ,progress = progress.append
+                                                  )
+        self.assertEqual(2, retcode)
+        self.assertEqual(['Reading network', 'Progress: 0%', 'Progress: 25%'
+                         ,'Progress: 50%', 'Progress: 75%', 'Progress: 100%'
+                         ,'sDNA done'
+                         ]
+                        ,streamed
+                        )
+        self.assertEqual(['Warning: stand in sDNA'], errors)
+        self.assertEqual([0.0, 25.0, 50.0, 75.0, 100.0], progress)
+        self.assertEqual(sorted(streamed + errors), sorted(output.splitlines()))
+
+    def test_lines_arrive_before_exit(self):
+        arrival_times = []
+        start = time.time()
+        sdna_process.run_process(self.command(0.2)
+                                ,output = lambda line: arrival_times.append(time.time())
+                                )
+        self.assertLess(arrival_times[0] - start, 0.5 * (time.time() - start))
+
+    def test_timeout_kills_process(self):
+        progress = []
+        start = time.time()
+        with self.assertRaises(sdna_process.ProcessTimeoutError) as context:
+            sdna_process.run_process(self.command(10)
+                                    ,progress = progress.append
+                                    ,timeout = 1
+                                    )
+        self.assertLess(time.time() - start, 5)
+        self.assertEqual([0.0], progress)
+        self.assertIn('Progress: 0%', context.exception.output)
+
+    def test_cancel_kills_process(self):
+        cancel_event = threading.Event()
+        timer = threading.Timer(1, cancel_event.set)
+        timer.start()
+        start = time.time()
+        with self.assertRaises(sdna_process.ProcessCancelledError):
+            sdna_process.run_process(self.command(10)
+                                    ,cancel_event = cancel_event
+                                    )
+        timer.cancel()
+        self.assertLess(time.time() - start, 5)
+
+    def test_kills_child_processes(self):
+        child_file = os.path.join(self.folder, 'child_survived')
+        with self.assertRaises(sdna_process.ProcessTimeoutError):
+            sdna_process.run_process(self.command(10, child_file = child_file)
+                                    ,timeout = 0.5
+                                    )
+        time.sleep(2.5)
+        self.assertFalse(os.path.exists(child_file))
@@ -0,0 +1,156 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Unit tests of sdna_worker, with a stand-in sDNA command script.  
+    Standard library only, so runnable outside of Grasshopper, e.g. from src:
+    python -m unittest sDNA_GH.tests.unit_tests.sdna_worker_unit_tests
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import threading
+
+from ... import sdna_worker
+
+
+STAND_IN_UI_SPEC = 'import time\nIMPORTED_AT = time.time()\n'
+
+STAND_IN_SDNA_COMMAND = '''
+import os
+import sys
+import time
+import stand_in_UISpec
+
+if __name__ == '__main__':
+    print('args: %s' % sys.argv[1:])
+    print('imported at: %s' % stand_in_UISpec.IMPORTED_AT)
+    if '--crash' in sys.argv:
+        os._exit(3)
+    if '--fail' in sys.argv:
+        raise RuntimeError('Stand in sDNA failed. ')
+    if '--hang' in sys.argv:
+        time.sleep(60)
+'''
+
+
+class TestSplitCommandLine(unittest.TestCase):
+    def test_quoted_windows_paths(self):
+        command_line = r' --im "net=C:\sDNA files\in.shp" --om net=C:\out.shp "" '
+        self.assertEqual(['--im', r'net=C:\sDNA files\in.shp', '--om'
+                         ,r'net=C:\out.shp', ''
+                         ]
+                        ,sdna_worker.split_command_line(command_line)
+                        )
+
+    def test_escaped_quotes(self):
+        self.assertEqual(['a"b', 'c\\', 'd\\\\e']
+                        ,sdna_worker.split_command_line(r'a\"b "c\\" d\\e')
+                        )
+
+
+class TestWorker(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.folder, 'bin'))
+        with open(os.path.join(self.folder, 'stand_in_UISpec.py'), 'w') as f:
+            f.write(STAND_IN_UI_SPEC)
+        self.script = os.path.join(self.folder, 'bin', 'stand_in_sDNA.py')
+        with open(self.script, 'w') as f:
+            f.write(STAND_IN_SDNA_COMMAND)
+        self.worker = sdna_worker.Worker([sys.executable
+                                         ,'-u'
+                                         ,sdna_worker.WORKER_SCRIPT
+                                         ,self.folder
+                                         ,'stand_in_UISpec'
+                                         ]
+                                        )
+
+    def tearDown(self):
+        self.worker.stop()
+        shutil.rmtree(self.folder)
+
+    def test_jobs_share_one_process_and_imports(self):
+        streamed = []
+        retcode, output = self.worker.run(self.script, ['a', 'b c'], streamed.append)
+        self.assertEqual(0, retcode)
+        self.assertEqual(output.splitlines(), streamed)
+        self.assertIn("args: ['a', 'b c']", streamed)
+        retcode, second_output = self.worker.run(self.script, ['a', 'b c'])
+        self.assertEqual(output, second_output)
+        self.assertEqual(1, self.worker.num_starts)
+
+    def test_failed_job_returns_error_code(self):
+        retcode, output = self.worker.run(self.script, ['--fail'])
+        self.assertEqual(1, retcode)
+        self.assertIn('Stand in sDNA failed.', output)
+        self.assertEqual(0, self.worker.run(self.script, [])[0])
+        self.assertEqual(1, self.worker.num_starts)
+
+    def test_restarts_after_crash(self):
+        with self.assertRaises(sdna_worker.WorkerCrashedError):
+            self.worker.run(self.script, ['--crash'])
+        self.assertEqual(0, self.worker.run(self.script, [])[0])
+        self.worker.process.kill()
+        self.worker.process.wait()
+        self.assertEqual(0, self.worker.run(self.script, [])[0])
+        # The crashing job is not retried, so there is one restart after 
+        # it, and one after the kill.
+        self.assertEqual(3, self.worker.num_starts)
+
+    def test_timeout_kills_and_restarts(self):
+        start = time.time()
+        with self.assertRaises(sdna_worker.WorkerTimeoutError):
+            self.worker.run(self.script, ['--hang'], timeout = 0.5)
+        self.assertLess(time.time() - start, 30)
+        self.assertFalse(self.worker.is_alive())
+        self.assertEqual(0, self.worker.run(self.script, [])[0])
+        self.assertEqual(2, self.worker.num_starts)
+
+    def test_cancel_kills_and_restarts(self):
+        cancel_event = threading.Event()
+        timer = threading.Timer(0.5, cancel_event.set)
+        timer.start()
+        try:
+            with self.assertRaises(sdna_worker.WorkerCancelledError):
+                self.worker.run(self.script, ['--hang'], cancel_event = cancel_event)
+        finally:
+            timer.cancel()
+        self.assertEqual(0, self.worker.run(self.script, [])[0])
+        self.assertEqual(2, self.worker.num_starts)
+
+    def test_retries_crashed_job_if_asked_to(self):
+        self.worker.max_retries = 2
+        with self.assertRaises(sdna_worker.WorkerCrashedError):
+            self.worker.run(self.script, ['--crash'])
+        self.assertEqual(3, self.worker.num_starts)
@@ -0,0 +1,154 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.0'
+""" Unit tests of spec_cache.  Standard library only, so runnable outside 
+    of Grasshopper, e.g. from src:
+    python -m unittest sDNA_GH.tests.unit_tests.spec_cache_unit_tests
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from ... import spec_cache
+
+
+TOOL_NAMES = ('sDNAIntegral', 'sDNASkim', 'sDNAIntFromOD', 'sDNAGeodesics'
+             ,'sDNAHulls', 'sDNANetRadii', 'sDNAAccessibilityMap', 'sDNAPrepare'
+             ,'sDNALineMeasures', 'sDNALearn', 'sDNAPredict'
+             )
+
+# A stand in for sDNAUISpec.py, that like it, imports a lot of the 
+# standard library.
+FAKE_SDNAUISPEC = '''
+import os, sys, re, json, csv, decimal, logging, optparse, subprocess, tempfile
+class Tool(object):
+    def getInputSpec(self):
+        return [("input", "Input polyline features", "FC", None, "", True)
+               ,("output", "Output features", "OFC", None, "", True)
+               ,("analmet", "Analysis metric", "Text"
+                ,["EUCLIDEAN", "ANGULAR", "CUSTOM", "HYBRID"], "ANGULAR", True)
+               ,("radii", "Radii (comma separated)", "Text", None, "n", True)
+               ,("bandedradii", "Banded radius", "Bool", None, False, False)
+               ,("advanced", "Advanced config", "Text", None, "", False)
+               ]
+    def getSyntax(self, args):
+        return {"command" : self.__class__.__name__}
+%s
+''' % '\n'.join('class %s(Tool): pass' % tool_name for tool_name in TOOL_NAMES)
+
+
+class TestSpecCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        class Options(spec_cache.SpecCacheOptions):
+            spec_cache = os.path.join(self.folder, 'input_specs_cache.json')
+        self.Options = Options
+        self.sDNAUISpec = os.path.join(self.folder, 'fake_sDNAUISpec.py')
+        with open(self.sDNAUISpec, 'w') as f:
+            f.write(FAKE_SDNAUISPEC)
+
+    def tearDown(self):
+        for path in list(spec_cache.caches):
+            if path.startswith(self.folder):
+                del spec_cache.caches[path]
+        sys.modules.pop('fake_sDNAUISpec', None)
+        if self.folder in sys.path:
+            sys.path.remove(self.folder)
+        shutil.rmtree(self.folder)
+
+    def import_fake_sDNAUISpec(self):
+        sys.modules.pop('fake_sDNAUISpec', None)
+        sys.path.insert(0, self.folder)
+        try:
+            return __import__('fake_sDNAUISpec')
+        finally:
+            sys.path.remove(self.folder)
+
+    def test_put_then_get_from_new_cache(self):
+        input_spec = self.import_fake_sDNAUISpec().sDNAIntegral().getInputSpec()
+        key = spec_cache.spec_key(self.sDNAUISpec, 'sDNAIntegral')
+        spec_cache.SpecCache(self.Options).put(key, input_spec)
+        cache = spec_cache.SpecCache(self.Options)
+        self.assertEqual(cache.get(key), input_spec)
+        self.assertIsNone(cache.get(spec_cache.spec_key(self.sDNAUISpec, 'sDNASkim')))
+
+    def test_key_changes_with_mtime(self):
+        key = spec_cache.spec_key(self.sDNAUISpec, 'sDNAIntegral')
+        cache = spec_cache.SpecCache(self.Options)
+        cache.put(key, [('input', 'Input', 'FC', None, '', True)])
+        mtime = os.path.getmtime(self.sDNAUISpec)
+        os.utime(self.sDNAUISpec, (mtime + 10, mtime + 10))
+        new_key = spec_cache.spec_key(self.sDNAUISpec, 'sDNAIntegral')
+        self.assertNotEqual(key, new_key)
+        self.assertIsNone(cache.get(new_key))
+        cache.put(new_key, [('input', 'Input', 'FC', None, '', True)])
+        self.assertEqual(list(cache.specs), [new_key]) # old entry removed
+
+    def test_no_key_without_sDNAUISpec(self):
+        self.assertIsNone(spec_cache.spec_key(None, 'sDNAIntegral'))
+        self.assertIsNone(spec_cache.spec_key(self.sDNAUISpec + 'c', 'sDNAIntegral'))
+
+    def test_one_cache_per_path(self):
+        cache = spec_cache.get_cache(self.Options)
+        self.assertIs(cache, spec_cache.get_cache(self.Options))
+        class OtherOptions(spec_cache.SpecCacheOptions):
+            spec_cache = os.path.join(self.folder, 'other_cache.json')
+        self.assertIsNot(cache, spec_cache.get_cache(OtherOptions))
+
+    def test_warm_start_needs_no_import(self):
+        """ The input specs of all the tools, loaded by importing 
+            sDNAUISpec and calling getInputSpec (cold), are the same from 
+            the spec cache (warm), without importing sDNAUISpec.  
+            dev/benchmarks/spec_cache.py times the two.
+        """
+        sDNAUISpec = self.import_fake_sDNAUISpec()
+        cache = spec_cache.SpecCache(self.Options)
+        cold_specs = []
+        for tool_name in TOOL_NAMES:
+            cold_specs.append(getattr(sDNAUISpec, tool_name)().getInputSpec())
+            cache.put(spec_cache.spec_key(self.sDNAUISpec, tool_name), cold_specs[-1])
+
+        sys.modules.pop('fake_sDNAUISpec', None)
+
+        warm_specs = []
+        for tool_name in TOOL_NAMES: # A new cache per tool, as if each were
+                                     # loaded in a new Rhino session.
+            cache = spec_cache.SpecCache(self.Options)
+            warm_specs.append(cache.get(spec_cache.spec_key(self.sDNAUISpec, tool_name)))
+
+        self.assertEqual(warm_specs, cold_specs)
+        self.assertNotIn('fake_sDNAUISpec', sys.modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
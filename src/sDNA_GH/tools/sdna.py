@@ -43,9 +43,12 @@ import logging
 import subprocess
 import re
 import warnings
+import functools
+import threading
 import collections
 
 
+from Grasshopper.Kernel import GH_Document
 from Grasshopper.Kernel.Parameters import (Param_Arc
                                           ,Param_Colour  
                                           ,Param_Curve
@@ -70,6 +73,11 @@ from .. import options_manager
 from .. import pyshp_wrapper
 from .. import logging_wrapper
 from .. import launcher
+from .. import sdna_worker
+from .. import sdna_process
+from .. import results_cache
+from .. import python_registry
+from .. import spec_cache
 
 
 itertools = funcs.itertools #contains pairwise recipe if Python < 3.10
@@ -88,6 +96,11 @@ try:
 except NameError:
     basestring = str
 
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
 OrderedDict, Counter = collections.OrderedDict, collections.Counter
 if hasattr(collections, 'Iterable'):
     Iterable = collections.Iterable 
@@ -372,7 +385,7 @@ class sDNAMetaOptions(object):
 sDNA_meta_options = options_manager.namedtuple_from_class(sDNAMetaOptions)
 
 
-class PythonOptions(object):
+class PythonOptions(python_registry.PythonRegistryOptions):
     """All options needed to specify a Python interpreter, or search for one. """
 
     python_paths = list( funcs.windows_installation_paths(tuple('Python3%s' % i 
@@ -401,7 +414,9 @@ class MissingPythonError(Exception):
 def check_python(opts):
     #type(dict) -> None 
     """ Searches opts['options'].python_paths, updating opts['options'].python 
-        until it is a file.  
+        until it is a file.  The interpreter found is cached in 
+        opts['options'].python_cache, so later calls need only check it is
+        unchanged, instead of searching again.
         
         Mutates: opts
         Returns: None
@@ -420,20 +435,34 @@ def check_python(opts):
     if isinstance(pythons, basestring):
         pythons = [pythons]
 
-    if (isinstance(options.python, basestring) 
-        and os.path.isdir(options.python)):
-        #
-        folders = itertools.chain( (options.python,), folders)
+    python = options.python
+
+    if isinstance(python, basestring) and os.path.isfile(python):
+        return
+
+    key = python_registry.search_key(python, folders, pythons)
+    registry = python_registry.PythonRegistry(options)
+    cached_python = registry.get(key)
+    if cached_python is not None:
+        logger.debug('Using cached Python interpreter: %s' % cached_python)
+        opts['options'] = opts['options']._replace(python = cached_python)
+        return
+
+    if isinstance(python, basestring) and os.path.isdir(python):
+        folders = itertools.chain( (python,), folders)
 
-    possible_pythons = (os.path.join(dirpath, python) 
+    possible_pythons = (os.path.join(dirpath, exe) 
                         for folder in folders 
-                        for dirpath, __, __ in os.walk(folder)
-                        for python in pythons
                         if isinstance(folder, basestring) and os.path.isdir(folder)
+                        for dirpath in python_registry.walk_bounded(folder
+                                                                   ,options.python_search_depth
+                                                                   )
+                        for exe in pythons
                        )
 
-    for python in itertools.chain((opts['options'].python,), possible_pythons):
-        if isinstance(python, basestring) and os.path.isfile(python):
+    for python in possible_pythons:
+        if os.path.isfile(python):
+            registry.add(key, python)
             opts['options'] = opts['options']._replace(python = python)
             break  
     else:  # for/else, i.e. if the for loop wasn't left early by break
@@ -599,9 +628,9 @@ def update_opts(current_opts
     for key in data_node_keys + current_data_node_keys:
         override_data = override_data_fields.copy()
 
-        logger.debug('override_data == %s' % override_data)
-        logger.debug('key == %s' % key)
-        logger.debug('current_opts.keys() == %s' % current_opts.keys())
+        logger.debug('override_data == %s', override_data)
+        logger.debug('key == %s', key)
+        logger.debug('current_opts.keys() == %s', current_opts.keys())
 
         if key in current_opts:  #current_data_node_keys
             overrides = [override_data]
@@ -635,6 +664,49 @@ def update_opts(current_opts
 
 
 
+def sDNA_folders(metas):
+    #type(namedtuple) -> list
+    """ The folders in metas.sDNA_paths, or of the files in it, skipping 
+        out of any 'bin' sub folders.
+    """
+    if isinstance(metas.sDNA_paths, basestring):
+        folders = [metas.sDNA_paths] 
+    else:
+        folders = metas.sDNA_paths
+
+    for i, folder in enumerate(folders):
+        if os.path.isfile(folder):
+            folder = folders[i] = os.path.dirname(folder)
+        if os.path.basename(folder) == 'bin':
+            folders[i] = os.path.dirname(folder)
+
+    return folders
+
+
+def sDNAUISpec_path(opts):
+    #type(dict) -> str / None
+    """ The path of the sDNAUISpec.py that import_sDNA imports (or has 
+        imported), found without importing it.  None if there is no such 
+        .py file.
+    """
+    metas = opts['metas']
+    name = os.path.splitext(metas.sDNAUISpec)[0]
+    if name in sys.modules:
+        path = os.path.splitext(getattr(sys.modules[name], '__file__', ''))[0] + '.py'
+        return path if os.path.isfile(path) else None
+
+    run_sDNA_name = os.path.splitext(metas.runsdnacommand)[0]
+    for folder in sDNA_folders(metas):
+        path = os.path.join(folder, name + '.py')
+        if (os.path.isfile(path) and
+            any(os.path.isfile(os.path.join(folder, run_sDNA_name + ending))
+                for ending in ('.py', '.pyc')
+               )):
+            #
+            return path
+    return None
+
+
 def import_sDNA(opts 
                ,load_modules = launcher.load_modules
                ,logger = logger
@@ -677,16 +749,7 @@ def import_sDNA(opts
                )
     #
     # Import sDNAUISpec.py and runsdnacommand.py from metas.sDNA_paths
-    if isinstance(metas.sDNA_paths, basestring):
-        folders = [metas.sDNA_paths] 
-    else:
-        folders = metas.sDNA_paths
-
-    for i, folder in enumerate(folders):
-        if os.path.isfile(folder):
-            folder = folders[i] = os.path.dirname(folder)
-        if os.path.basename(folder) == 'bin':
-            folders[i] = os.path.dirname(folder)
+    folders = sDNA_folders(metas)
 
     try:
         sDNAUISpec, run_sDNA, _ = load_modules(
@@ -865,6 +928,128 @@ def file_name_formats(base_name, duplicate_suffix):
     return unique_name_fmt, dupe_name_fmt
 
 
+def run_concurrently(funcs, max_workers = 1):
+    #type(list[function], int) -> list
+    """ Calls each of funcs in at most max_workers threads at a time.  
+        Returns their results in the same order as funcs.  Re-raises the 
+        first exception raised by any of funcs after all have finished.
+    """
+    results = [None] * len(funcs)
+    exceptions = []
+    indices = queue.Queue()
+    for i in range(len(funcs)):
+        indices.put(i)
+
+    def work():
+        while True:
+            try:
+                i = indices.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[i] = funcs[i]()
+            except Exception as e:
+                exceptions.append(e)
+
+    threads = [threading.Thread(target = work) 
+               for __ in range(max(1, min(max_workers, len(funcs))))
+              ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if exceptions:
+        raise exceptions[0]
+
+    return results
+
+
+def coerce_to_type_of(val, default):
+    #type(str, type[any]) -> type[any]
+    """ Coerces a str val to the type of default, if that is a bool, 
+        int or float (other types of val and default are returned as is).
+    """
+    if not isinstance(val, basestring) or isinstance(default, basestring):
+        return val
+    if isinstance(default, bool):
+        if val.lower() in ('true', '1', 'yes'):
+            return True
+        if val.lower() in ('false', '0', 'no', ''):
+            return False
+    elif isinstance(default, (int, float)):
+        try:
+            return type(default)(val)
+        except ValueError:
+            pass
+    else:
+        return val
+    msg = 'Cannot coerce: %s to the type of: %s (%s)' % (val, default, type(default))
+    logger.error(msg)
+    raise ValueError(msg)
+
+
+def tool_opts_variant(variant, tool_opts = None):
+    #type(dict / str, namedtuple) -> dict
+    """ A dict of tool_opts, or a str of them, e.g. 'radii=400,800;metric=ANGULAR'.
+        If tool_opts is given, each key must be one of its fields, and 
+        each str value is coerced to the type of that field's value.  
+    """
+    if isinstance(variant, basestring):
+        variant = (pair.partition('=')[::2]
+                   for pair in variant.split(';') 
+                   if pair.strip()
+                  )
+    variant = OrderedDict(variant)
+
+    retval = OrderedDict()
+    for key, val in variant.items():
+        key = key.strip()
+        if isinstance(val, basestring):
+            val = val.strip()
+        if tool_opts is not None:
+            if key not in tool_opts._fields:
+                msg = ('Unrecognised tool option: %s in batch variant: %s. ' 
+                      % (key, dict(variant))
+                      )
+                msg += 'Tool options: %s' % (tool_opts._fields,)
+                logger.error(msg)
+                raise ValueError(msg)
+            val = coerce_to_type_of(val, getattr(tool_opts, key))
+        retval[key] = val
+    return retval
+
+
+def referenced_files(tool_opts):
+    #type(dict) -> list
+    """ Paths of existing files named by tool_opts' values, or by those 
+        in its advanced config string (e.g. zonefiles=zones.csv), 
+        including in comma separated lists.
+    """
+    vals = []
+    for key, val in tool_opts.items():
+        if not isinstance(val, basestring):
+            continue
+        if key == 'advanced':
+            vals.extend(pair.partition('=')[2] for pair in val.split(';'))
+        else:
+            vals.append(val)
+    return [path.strip()
+            for val in vals
+            for path in val.split(',')
+            if path.strip() and os.path.isfile(path.strip())
+           ]
+
+
+def run_sDNA_command(command, options, cancel_event = None):
+    #type(str, namedtuple, threading.Event) -> int, str
+    return sdna_process.run_process(command
+                                   ,timeout = options.sDNA_timeout
+                                   ,cancel_event = cancel_event
+                                   ,progress_pattern = options.sDNA_progress_pattern
+                                   )
+
+
 
 
 class sDNA_ToolWrapper(sDNA_GH_Tool):
@@ -927,10 +1112,23 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
     class Options(PythonOptions
                  ,pyshp_wrapper.InputFileDeletionOptions
                  ,pyshp_wrapper.OutputFileDeletionOptions
+                 ,results_cache.ResultsCacheOptions
+                 ,spec_cache.SpecCacheOptions
+                 ,sdna_process.ProcessRunnerOptions
                  ):
         prepped_fmt = "{name}_prepped"
         output_fmt = "{name}_output"
         overwrite_shp = pyshp_wrapper.ShpOptions.overwrite_shp
+        use_worker = False # Run sDNA in a long lived worker process with
+                           # sDNA already imported (see sdna_worker.py).
+                           # Not used by batches.
+        max_workers = 4 # Max number of sDNA processes to run a batch in.
+        use_results_cache = False # Copy the outputs of a previous sDNA run on 
+                                  # identical input with identical options 
+                                  # (see results_cache.py) instead of rerunning.
+                                  # Files named in the options (or advanced) 
+                                  # are keyed by contents, but any others 
+                                  # sDNA reads are not.
         # file extensions are actually optional in PyShp, 
         # but just to be safe and future proof
 # https://sdna.cardiff.ac.uk/sdna/wp-content/downloads/documentation/manual/sDNA_manual_v4_1_0/installation_usage.html 
@@ -956,8 +1154,7 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
     def already_loaded(self, opts, sDNA = None):
         if sDNA is None:
             sDNA = sDNA_key(opts)
-        return (sDNA in self.get_syntaxes and 
-                sDNA in self.default_named_tuples and
+        return (sDNA in self.default_named_tuples and
                 self.get_tool_opts(opts, sDNA, val = None) is not None and
                 sDNA in self.input_specs and
                 (set(funcs.first_of_each(self.param_infos))
@@ -965,28 +1162,9 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                 )
                )
 
-                
-
-    def load_sDNA_tool(self, opts = None):
-        if opts is None:
-            opts = self.opts
-        metas = opts['metas']
-        nick_name = self.nick_name
-        tool_name = self.tool_name
-
-        check_python(opts)
-
-        sDNAUISpec, run_sDNA = self.import_sDNA(opts, logger = self.logger)
-
-        sDNA = sDNA_key(opts)
-
-        if self.already_loaded(opts, sDNA):
-            get_syntax = self.get_syntaxes[sDNA]
-            defaults = self.default_named_tuples[sDNA]._asdict()
-            return sDNAUISpec, run_sDNA, get_syntax, defaults
-        self.logger.info('Loading sDNA info for tool: %s' % tool_name)
+    def sDNA_tool(self, sDNAUISpec):
         try:
-            sDNA_Tool = getattr(sDNAUISpec, self.tool_name)()
+            return getattr(sDNAUISpec, self.tool_name)()
         except AttributeError:
             msg =   ('No tool called '
                     +self.tool_name
@@ -996,11 +1174,67 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                     )
             self.logger.error(msg)
             raise ValueError(msg)
-                            
-        self.get_syntaxes[sDNA] = get_syntax = sDNA_Tool.getSyntax
 
-        
-        self.input_specs[sDNA] = input_spec = sDNA_Tool.getInputSpec()
+    def get_input_spec(self, opts, sDNA):
+        #type(dict, str) -> list
+        """ The tool's input spec from the spec cache if it has a valid 
+            entry, else from sDNAUISpec (importing sDNA).
+        """
+        options = opts['options']
+        key = None
+        if options.use_spec_cache:
+            cache = spec_cache.get_cache(options)
+            key = spec_cache.spec_key(sDNAUISpec_path(opts), self.tool_name)
+            input_spec = cache.get(key)
+            if input_spec is not None:
+                return input_spec
+
+        sDNAUISpec, __ = self.import_sDNA(opts, logger = self.logger)
+        sDNA_Tool = self.sDNA_tool(sDNAUISpec)
+        self.get_syntaxes[sDNA] = sDNA_Tool.getSyntax
+        input_spec = sDNA_Tool.getInputSpec()
+        if key is not None:
+            cache.put(key, input_spec)
+        return input_spec
+
+    def load_sDNA_tool(self, opts = None, lazy = False):
+        """ Sets up the tool's options and Params from its input spec.  
+            Unless lazy, also imports sDNA (if not already imported).  
+
+            Returns sDNAUISpec, run_sDNA, get_syntax (all None if lazy) 
+            and the tool's default options.
+        """
+        if opts is None:
+            opts = self.opts
+
+        check_python(opts)
+
+        sDNA = sDNA_key(opts)
+
+        if not self.already_loaded(opts, sDNA):
+            self.load_input_spec(opts, sDNA)
+
+        defaults = self.default_named_tuples[sDNA]._asdict()
+
+        if lazy:
+            return None, None, None, defaults
+
+        sDNAUISpec, run_sDNA = self.import_sDNA(opts, logger = self.logger)
+
+        if sDNA not in self.get_syntaxes: # e.g. input spec was cached.
+            self.get_syntaxes[sDNA] = self.sDNA_tool(sDNAUISpec).getSyntax
+
+        return sDNAUISpec, run_sDNA, self.get_syntaxes[sDNA], defaults
+
+    def load_input_spec(self, opts, sDNA):
+        #type(dict, str) -> None
+        metas = opts['metas']
+        nick_name = self.nick_name
+        tool_name = self.tool_name
+
+        self.logger.info('Loading sDNA info for tool: %s' % tool_name)
+
+        self.input_specs[sDNA] = input_spec = self.get_input_spec(opts, sDNA)
 
         # Don't add 'advanced' or ADVANCED_ARG_INPUT_PARAMS to sDNA Prepare, Learn or Predict
         if (any(tuple_[0]=='analmet' and 'HYBRID' in tuple_[3] for tuple_ in input_spec) and 
@@ -1135,8 +1369,6 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                          %'\n'.join(OrderedDict(self.param_infos).keys())
                          )
 
-        return sDNAUISpec, run_sDNA, get_syntax, defaults
-
 
 
     def __init__(self
@@ -1153,6 +1385,8 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
         self.nick_name = nick_name
         self.component = component
         self.import_sDNA = import_sDNA
+        self.cancel_event = threading.Event()
+        self.progress = None
 
         self.default_tool_opts = OrderedDict()
         self.default_named_tuples = OrderedDict()
@@ -1161,7 +1395,9 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
         #__, __, __, defaults = 
         
-        self.load_sDNA_tool(opts)
+        self.load_sDNA_tool(opts, lazy = True) # sDNA is imported when first 
+                                               # run, or now if its input 
+                                               # spec isn't cached.
 
         self.not_shared = ('input', 'output', 'advanced')
         
@@ -1190,7 +1426,25 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                 ,'reglambda'
                 ) 
     
-    component_inputs = ('file', 'config') 
+    component_inputs = ('file', 'config', 'batch') 
+
+    param_infos = sDNA_GH_Tool.param_infos + (
+                    ('batch', add_params.ParamInfo(
+                             param_Class = Param_ScriptVariable
+                            ,Description = ('List of variants of the tool '
+                                           +'options, to run the tool once '
+                                           +'for each of, in at most '
+                                           +'max_workers (%(max_workers)s) '
+                                           +'concurrent processes.  Each '
+                                           +'is a dictionary, or a string '
+                                           +'e.g. radii=400,800;metric=ANGULAR .  '
+                                           +'file is then a list of the '
+                                           +'output files, in the same order '
+                                           +'(each read by Read_Shp into its '
+                                           +'own branch of Data). '
+                                           )
+                            )),
+                    )
 
 
 
@@ -1200,13 +1454,15 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                 ,opts
                 ,input = None
                 ,output = None
+                ,batch = None
                 ,**kwargs
                 ):
-        #type(str, dict, str, str, str, dict) -> int, str
+        #type(str, dict, str, str, list, str, dict) -> int, str
         if opts is None:
             opts = self.opts
 
-        sDNAUISpec, run_sDNA, get_syntax, __ = self.load_sDNA_tool(opts)
+        with runner.span('load_sDNA_tool'):
+            sDNAUISpec, run_sDNA, get_syntax, __ = self.load_sDNA_tool(opts)
 
         if not hasattr(sDNAUISpec, self.tool_name): 
             msg = self.tool_name + 'not found in ' + sDNAUISpec.__name__
@@ -1242,6 +1498,21 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
             self.logger.error(msg)
             raise ValueError(msg)
          
+        if batch:
+            with runner.span('sDNA batch', num_runs = len(batch)):
+                retcodes, f_name = self.run_batch(input_file, opts, batch, **kwargs)
+            for retcode in retcodes:
+                if retcode:
+                    msg = 'sDNA exited with return code: %s ' % retcode
+                    self.logger.error(msg)
+                    raise subprocess.CalledProcessError(retcode, self.tool_name)
+            retcode = 0
+            input = input_file
+            output = ''
+            advanced = tool_opts_sDNA._asdict().get('advanced', '')
+            gdm = None
+            locs = locals().copy()
+            return tuple(locs[retval] for retval in self.retvals)
 
 
         output_file = output 
@@ -1311,34 +1582,86 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
         syntax = get_syntax(tool_opts)
 
+        script, args = self.script_and_args(syntax, sDNAUISpec, run_sDNA)
+
         command = (options.python
                   +' -u ' 
                   +' -E '
                   +'"' 
-                  +os.path.join(os.path.dirname(sDNAUISpec.__file__)
-                               ,'bin'
-                               ,syntax['command'] + '.py'  
-                               ) 
+                  +script
                   +'"'
-                  +' --im ' + run_sDNA.map_to_string(syntax["inputs"])
-                  +' --om ' + run_sDNA.map_to_string(syntax["outputs"])
-                  +' ' + syntax["config"]
+                  +args
                   )
         self.logger.info('sDNA command run: %s' % command)
 
         output_lines = ''
+        streamed = False
+
+        cached = False
+        if options.use_results_cache:
+            with runner.span('results cache lookup'):
+                cache = results_cache.ResultsCache(options)
+                cache_key = self.results_cache_key(input_file, tool_opts, sDNA)
+                cached = cache.get(cache_key, output_file)
 
         try:
-            output_lines = subprocess.check_output(command)
+            if cached:
+                self.logger.info('Copied cached sDNA results to: %s' % output_file)
+            elif options.use_worker:
+                worker = sdna_worker.get_worker(
+                                 python = options.python
+                                ,folder = os.path.dirname(sDNAUISpec.__file__)
+                                ,module_names = (sDNAUISpec.__name__
+                                                ,run_sDNA.__name__
+                                                )
+                                )
+                with runner.span('sDNA worker'):
+                    retcode, output_lines = worker.run(
+                                     script
+                                    ,sdna_worker.split_command_line(args)
+                                    ,output = self.logger.info
+                                    ,timeout = options.sDNA_timeout
+                                    ,cancel_event = self.cancel_event
+                                    )
+                streamed = True
+                if retcode:
+                    raise subprocess.CalledProcessError(retcode
+                                                       ,command
+                                                       ,output_lines
+                                                       )
+            else:
+                with runner.span('sDNA subprocess'):
+                    retcode, output_lines = sdna_process.run_process(
+                                     command
+                                    ,output = self.logger.info
+                                    ,errors = self.logger.warning
+                                    ,progress = self.report_progress
+                                    ,timeout = options.sDNA_timeout
+                                    ,cancel_event = self.cancel_event
+                                    ,progress_pattern = options.sDNA_progress_pattern
+                                    )
+                streamed = True
+                if retcode:
+                    raise subprocess.CalledProcessError(retcode
+                                                       ,command
+                                                       ,output_lines
+                                                       )
             retcode = 0 
         except subprocess.CalledProcessError as e:
-            self.logger.info(output_lines)
-            self.logger.error('error.output: %s' % e.output)
+            if not streamed:
+                self.logger.info(output_lines)
+                self.logger.error('error.output: %s' % e.output)
             self.logger.error('error.returncode: %s' % e.returncode)
             raise e
+        finally:
+            self.cancel_event.clear()
+
+        if options.use_results_cache and not cached:
+            cache.put(cache_key, output_file)
 
 
-        self.logger.info(output_lines)
+        if not streamed:
+            self.logger.info(output_lines)
 
 
         # Does not execute if subprocess raises an Exception
@@ -1372,6 +1695,200 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
     retvals = 'retcode', 'f_name', 'input', 'output', 'advanced'
     component_outputs = ('file',) # retvals[-1])
 
+    def report_progress(self, percent):
+        #type(float) -> None
+        """ Called with each progress percentage sDNA prints.  Cancels the
+            run if the user is holding down Escape (as they would to abort
+            a Grasshopper solution).
+        """
+        self.progress = percent
+        if self.component is not None:
+            self.component.Message = 'sDNA: %d%%' % percent
+        if GH_Document.IsEscapeKeyDown():
+            self.logger.warning('Escape key pressed.  Cancelling sDNA. ')
+            self.cancel()
+
+    def cancel(self):
+        #type() -> None
+        """ Kills the sDNA process(es) this tool is running (e.g. when 
+            called from another thread, or by report_progress), making 
+            the run raise sdna_process.ProcessCancelledError.
+        """
+        self.cancel_event.set()
+
+    def results_cache_key(self, input_file, tool_opts, sDNA):
+        #type(str, dict, str) -> str
+        """ The tool_opts must be fully resolved (including advanced).  The 
+            input and output file names are irrelevant (only the input's 
+            contents are).
+        """
+        tool_opts = OrderedDict((key, val) 
+                                for key, val in tool_opts.items()
+                                if key not in ('input', 'output')
+                               )
+        return results_cache.results_key(input_file
+                                               ,self.tool_name
+                                               ,tool_opts
+                                               ,sDNA
+                                               ,extra_files = referenced_files(tool_opts)
+                                               )
+
+    @staticmethod
+    def script_and_args(syntax, sDNAUISpec, run_sDNA):
+        #type(dict, module, module) -> str, str
+        """ The path of the sDNA script to run, and the string of its 
+            command line args, from syntax (returned by getSyntax). 
+        """
+        script = os.path.join(os.path.dirname(sDNAUISpec.__file__)
+                             ,'bin'
+                             ,syntax['command'] + '.py'  
+                             ) 
+        args = (' --im ' + run_sDNA.map_to_string(syntax["inputs"])
+               +' --om ' + run_sDNA.map_to_string(syntax["outputs"])
+               +' ' + syntax["config"]
+               )
+        return script, args
+
+    def run_batch(self, input_file, opts, variants, **kwargs):
+        #type(str, dict, list, dict) -> list, list
+        """ Runs the tool on input_file once for each variant of its 
+            tool_opts (a dict or str, e.g. 'radii=400,800;metric=ANGULAR') 
+            in variants, in at most options.max_workers concurrent sDNA 
+            processes.  Each run's output file is numbered, so none share 
+            one.  Batches always run sDNA in subprocesses, even if 
+            options.use_worker (the worker runs one job at a time).  
+            
+            Returns the return codes and output file paths of each run,
+            in the same order as variants.
+        """
+        sDNAUISpec, run_sDNA, get_syntax, __ = self.load_sDNA_tool(opts)
+
+        options = opts['options']
+
+        sDNA = sDNA_key(opts)
+
+        tool_opts_sDNA = self.get_tool_opts(opts, sDNA = sDNA)
+
+        if options.use_worker:
+            self.logger.info('Running batch in subprocesses, not the worker. ')
+
+        if options.use_results_cache:
+            cache = results_cache.ResultsCache(options)
+            cache_lock = threading.Lock()
+
+        def run(command, output_file, cache_key):
+            #type(str, str, str) -> int, str
+            if cache_key:
+                with cache_lock:
+                    if cache.get(cache_key, output_file):
+                        return 0, 'Copied cached sDNA results to: %s' % output_file
+            retcode, output_lines = run_sDNA_command(command
+                                                    ,options
+                                                    ,self.cancel_event
+                                                    )
+            if cache_key and not retcode:
+                with cache_lock:
+                    cache.put(cache_key, output_file)
+            return retcode, output_lines
+
+        if self.tool_name == 'sDNAPrepare':
+            output_fmt = options.prepped_fmt
+        else:
+            output_fmt = options.output_fmt
+
+        name = os.path.splitext(input_file)[0]
+
+        # All the file names are chosen (and the file deleters created and 
+        # used) in this thread, so concurrent runs never race on them.
+        output_files = []
+        output_file_deleters = []
+        jobs = []
+        for i, variant in enumerate(variants, start = 1):
+            variant = tool_opts_variant(variant, tool_opts_sDNA)
+            tool_opts = tool_opts_sDNA._asdict()
+            tool_opts.update(variant)
+
+            output_file = variant.get('output', '')
+            if not output_file:
+                output_file = output_fmt.format(name = '%s_%s' % (name, i)) + '.shp'
+                output_file = pyshp_wrapper.get_filename(output_file, options)
+
+                if (options.del_after_read and 
+                    not options.strict_no_del and
+                    not options.overwrite_shp and
+                    isinstance(options.INPUT_FILE_DELETER
+                              ,pyshp_wrapper.ShapeFilesDeleter)):
+                    #
+                    output_file_deleters.append(
+                                pyshp_wrapper.ShapeFilesDeleter(output_file)
+                                )
+            if output_file in output_files:
+                msg = 'More than one run in batch outputs to: %s' % output_file
+                self.logger.error(msg)
+                raise ValueError(msg)
+            output_files.append(output_file)
+
+            tool_opts.update(input = input_file, output = output_file)
+
+            for key, val in tool_opts.items():
+                if key in self.LIST_ARGS and isinstance(val, list) and len(val) >= 2:
+                    tool_opts[key] = ','.join(str(element) for element in val)
+
+            if 'advanced' in tool_opts:
+                tool_opts = self._add_to_advanced_config_string(
+                                     tool_opts
+                                    ,opts
+                                    ,extra_inputs = kwargs
+                                    )
+
+            script, args = self.script_and_args(get_syntax(tool_opts)
+                                               ,sDNAUISpec
+                                               ,run_sDNA
+                                               )
+            command = options.python + ' -u  -E "' + script + '"' + args
+            self.logger.info('sDNA command to run in batch: %s' % command)
+
+            cache_key = None
+            if options.use_results_cache:
+                cache_key = self.results_cache_key(input_file, tool_opts, sDNA)
+
+            jobs.append(functools.partial(run, command, output_file, cache_key))
+
+        try:
+            results = run_concurrently(jobs, max_workers = options.max_workers)
+        finally:
+            self.cancel_event.clear()
+
+        retcodes = []
+        for output_file, (retcode, output_lines) in zip(output_files, results):
+            self.logger.info(output_lines)
+            if retcode:
+                self.logger.error('Batch run outputting: %s, ' % output_file
+                                 +'exited with return code: %s' % retcode
+                                 )
+            retcodes.append(retcode)
+
+        if (not any(retcodes) and
+            options.del_after_sDNA and 
+            not options.strict_no_del and 
+            not options.overwrite_shp and 
+            isinstance(options.INPUT_FILE_DELETER
+                      ,pyshp_wrapper.ShapeFilesDeleter) and
+            hasattr(options.INPUT_FILE_DELETER, 'delete_files')):
+            #
+            options.INPUT_FILE_DELETER.delete_files(
+                                                delete = options.del_after_sDNA
+                                               ,opts = opts
+                                               )
+            opts['options'] = opts['options']._replace(INPUT_FILE_DELETER = None)
+
+        if output_file_deleters:
+            opts['options'] = opts['options']._replace(
+                            OUTPUT_FILE_DELETERS = tuple(output_file_deleters)
+                            )
+
+        return retcodes, output_files
+
     def _add_to_advanced_config_string(self, tool_opts, opts, extra_inputs):
         # If the user has specifed an advanced config string, as well as 
         # non-empty values for some params in self.ADVANCED_ARG_INPUT_PARAMS, 
@@ -107,16 +107,17 @@ except NameError:
 
 OrderedDict, Counter = collections.OrderedDict, collections.Counter
 if hasattr(collections, 'Iterable'):
-    Iterable = collections.Iterable 
+    Iterable, Mapping = collections.Iterable, collections.Mapping
 else:
     import collections.abc
-    Iterable = collections.abc.Iterable
+    Iterable, Mapping = collections.abc.Iterable, collections.abc.Mapping
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 ClassLogger = logging_wrapper.class_logger_factory(logger = logger
                                                   ,module_name = __name__
                                                   )
+Lazy = logging_wrapper.Lazy
 
 
 
@@ -127,6 +128,7 @@ QUANTILE_METHODS = {'simple' : data_cruncher.simple_quantile
                    ,'quantile' : data_cruncher.spike_isolating_quantile
                    ,'geometric' : data_cruncher.geometric
                    ,'Natural Breaks (Jenks)' : data_cruncher.fisher_jenks
+                   ,'jenks' : data_cruncher.fisher_jenks
                    }
 
 
@@ -197,6 +199,8 @@ class DataParser(sDNA_GH_Tool):
         suppress_class_overlap_error = False
         y_max = None
         y_min = None
+        use_numpy = True # Only used if NumPy can be imported.
+        max_points = 1000 # Jenks pre-bins more distinct values than this.
         
         assert re_normaliser in data_cruncher.VALID_RE_NORMALISERS
         assert class_spacing in VALID_CLASS_SPACINGS
@@ -311,7 +315,7 @@ class DataParser(sDNA_GH_Tool):
             if isinstance(val, Number):
                 return val
 
-            if not isinstance(val, dict):
+            if not isinstance(val, Mapping):
                 msg = 'val: %s is not a dict or a Number (type(val) == %s)' 
                 msg %= (val, type(val))
                 self.logger.error(msg)
@@ -335,6 +339,24 @@ class DataParser(sDNA_GH_Tool):
         
         return select
 
+    def data_items(self, gdm, select):
+        #type(list, function) -> Iterator[tuple]
+        """ Yields (obj, select(val)) for each obj and val in each sub_gdm
+            of gdm, straight from the column of field of any 
+            ColumnarGeomDataMapping with a complete column for it.
+        """
+        for sub_gdm in gdm:
+            if (isinstance(sub_gdm, gdm_from_GH_Datatree.ColumnarGeomDataMapping)
+                and self.field is not None
+                and sub_gdm.has_complete_column(self.field)):
+                #
+                for item in sub_gdm.column_items(self.field):
+                    yield item
+                continue
+
+            for obj, val in sub_gdm.items():
+                yield obj, select(val)
+
     component_inputs = ('Geom', 'Data', 'field', 'field_prefix', 'plot_max', 'plot_min' 
                        ,'num_classes', 'class_spacing', 'inter_class_bounds'
                        ,'re_normaliser', 'y_max', 'y_min', 'colour_as_class'
@@ -357,25 +379,20 @@ class DataParser(sDNA_GH_Tool):
             #
             x_min, x_max = user_min, user_max
             if options.exclude:
-                data = OrderedDict( (obj, select_data_pt_or_field(val)) 
-                                    for sub_gdm in gdm
-                                    for obj, val in sub_gdm.items()                                    
-                                    if x_min <= select_data_pt_or_field(val) <= x_max
+                data = OrderedDict( (obj, x) 
+                                    for obj, x in self.data_items(gdm, select_data_pt_or_field)
+                                    if x_min <= x <= x_max
                                   )
             else: # exclude == False => enforce bounds, cap and collar
-                data = OrderedDict( (obj, min(x_max, max(x_min, select_data_pt_or_field(val)))) 
-                                    for sub_gdm in gdm
-                                    for obj, val in sub_gdm.items()                                    
+                data = OrderedDict( (obj, min(x_max, max(x_min, x))) 
+                                    for obj, x in self.data_items(gdm, select_data_pt_or_field)
                                   )
 
         else:
             self.logger.debug('Manually calculating max and min. '
                              +'No valid override found. '
                              )
-            data = OrderedDict( (obj, select_data_pt_or_field(val)) 
-                                for sub_gdm in gdm
-                                for obj, val in sub_gdm.items()                                    
-                              )
+            data = OrderedDict(self.data_items(gdm, select_data_pt_or_field))
             x_min, x_max = min(data.values()), max(data.values())
             self.logger.debug('x_min == %s, x_max == %s' % (x_min, x_max))
         # bool(0) is False so in case x_min==0 we can't use if options.plot_min
@@ -386,12 +403,12 @@ class DataParser(sDNA_GH_Tool):
         # overridden, the user must set them to an invalid override 
         # (e.g. max <= min) to go back to auto-calculation.
 
-        self.logger.debug('data.values() == %s, ... ,%s' % (tuple(data.values()[:3])
-                                                           ,tuple(data.values()[-3:])
-                                                           )
+        self.logger.debug('data.values() == %s, ... ,%s'
+                         ,Lazy(lambda: tuple(data.values())[:3])
+                         ,Lazy(lambda: tuple(data.values())[-3:])
                          ) 
 
-        self.logger.debug('len(data)== %s ' % len(data.values()))
+        self.logger.debug('len(data)== %s ', len(data))
 
 
 
@@ -494,19 +511,8 @@ class DataParser(sDNA_GH_Tool):
 
         return inter_class_bounds
 
-    def mid_points(self, inter_class_bounds, x_min, x_max):
-        
-        if inter_class_bounds:
-            mid_points = [0.5*(x_min + min(inter_class_bounds))]
-            mid_points += [0.5*(x + y) for x, y in itertools.pairwise(inter_class_bounds)]
-            mid_points += [0.5*(x_max + max(inter_class_bounds))]
-        else:
-            mid_points = [0.5*(x_min + x_max)]
-        self.logger.debug(mid_points)
-
-        return mid_points
-
-    def legend_tags(self, inter_class_bounds, mid_points, x_min, x_max, options):
+    def legend_tags(self, class_lookup, options):
+        #type(data_cruncher.ClassLookup, type[any]) -> list
 
         locale.setlocale(locale.LC_ALL, options.locale)
 
@@ -516,53 +522,35 @@ class DataParser(sDNA_GH_Tool):
                 format_str = '{:d}'
             return format_str.format(x)
 
-        if inter_class_bounds:
-            x_min_str = format_number(x_min, options.num_format) 
-            upper_str = format_number(min( inter_class_bounds ), options.num_format)
-            mid_pt_str = format_number(mid_points[0], options.num_format)
-            #e.g. first_leg_tag_str = 'below {upper}'
-
-            legend_tags = [options.first_leg_tag_str.format(lower = x_min_str
-                                                           ,upper = upper_str
-                                                           ,mid_pt = mid_pt_str
-                                                           )
-                          ]
-            for lower_bound, class_mid_point, upper_bound in zip(
-                                                         inter_class_bounds[0:-1]
-                                                        ,mid_points[1:-1]
-                                                        ,inter_class_bounds[1:]  
-                                                        ):
-                
-                lower_str = format_number(lower_bound, options.num_format)
-                upper_str = format_number(upper_bound, options.num_format)
-                mid_pt_str = format_number(class_mid_point, options.num_format)
+        last = len(class_lookup) - 1
+
+        legend_tags = []
+        for i, (lower_bound, class_mid_point, upper_bound) in enumerate(
+                                                      class_lookup.classes()
+                                                      ):
+            if last == 0:
+                # A single class, from x_min to x_max.
+                # e.g. gen_leg_tag_str = '{lower} - {upper}' 
+                leg_tag_str = options.gen_leg_tag_str
+            elif i == 0:
+                #e.g. first_leg_tag_str = 'below {upper}'
+                leg_tag_str = options.first_leg_tag_str
+            elif i == last:
+                # e.g. last_leg_tag_str = 'above {lower}'
+                leg_tag_str = options.last_leg_tag_str
+            else:
                 # e.g. gen_leg_tag_str = '{lower} - {upper}' # also supports {mid}
-                legend_tags += [options.gen_leg_tag_str.format(lower = lower_str
-                                                              ,upper = upper_str
-                                                              ,mid_pt = mid_pt_str 
-                                                              )
-                               ]
-
-            lower_str =  format_number(max( inter_class_bounds ), options.num_format)
-            x_max_str =  format_number(x_max, options.num_format)
-            mid_pt_str =  format_number(mid_points[-1], options.num_format)
-
-            # e.g. last_leg_tag_str = 'above {lower}'
-            legend_tags += [options.last_leg_tag_str.format(lower = lower_str
-                                                           ,upper = x_max_str 
-                                                           ,mid_pt = mid_pt_str 
-                                                           )        
-                        ]        
-        else:
-            x_min_str = format_number(x_min, options.num_format)
-            x_max_str = format_number(x_max, options.num_format)
-            mid_pt_str = format_number(mid_points[0], options.num_format)
-            # e.g. gen_leg_tag_str = '{lower} - {upper}' # also supports {mid}
-            legend_tags = [options.gen_leg_tag_str.format(lower = x_min_str
-                                                         ,upper = x_max_str
-                                                         ,mid_pt = mid_pt_str 
-                                                         )
-                          ]                                          
+                leg_tag_str = options.gen_leg_tag_str
+
+            lower_str = format_number(lower_bound, options.num_format)
+            upper_str = format_number(upper_bound, options.num_format)
+            mid_pt_str = format_number(class_mid_point, options.num_format)
+
+            legend_tags += [leg_tag_str.format(lower = lower_str
+                                              ,upper = upper_str
+                                              ,mid_pt = mid_pt_str 
+                                              )
+                           ]
 
         self.logger.debug(legend_tags)
 
@@ -597,19 +585,29 @@ class DataParser(sDNA_GH_Tool):
 
         data, x_min, x_max = self.filter_or_bound_data_from_selected_field(gdm, options)
 
+        use_arrays = options.use_numpy and data_cruncher.numpy is not None
+        if use_arrays:
+            try:
+                data = data_cruncher.ArrayData.from_dict(data)
+            except TypeError as e:
+                self.logger.info('Not using NumPy. %s' % e)
+                use_arrays = False
 
         if options.sort_data or (
            not self.use_manual_classes 
            and options.class_spacing in QUANTILE_METHODS ):
             # 
             self.logger.info('Sorting data... ')
-            data = OrderedDict( sorted(data.items()
-                                      ,key = lambda tupl : tupl[1]
-                                      ) 
-                              )
-            self.logger.debug('data.values() == %s, ... ,%s' % (tuple(data.values()[:3])
-                                                               ,tuple(data.values()[-3:])
-                                                               )
+            if use_arrays:
+                data.sort()
+            else:
+                data = OrderedDict( sorted(data.items()
+                                          ,key = lambda tupl : tupl[1]
+                                          ) 
+                                  )
+            self.logger.debug('data.values() == %s, ... ,%s'
+                             ,Lazy(lambda: tuple(data.values())[:3])
+                             ,Lazy(lambda: tuple(data.values())[-3:])
                              ) 
 
 
@@ -620,26 +618,15 @@ class DataParser(sDNA_GH_Tool):
 
 
         if options.colour_as_class:
-
-        
-            def class_mid_point(x): 
-                highest_lower_bound = x_min if x < inter_class_bounds[0] else max(
-                                                y 
-                                                for y in [x_min] + inter_class_bounds
-                                                if y <= x                  
-                                                )
-                #Classes include their lower bound
-                least_upper_bound = x_max if x >= inter_class_bounds[-1] else min(
-                                                y 
-                                                for y in inter_class_bounds + [x_max] 
-                                                if y > x
-                                                )
-
-                return 0.5*(least_upper_bound + highest_lower_bound)
-
-
-            for obj, data_val in data.items():
-                data[obj] = class_mid_point(data_val)
+            class_lookup = data_cruncher.ClassLookup(inter_class_bounds
+                                                    ,x_min
+                                                    ,x_max
+                                                    )
+            if use_arrays:
+                data.replace_with_class_mid_points(class_lookup)
+            else:
+                for obj, data_val in data.items():
+                    data[obj] = class_lookup.class_mid_point(data_val)
 
 
 
@@ -672,25 +659,29 @@ class DataParser(sDNA_GH_Tool):
             for i, inter_class_bound in enumerate(inter_class_bounds):
                 inter_class_bounds[i] = renormalise(inter_class_bound)
 
-            for obj, data_val in data.items():
-                data[obj] = renormalise(data_val)
+            if use_arrays:
+                data.apply_spline(data_cruncher.array_splines[options.re_normaliser]
+                                 ,x_min
+                                 ,p
+                                 ,x_max
+                                 ,y_min
+                                 ,y_max
+                                 )
+            else:
+                for obj, data_val in data.items():
+                    data[obj] = renormalise(data_val)
 
             x_max, x_min = y_max, y_min
 
         
-        mid_points = self.mid_points(
-                             inter_class_bounds
-                            ,x_min
-                            ,x_max
-                            )
+        class_lookup = data_cruncher.ClassLookup(inter_class_bounds
+                                                ,x_min
+                                                ,x_max
+                                                )
+        mid_points = class_lookup.mid_points
+        self.logger.debug(mid_points)
 
-        legend_tags = self.legend_tags(
-                             inter_class_bounds
-                            ,mid_points
-                            ,x_min
-                            ,x_max
-                            ,options
-                            )
+        legend_tags = self.legend_tags(class_lookup, options)
 
         gen_exp = itertools.chain(data.items(), zip(legend_tags, mid_points))
 
@@ -135,16 +135,26 @@ def get_objs_and_OrderedDicts(only_selected = False
                              ,is_selected = gdm_from_GH_Datatree.is_selected
                              ,obj_layer = gdm_from_GH_Datatree.obj_layer
                              ,doc_layers = gdm_from_GH_Datatree.doc_layers
+                             ,doc_index = None
                              ):
     #type(bool, tuple, str, bool, function, function, function, function, 
-    #                             function, function, function) -> function
+    #                 function, function, function, RhinoDocIndex) -> function
     """ Generator for creating GDMs of Rhino geometry.  
     
         Use with sc.doc = Rhino.RhinoDoc.ActiveDoc 
+
+        If a doc_index (rhino_gh_geom.RhinoDocIndex) is given, the objects
+        are looked up in it, instead of all_objs_getter, is_shape,
+        obj_layer and is_selected being called.
     """
     if layers and isinstance(layers, basestring):
         layers = (layers,) if layers in doc_layers() else None
 
+    if doc_index is not None:
+        for obj in doc_index.get_ids(shp_type, layers, only_selected):
+            yield obj, OrderedDict_getter(obj)
+        return
+
 
 
 
@@ -188,6 +198,9 @@ class RhinoObjectsReader(sDNA_GH_Tool):
         layer = ''
         shp_type = 'POLYLINEZ'
         merge_subdicts = True
+        use_doc_index = True # Read from an index of the Rhino document's 
+                             # objects, kept until they change 
+                             # (see rhino_gh_geom.RhinoDocIndexCache).
 
 
     param_infos = sDNA_GH_Tool.param_infos + (
@@ -235,11 +248,16 @@ class RhinoObjectsReader(sDNA_GH_Tool):
         
         doc_layers = gdm_from_GH_Datatree.doc_layers
 
+        doc_index = None
+        if options.use_doc_index:
+            doc_index = rhino_gh_geom.get_doc_index(sc.doc)
+
         gdm = gdm_from_GH_Datatree.GeomDataMapping(
                     get_objs_and_OrderedDicts(only_selected = options.selected
                                              ,layers = options.layer
                                              ,shp_type = options.shp_type
                                              ,doc_layers = doc_layers
+                                             ,doc_index = doc_index
                                              ) 
                     )
         # lambda : {}, as User Text is read elsewhere, in read_Usertext
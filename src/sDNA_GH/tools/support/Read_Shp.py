@@ -121,6 +121,7 @@ logger.addHandler(logging.NullHandler())
 ClassLogger = logging_wrapper.class_logger_factory(logger = logger
                                                   ,module_name = __name__
                                                   )
+Lazy = logging_wrapper.Lazy
 
 
 class ShapefileReaderAddShapeError(Exception):
@@ -140,6 +141,7 @@ class ShapefileReader(sDNA_GH_Tool):
         output_fmt = '{name}_output'
         ensure_3D = True
         ignore_invalid = False
+        columnar_gdm = False # Store Data in columns, not a dict per object.
                         
     component_inputs = ('file', 'Geom', 'bake', 'ignore_invalid') 
                                                 # existing 'Geom', otherwise new 
@@ -153,6 +155,10 @@ class ShapefileReader(sDNA_GH_Tool):
 
         self.debug('Creating Class Logger.  Checking shapefile... ')
 
+        if isinstance(f_name, Iterable) and not isinstance(f_name, basestring):
+            # e.g. the list of output files from an sDNA tool's batch.
+            return self.read_each_file(f_name, gdm, opts)
+
         if not os.path.isfile(f_name):
             msg = "'File': %s  is not a valid file. " % f_name
             self.logger.error(msg)
@@ -234,7 +240,10 @@ class ShapefileReader(sDNA_GH_Tool):
 
         if isinstance(gdm, gdm_from_GH_Datatree.GeomDataMapping):
 
-            self.logger.debug('gdm == %s, ..., %s ' % (gdm.items()[:2], gdm.items()[-2:]))
+            self.logger.debug('gdm == %s, ..., %s '
+                             ,Lazy(lambda: list(gdm.items())[:2])
+                             ,Lazy(lambda: list(gdm.items())[-2:])
+                             )
 
             existing_geom_compatible = len(gdm) == num_entries
         else:
@@ -243,6 +252,11 @@ class ShapefileReader(sDNA_GH_Tool):
             logger.debug(msg)
 
 
+        if options.columnar_gdm:
+            GeomDataMapping = gdm_from_GH_Datatree.ColumnarGeomDataMapping
+        else:
+            GeomDataMapping = gdm_from_GH_Datatree.GeomDataMapping
+
         if options.new_geom or not existing_geom_compatible: 
             #shapes_to_output = ([shp.points] for shp in shapes )
             
@@ -295,8 +309,7 @@ class ShapefileReader(sDNA_GH_Tool):
 
 
             def gdm_of_new_geom_from_group(group):
-                return gdm_from_GH_Datatree.GeomDataMapping(
-                                                added_geom_generator(group))
+                return GeomDataMapping(added_geom_generator(group))
 
 
 
@@ -329,7 +342,7 @@ class ShapefileReader(sDNA_GH_Tool):
                                                                  )
                     )
             
-            gdm_partial = functools.partial(gdm_from_GH_Datatree.GeomDataMapping
+            gdm_partial = functools.partial(GeomDataMapping
                                            ,gdm_iterator
                                            )
             #                  dict.keys() is a dict view in Python 3
@@ -383,6 +396,54 @@ class ShapefileReader(sDNA_GH_Tool):
         return tuple(locs[retval] for retval in self.retvals)
 
 
+    def read_each_file(self, f_names, gdm, opts = None):
+        #type(list[str], dict, dict) -> int, list, list, list, list, list, list
+        """ Reads each shape file in f_names (matching each to the same
+            existing gdm if possible), into a list of gdms, one per file.
+            abbrevs, fields and field_prefixes are the union of each
+            file's, and invalid the concatenation.
+        """
+        self.logger.info('Reading %s shape files: %s' % (len(f_names), f_names))
+
+        if opts is None:
+            opts = self.opts
+
+        deleters = dict((deleter.file_name, deleter)
+                        for deleter in opts['options'].OUTPUT_FILE_DELETERS
+                       )
+
+        gdms, bboxes, invalid = [], [], []
+        abbrevs, fields, field_prefixes = OrderedDict(), OrderedDict(), OrderedDict()
+        retcode = 0
+        for f_name in f_names:
+            if f_name in deleters:
+                # Deleted by the reader after it is read, as for a single 
+                # sDNA run's output file.
+                opts['options'] = opts['options']._replace(
+                                        OUTPUT_FILE_DELETER = deleters[f_name]
+                                        )
+            results = dict(zip(self.retvals, self(f_name, gdm, opts)))
+            retcode = retcode or results['retcode']
+            gdms.append(results['gdm'])
+            bboxes.append(results['bbox'])
+            invalid.extend(results['invalid'] or [])
+            for union, vals in ((abbrevs, results['abbrevs'])
+                               ,(fields, results['fields'])
+                               ,(field_prefixes, results['field_prefixes'])
+                               ):
+                union.update((val, None) for val in vals)
+
+        if deleters:
+            opts['options'] = opts['options']._replace(OUTPUT_FILE_DELETERS = ())
+
+        gdm = gdms
+        bbox = next((bbox for bbox in bboxes if bbox), None)
+        abbrevs, fields, field_prefixes = list(abbrevs), list(fields), list(field_prefixes)
+
+        locs = locals().copy()
+        return tuple(locs[retval] for retval in self.retvals)
+
+
     retvals = 'retcode', 'gdm', 'abbrevs', 'fields', 'field_prefixes', 'bbox', 'invalid'
     component_outputs = ('Geom', 'Data') + retvals[2:]
 
@@ -464,4 +525,29 @@ class ShapefileReader(sDNA_GH_Tool):
                                            +'from receiving data). '
                                            )
                             ))       
+            ,('columnar_gdm', add_params.ParamInfo(
+                             param_Class = Param_Boolean
+                            ,Description = ('true: store the Data of all the '
+                                           +'objects in one column per field. '
+                                           +'Uses much less memory for large '
+                                           +'Shapefiles, and Parse_Data and '
+                                           +'Recolour_Objects read field '
+                                           +'directly from its column. '
+                                           +'false: store a dictionary of '
+                                           +'Data for each object. '
+                                           +'Default: %(columnar_gdm)s'
+                                           )
+                            ))
+            ,('read_fields', add_params.ParamInfo(
+                             param_Class = Param_String
+                            ,Description = ('Names of fields to read from the '
+                                           +'Shapefile (a list, or comma '
+                                           +'separated). Data then only has '
+                                           +'these fields, and any others '
+                                           +'looked up later (e.g. by field) '
+                                           +'are only then read.  Blank: '
+                                           +'read all fields. '
+                                           +'Default: %(read_fields)s'
+                                           )
+                            ))
             )
\ No newline at end of file
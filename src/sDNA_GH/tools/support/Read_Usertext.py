@@ -121,12 +121,56 @@ logger.addHandler(logging.NullHandler())
 ClassLogger = logging_wrapper.class_logger_factory(logger = logger
                                                   ,module_name = __name__
                                                   )
+Lazy = logging_wrapper.Lazy
+
+
+uuid_regex = re.compile(funcs.uuid_pattern)
+
+
+def is_computed_field(val):
+    #type(str) -> bool
+    """ e.g.: %<CurveLength("ac4669e5-53a6-4c2b-9080-bbc67129d93e")>% """
+    return (val.startswith('%') and 
+            val.endswith('%') and 
+            uuid_regex.search(val) is not None
+           )
+
+
+def read_User_Text(objs
+                  ,keys = None
+                  ,compute_vals = True
+                  ,coerce_Rhino_obj = lambda obj: rs.coercerhinoobject(obj, True, True)
+                  ,parse_text_field = lambda val, Rhino_obj: Rhino.RhinoApp.ParseTextField(
+                                                                  val, Rhino_obj, None)
+                  ):
+    #type(Iterable, Iterable[str], bool, function, function) -> Iterator[tuple[type[any], OrderedDict]]
+    """ Generator of each of objs, and an OrderedDict of its attribute 
+        User Text.  Each object is coerced once, and its User Text fetched 
+        once (instead of by rs.GetUserText for its keys, and then again for 
+        each key).  If keys is given, only those keys are read.  
+        
+        If compute_vals, vals that are computed fields are parsed.
+    """
+    for obj in objs:
+        Rhino_obj = coerce_Rhino_obj(obj)
+        user_strings = Rhino_obj.Attributes.GetUserStrings()
+        user_text = OrderedDict()
+        for key in (user_strings.AllKeys if keys is None else keys):
+            val = user_strings.Get(key)
+            if val is None:
+                continue
+            if compute_vals and is_computed_field(val):
+                val = parse_text_field(val, Rhino_obj)
+            user_text[key] = val
+        yield obj, user_text
 
 
 class UsertextReader(sDNA_GH_Tool):
 
     class Options(object):
         compute_vals = True
+        usertext_keys = () # Names of the User Text keys to read.  
+                           # Empty to read them all.
 
     param_infos = sDNA_GH_Tool.param_infos + (
                    ('compute_vals', add_params.ParamInfo(
@@ -138,6 +182,13 @@ class UsertextReader(sDNA_GH_Tool):
                                            +'false: do nothing. '
                                            +'Default: %(compute_vals)s'
                                            )
+                            )),
+                   ('usertext_keys', add_params.ParamInfo(
+                             param_Class = Param_String
+                            ,Description = ('Names of the User Text keys to '
+                                           +'read. Empty: read all of them. '
+                                           +'Default: %(usertext_keys)s'
+                                           )
                             )),
 
                                               )
@@ -158,33 +209,25 @@ class UsertextReader(sDNA_GH_Tool):
             raise ValueError(msg)
 
         if isinstance(gdm, gdm_from_GH_Datatree.GeomDataMapping):
-            self.logger.debug('gdm[:3] == %s ' % {key : gdm[key] for key in gdm.keys()[:3]} )
+            self.logger.debug('gdm[:3] == %s '
+                             ,Lazy(lambda: {key : gdm[key] for key in list(gdm.keys())[:3]})
+                             )
             gdm = [gdm]
         
         gdm = [sub_gdm.copy() for sub_gdm in gdm]
 
+        keys = options.usertext_keys or ()
+        if isinstance(keys, basestring):
+            keys = [keys]
+        keys = [key for key in keys if key] or None
+
         sc.doc = Rhino.RhinoDoc.ActiveDoc
         for sub_gdm in gdm:
-            for obj in sub_gdm:
-                keys = rs.GetUserText(obj)
-                # try:
-                #     keys = rs.GetUserText(obj)
-                # except ValueError:
-                #     keys =[]
-                for key in keys:
-                    val = rs.GetUserText(obj, key)
-
-                    # Expand/parse computed vals like:
-                    #  %<CurveLength("ac4669e5-53a6-4c2b-9080-bbc67129d93e")>%
-                    if (options.compute_vals and 
-                        val.startswith(r'%') and val.endswith(r'%') and
-                        re.search(funcs.uuid_pattern, val)):
-                        #
-                        coerced_obj = rs.coercerhinoobject(obj)
-                        val = Rhino.RhinoApp.ParseTextField(val, coerced_obj, None)
-
-
-                    sub_gdm[obj][key] = val
+            for obj, user_text in read_User_Text(sub_gdm
+                                                ,keys = keys
+                                                ,compute_vals = options.compute_vals
+                                                ):
+                sub_gdm[obj].update(user_text)
 
         # read_Usertext_as_tuples = checkers.OrderedDict_from_User_Text_factory()
         # for obj in gdm:
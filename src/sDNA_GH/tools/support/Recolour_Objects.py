@@ -100,16 +100,17 @@ except NameError:
 
 OrderedDict, Counter = collections.OrderedDict, collections.Counter
 if hasattr(collections, 'Iterable'):
-    Iterable = collections.Iterable 
+    Iterable, Mapping = collections.Iterable, collections.Mapping
 else:
     import collections.abc
-    Iterable = collections.abc.Iterable
+    Iterable, Mapping = collections.abc.Iterable, collections.abc.Mapping
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 ClassLogger = logging_wrapper.class_logger_factory(logger = logger
                                                   ,module_name = __name__
                                                   )
+Lazy = logging_wrapper.Lazy
 
 
 class ObjectsRecolourer(sDNA_GH_Tool):
@@ -121,6 +122,12 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         rgb_min = (0, 0, 125) #3333cc
         rgb_mid = (0, 155, 0) # guessed
         line_width = 4 # millimetres? 
+        colour_LUT_size = 1024 # Number of colours precomputed between the
+                               # min and max, to look each object's colour 
+                               # up from.  0 to calculate each exactly.
+        batch_recolour = True # Modify each Rhino object's attributes once,
+                              # via the object table, with redraws off 
+                              # (see rhino_gh_geom.recolour_objects).
         leg_extent = options_manager.Sentinel('leg_extent is automatically '
                                              +'calculated by sDNA_GH unless '
                                              +'overridden.  '
@@ -202,39 +209,55 @@ class ObjectsRecolourer(sDNA_GH_Tool):
             gdm = [gdm]
 
 
-        objs_to_parse = gdm_from_GH_Datatree.GeomDataMapping(
-                                        (k, v) 
-                                        for sub_gdm in gdm
-                                        for k, v in sub_gdm.items()
-                                        if isinstance(v, dict) and field in v
-                                        )  
-                                        # any geom with a normal gdm dict of 
-                                        # keys / vals containing field
-
-        objs_with_numbers = gdm_from_GH_Datatree.GeomDataMapping(
-                                                    (k, v) 
-                                                    for sub_gdm in gdm
-                                                    for k, v in sub_gdm.items()
-                                                    if isinstance(v, Number) 
-                                                    ) 
-        objs_to_recolour = gdm_from_GH_Datatree.GeomDataMapping( 
-                                        (k, v) 
-                                        for sub_gdm in gdm
-                                        for k, v in sub_gdm.items()
-                                        if isinstance(v, System.Drawing.Color)
-                                        )
+        if field and all(isinstance(sub_gdm, gdm_from_GH_Datatree.ColumnarGeomDataMapping)
+                         and sub_gdm.has_complete_column(field)
+                         for sub_gdm in gdm):
+            # Only field's column is needed, without a dict per object.
+            if len(gdm) == 1:
+                objs_to_parse = gdm[0].project([field])
+            else:
+                objs_to_parse = gdm_from_GH_Datatree.ColumnarGeomDataMapping()
+                for sub_gdm in gdm:
+                    objs_to_parse.merge(sub_gdm.project([field]))
+            objs_with_numbers = gdm_from_GH_Datatree.GeomDataMapping()
+            objs_to_recolour = gdm_from_GH_Datatree.GeomDataMapping()
+        else:
+            objs_to_parse = gdm_from_GH_Datatree.GeomDataMapping(
+                                            (k, v) 
+                                            for sub_gdm in gdm
+                                            for k, v in sub_gdm.items()
+                                            if isinstance(v, Mapping) and field in v
+                                            )  
+                                            # any geom with a normal gdm dict of 
+                                            # keys / vals containing field
+
+            objs_with_numbers = gdm_from_GH_Datatree.GeomDataMapping(
+                                                        (k, v) 
+                                                        for sub_gdm in gdm
+                                                        for k, v in sub_gdm.items()
+                                                        if isinstance(v, Number) 
+                                                        ) 
+            objs_to_recolour = gdm_from_GH_Datatree.GeomDataMapping( 
+                                            (k, v) 
+                                            for sub_gdm in gdm
+                                            for k, v in sub_gdm.items()
+                                            if isinstance(v, System.Drawing.Color)
+                                            )
 
 
         self.logger.debug('Objects to parse & fields == %s, ... , %s'
-                         %(objs_to_parse.items()[:2], objs_to_parse.items()[-2:])
+                         ,Lazy(lambda: list(objs_to_parse.items())[:2])
+                         ,Lazy(lambda: list(objs_to_parse.items())[-2:])
                          )
 
         self.logger.debug('Objects already parsed & parsed vals == %s, ... , %s'
-                         %(objs_with_numbers.items()[:5], objs_with_numbers.items()[-5:])
+                         ,Lazy(lambda: list(objs_with_numbers.items())[:5])
+                         ,Lazy(lambda: list(objs_with_numbers.items())[-5:])
                          )
 
         self.logger.debug('Objects that already have colours == %s, ... , %s'
-                         %(objs_to_recolour.items()[:5], objs_to_recolour.items()[-5:])
+                         ,Lazy(lambda: list(objs_to_recolour.items())[:5])
+                         ,Lazy(lambda: list(objs_to_recolour.items())[-5:])
                          )
         
         if data_cruncher.max_and_min_are_valid(plot_max, plot_min):
@@ -249,7 +272,7 @@ class ObjectsRecolourer(sDNA_GH_Tool):
             supported_fields = set(field for sub_gdm in gdm
                                       for val in sub_gdm.values() 
                                       for field in val
-                                      if isinstance(val, dict)
+                                      if isinstance(val, Mapping)
                                   )
             if supported_fields:
                 msg += 'or set field to one of: %s ' % supported_fields
@@ -263,7 +286,7 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         if objs_to_parse:
             #
             self.info('Raw data in ObjectsRecolourer.  Calling DataParser...')
-            self.debug('Raw data: %s' % objs_to_parse.items()[:4])
+            self.debug('Raw data: %s', Lazy(lambda: list(objs_to_parse.items())[:4]))
             x_min, x_max, gdm_in, field, mid_points, class_bounds = self.parse_data(
                                                    gdm = objs_to_parse
                                                   ,opts = opts 
@@ -283,9 +306,12 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                                            # some x both isinstance(x, dict) 
                                            # and isinstance(x, Number)
         logger.debug('Objects to get colours & vals == %s, ... , %s'
-                    %(objs_to_get_colour.items()[:5], objs_to_get_colour.items()[-5:])
+                    ,Lazy(lambda: list(objs_to_get_colour.items())[:5])
+                    ,Lazy(lambda: list(objs_to_get_colour.items())[-5:])
                     )
 
+        interpolates = False
+
         if not objs_to_get_colour:
             self.logger.debug('No objects need colours to be created. ')
         elif (isinstance(x_max, Number) and 
@@ -304,24 +330,30 @@ class ObjectsRecolourer(sDNA_GH_Tool):
             grad = getattr( GH_Gradient()
                           ,self.GH_Gradient_preset_names[options.Col_Grad_num]
                           )
+            gradient = grad()
+            linearly_interpolate = data_cruncher.enforce_bounds(
+                                        data_cruncher.linearly_interpolate)
+            interpolates = True
             def get_colour(x):
                 # Number-> Tuple(Number, Number, Number)
                 # May need either rhinoscriptsyntax.CreateColor
                 # or System.Drawing.Color.FromArgb and even 
                 # Grasshopper.Kernel.Types.GH_Colour calling on the result to work
                 # in Grasshopper
-                linearly_interpolate = data_cruncher.enforce_bounds(
-                                            data_cruncher.linearly_interpolate)
-                return grad().ColourAt( linearly_interpolate(x
-                                                            ,x_min
-                                                            ,None
-                                                            ,x_max
-                                                            ,0 #0.18
-                                                            ,1 #0.82
-                                                            )
-                                      )
+                return gradient.ColourAt( linearly_interpolate(x
+                                                              ,x_min
+                                                              ,None
+                                                              ,x_max
+                                                              ,0 #0.18
+                                                              ,1 #0.82
+                                                              )
+                                        )
         #elif not 
         else:
+            rgb_min = tuple(options.rgb_min)
+            rgb_mid = tuple(options.rgb_mid)
+            rgb_max = tuple(options.rgb_max)
+            interpolates = True
             def get_colour(x):
                 # Number-> Tuple(Number, Number, Number)
                 # May need either rhinoscriptsyntax.CreateColor
@@ -334,9 +366,9 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                                         ,x_min
                                         ,0.5*(x_min + x_max)
                                         ,x_max
-                                        ,tuple(options.rgb_min)
-                                        ,tuple(options.rgb_mid)
-                                        ,tuple(options.rgb_max)
+                                        ,rgb_min
+                                        ,rgb_mid
+                                        ,rgb_max
                                         )
                 bounded_colour = ()
                 for channel in rgb_col:
@@ -344,6 +376,35 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                 return rs.CreateColor(bounded_colour)
 
 
+        get_class_colour = None
+
+        if options.colour_as_class and objs_to_parse and objs_to_get_colour:
+            # The parsed values are all class midpoints, so only 
+            # one colour needs to be created per class (from the 
+            # first parsed value in it).
+            class_lookup = data_cruncher.ClassLookup(class_bounds
+                                                    ,x_min
+                                                    ,x_max
+                                                    )
+            class_colours = {}
+            get_val_colour = get_colour
+
+            def get_class_colour(x):
+                i = class_lookup.class_index(x)
+                if i not in class_colours:
+                    class_colours[i] = get_val_colour(x)
+                return class_colours[i]
+
+        if interpolates and options.colour_LUT_size:
+            # One colour object per entry, shared by all the objects whose
+            # values are nearest it.
+            get_colour = data_cruncher.LookupTable(get_colour
+                                                  ,x_min
+                                                  ,x_max
+                                                  ,options.colour_LUT_size
+                                                  )
+
+
         if not objs_to_get_colour and not objs_to_recolour:
             msg = 'No objects to recolour have been found. '
             msg += 'objs_to_parse == %s, ' % objs_to_parse
@@ -352,12 +413,23 @@ class ObjectsRecolourer(sDNA_GH_Tool):
             self.logger.error(msg)
             raise ValueError(msg)
             
-        objs_to_recolour.update( (key,  get_colour(val))
-                                 for key, val in objs_to_get_colour.items()
-                               )
+        if get_class_colour is None:
+            objs_to_recolour.update( (key,  get_colour(val))
+                                     for key, val in objs_to_get_colour.items()
+                                   )
+        else:
+            # Only the parsed values are class midpoints.  Raw numbers 
+            # that were not parsed are coloured as usual.
+            objs_to_recolour.update( (key,  get_class_colour(val) 
+                                            if key in gdm_in else
+                                            get_colour(val)
+                                     )
+                                     for key, val in objs_to_get_colour.items()
+                                   )
 
         logger.debug('Objects to recolour & colours == %s, ... , %s'
-                    %(objs_to_recolour.items()[:5], objs_to_recolour.items()[-5:])
+                    ,Lazy(lambda: list(objs_to_recolour.items())[:5])
+                    ,Lazy(lambda: list(objs_to_recolour.items())[-5:])
                     )
 
         legend_tags = OrderedDict()
@@ -384,6 +456,10 @@ class ObjectsRecolourer(sDNA_GH_Tool):
 
         sc.doc = Rhino.RhinoDoc.ActiveDoc
 
+        debug = logging_wrapper.debug_enabled(self.logger)
+
+        objs_and_colours = []
+
         for obj, new_colour in objs_to_recolour.items():
             #self.logger.debug('obj, is_uuid == %s, %s ' % (obj, is_uuid(obj))) 
             
@@ -400,28 +476,46 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                 #sc.doc = ghdoc it's now never changed, 
                 #assert sc.doc == ghdoc #anyway
                 legend_tags[obj] = rs.CreateColor(new_colour) # Could glitch if dupe  
+            elif options.batch_recolour:
+                objs_and_colours.append((obj, new_colour))
             else:
                 try:
                     rs.ObjectColor(obj, new_colour)
                     recoloured_Rhino_objs.append(obj)
-                    self.logger.debug('Recoloured: %s' % obj)
+                    if debug:
+                        self.logger.debug('Recoloured: %s' % obj)
                 except (ValueError, TypeError):
-                    self.logger.debug('Error recolouring obj: %s to colour %s: ' 
-                                     % (obj, new_colour)
-                                     )
+                    if debug:
+                        self.logger.debug('Error recolouring obj: %s to colour %s: ' 
+                                         % (obj, new_colour)
+                                         )
                     GH_objs_to_recolour[obj] = new_colour 
+
+        if objs_and_colours:
+            recoloured_Rhino_objs, not_in_Rhino_doc = rhino_gh_geom.recolour_objects(
+                                                 objs_and_colours
+                                                ,doc = sc.doc
+                                                ,line_width = options.line_width
+                                                )
+            not_in_Rhino_doc = set(not_in_Rhino_doc)
+            GH_objs_to_recolour.update((obj, new_colour)
+                                       for obj, new_colour in objs_and_colours
+                                       if obj in not_in_Rhino_doc
+                                      )
                     
         sc.doc = ghdoc
             
-        self.logger.debug('recoloured_Rhino_objs: %s' % recoloured_Rhino_objs)
+        self.logger.debug('recoloured_Rhino_objs: %s', recoloured_Rhino_objs)
 
         if recoloured_Rhino_objs:
             sc.doc = Rhino.RhinoDoc.ActiveDoc
-            self.logger.debug('Setting Rhino colour sources and line width.')                 
-            rs.ObjectColorSource(recoloured_Rhino_objs, 1)  # 1 => colour from object
-            rs.ObjectPrintColorSource(recoloured_Rhino_objs, 2)  # 2 => colour from object
-            rs.ObjectPrintWidthSource(recoloured_Rhino_objs, 1)  # 1 => logger.debug width from object
-            rs.ObjectPrintWidth(recoloured_Rhino_objs, options.line_width) # width in mm
+            if not options.batch_recolour:
+                # recolour_objects already set these.
+                self.logger.debug('Setting Rhino colour sources and line width.')                 
+                rs.ObjectColorSource(recoloured_Rhino_objs, 1)  # 1 => colour from object
+                rs.ObjectPrintColorSource(recoloured_Rhino_objs, 2)  # 2 => colour from display
+                rs.ObjectPrintWidthSource(recoloured_Rhino_objs, 1)  # 1 => logger.debug width from object
+                rs.ObjectPrintWidth(recoloured_Rhino_objs, options.line_width) # width in mm
             rs.Command('_PrintDisplay _State=_On Color=Display Thickness=%s '
                       %options.line_width
                       +' _enter'
@@ -505,7 +599,7 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         gdm = GH_objs_to_recolour
         leg_cols = list(legend_tags.values())
         leg_tags = list(legend_tags.keys())  #both are used by smart component
-        self.logger.debug('gdm == %s' % gdm)
+        self.logger.debug('gdm == %s', gdm)
 
         sc.doc =  ghdoc 
         sc.doc.Views.Redraw()
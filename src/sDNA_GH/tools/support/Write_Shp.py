@@ -121,6 +121,7 @@ logger.addHandler(logging.NullHandler())
 ClassLogger = logging_wrapper.class_logger_factory(logger = logger
                                                   ,module_name = __name__
                                                   )
+Lazy = logging_wrapper.Lazy
 
 
 
@@ -185,7 +186,7 @@ class ShapefileWriter(sDNA_GH_Tool):
         options = opts['options']
         self.debug('Creating Class Logger.  ')
 
-        self.logger.debug('gdm == %s' % gdm)
+        self.logger.debug('gdm == %s', gdm)
         shp_type = options.shp_type            
 
 
@@ -197,28 +198,20 @@ class ShapefileWriter(sDNA_GH_Tool):
 
             return re.match(pattern, x) 
 
+        # Each object's geometry, source document, validity and points
+        # are looked up once, and shared by validation and writing.
+        geom_cache = rhino_gh_geom.GeomResolutionCache(shp_type)
+
         def get_list_of_points_from_obj(obj):
             #type: (type[any]) -> list
 
-            if not rhino_gh_geom.is_shape(obj, shp_type):
+            if not geom_cache.is_shape(obj):
                 msg = 'Shape: %s cannot be converted to shp_type: %s' 
                 msg %= (obj, shp_type)
                 self.logger.error(msg)
                 raise TypeError(msg)
 
-            geom, __ = rhino_gh_geom.get_geom_and_source_else_leave(obj)
-
-            # if hasattr(Rhino.Geometry, type(obj).__name__):
-            #     geom = obj
-            # else:
-            #     obj = System.Guid(str(obj))
-            #     geom = Rhino.RhinoDoc.ActiveDoc.Objects.FindGeometry(obj)
-            #     if not geom:
-            #         geom = ghdoc.Objects.FindGeometry(obj)
-
-
-
-            points = rhino_gh_geom.get_points_from_obj(geom, shp_type)
+            points = geom_cache.get_points(obj)
 
             if not points:
                 return []
@@ -268,13 +261,9 @@ class ShapefileWriter(sDNA_GH_Tool):
             self.logger.error(msg)
             raise TypeError(msg)
 
-        # bad_shapes = [obj for obj in gdm if not rhino_gh_geom.is_shape(obj, shp_type)]
         bad_shapes = collections.defaultdict(list)
-        for obj in gdm:
-            if rhino_gh_geom.is_shape(obj, shp_type):
-                continue
-            geom, source = get_geom_and_source_else_leave(obj)
-    
+        for obj in geom_cache.resolve_all(gdm):
+            geom = geom_cache.resolve(obj).geom
             bad_shapes[(type(obj).__name__, type(geom).__name__)].append(obj)
     
 
@@ -291,8 +280,11 @@ class ShapefileWriter(sDNA_GH_Tool):
             raise TypeError(msg)
         else:
             self.logger.debug('Points for obj 0: %s ' 
-                                % get_list_of_list_of_pts_from_obj(gdm.keys()[0]) 
-                                )
+                             ,Lazy(lambda: get_list_of_list_of_pts_from_obj(
+                                                            next(iter(gdm.keys()))
+                                                            )
+                                  )
+                             )
 
         def shape_IDer(obj):
             return obj #tupl[0].ToString() # uuid
@@ -342,10 +334,10 @@ class ShapefileWriter(sDNA_GH_Tool):
 
 
 
-        retcode, f_name, fields, gdm = pyshp_wrapper.write_iterable_to_shp(
+        retcode, f_name, fields, attribute_tables = pyshp_wrapper.write_iterable_to_shp(
                                              my_iterable = gdm
                                             ,shp_file_path = f_name
-                                            ,is_shape = rhino_gh_geom.is_shape
+                                            ,is_shape = geom_cache.is_shape
                                             ,shape_mangler = get_list_of_list_of_pts_from_obj 
                                             ,shape_IDer = shape_IDer
                                             ,key_finder = find_keys 
@@ -356,6 +348,11 @@ class ShapefileWriter(sDNA_GH_Tool):
                                             ,field_names = None
                                             ,AttributeTablesClass = gdm_from_GH_Datatree.GeomDataMapping
                                             )
+
+        if attribute_tables is not None:
+            gdm = attribute_tables
+        # else options.two_pass is set, and the records written were not 
+        # kept in memory, so output the gdm the shapefile was written from.
         
         prj = options.prj
 
@@ -111,10 +111,10 @@ except NameError:
 
 OrderedDict, Counter = collections.OrderedDict, collections.Counter
 if hasattr(collections, 'Iterable'):
-    Iterable = collections.Iterable 
+    Iterable, Mapping = collections.Iterable, collections.Mapping
 else:
     import collections.abc
-    Iterable = collections.abc.Iterable
+    Iterable, Mapping = collections.abc.Iterable, collections.abc.Mapping
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -149,7 +149,7 @@ def write_dict_to_UserText_on_Rhino_obj(d
         logger.error(msg)
         raise NotImplementedError(msg)
 
-    if not isinstance(d, dict):
+    if not isinstance(d, Mapping):
         msg = 'dict required by write_dict_to_UserText_on_Rhino_obj, got: %s, of type: %s'
         msg %= (d, type(d))
         logger.error(msg)